@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+from typing import Tuple
+
+
+def make_pair(n_rows: int, n_columns: int, categorical_fraction: float = 0.5, cardinality: int = 10,
+              seed: int = 0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Generate a seeded pair of real and fake DataFrames with the same schema. Numerical columns are correlated Gaussians, categorical columns hold string
+    labels drawn from a skewed distribution over ``cardinality`` levels. The fake data is drawn from the same process with perturbed parameters.
+
+    :param n_rows: number of rows of each DataFrame
+    :param n_columns: total number of columns
+    :param categorical_fraction: fraction of the columns that are categorical
+    :param cardinality: number of distinct levels per categorical column
+    :param seed: random seed
+    :return: tuple with the real and the fake DataFrame
+    """
+    n_categorical = int(round(n_columns * categorical_fraction))
+    n_numerical = n_columns - n_categorical
+    rng = np.random.default_rng(seed)
+    mixing = rng.normal(size=(n_numerical, n_numerical)) / np.sqrt(max(n_numerical, 1))
+    level_weights = rng.dirichlet(np.ones(cardinality), size=n_categorical)
+    labels = np.array([f'level_{i}' for i in range(cardinality)], dtype=object)
+
+    frames = []
+    for noise, data_seed in [(0.0, seed + 1), (0.1, seed + 2)]:
+        data_rng = np.random.default_rng(data_seed)
+        columns = {}
+        if n_numerical:
+            latent = data_rng.normal(size=(n_rows, n_numerical))
+            numerical = latent @ (mixing + noise * data_rng.normal(size=mixing.shape))
+            for i in range(n_numerical):
+                columns[f'num_{i}'] = numerical[:, i] * (i + 1) + i
+        for i in range(n_categorical):
+            weights = level_weights[i] + noise * data_rng.dirichlet(np.ones(cardinality))
+            codes = data_rng.choice(cardinality, size=n_rows, p=weights / weights.sum())
+            columns[f'cat_{i}'] = labels[codes]
+        frames.append(pd.DataFrame(columns))
+    return frames[0], frames[1]
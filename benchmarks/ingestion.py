@@ -0,0 +1,89 @@
+"""
+Memory benchmark for the ingestion step of TableEvaluator. Compares the previous ingestion (copy both inputs, then sample and stringify categoricals),
+the current default (sample first) and ``lean=True`` (sample first, shared pandas Categoricals).
+
+Usage: python -m benchmarks.ingestion --rows 5000000 --columns 10 --n-samples 100000
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import time
+import tracemalloc
+import pandas as pd
+import psutil
+from table_evaluator import TableEvaluator
+from .data import make_pair
+
+
+def previous_ingestion(real: pd.DataFrame, fake: pd.DataFrame, n_samples: int):
+    """
+    Data path of ``TableEvaluator.__init__`` before sampling was moved in front of copying, kept as the baseline of this benchmark.
+    """
+    real_copy, fake_copy = real.copy(), fake.copy()
+    inferred = real.infer_objects()
+    fake.infer_objects()
+    numerical_columns = [c for c in inferred._get_numeric_data().columns if len(inferred[c].unique()) > 0]
+    categorical_columns = [c for c in real.columns if c not in numerical_columns]
+    real_copy = real_copy.sample(n_samples)
+    fake_copy = fake_copy.sample(n_samples)
+    real_copy.loc[:, categorical_columns] = real_copy.loc[:, categorical_columns].fillna('[NAN]').astype(str)
+    fake_copy.loc[:, categorical_columns] = fake_copy.loc[:, categorical_columns].fillna('[NAN]').astype(str)
+    return real_copy, fake_copy
+
+
+def _measure(mode: str, args: argparse.Namespace, queue: multiprocessing.Queue):
+    real, fake = make_pair(args.rows, args.columns, categorical_fraction=args.categorical_fraction, cardinality=args.cardinality, seed=args.seed)
+    gc.collect()
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    tracemalloc.start()
+    start = time.perf_counter()
+    if mode == 'previous':
+        stored = previous_ingestion(real, fake, args.n_samples)
+    else:
+        evaluator = TableEvaluator(real, fake, n_samples=args.n_samples, lean=mode == 'lean')
+        stored = evaluator.real, evaluator.fake
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+    queue.put({
+        'mode': mode,
+        'seconds': elapsed,
+        'peak_traced_mb': peak / 2 ** 20,
+        'retained_rss_mb': (process.memory_info().rss - rss_before) / 2 ** 20,
+        'stored_mb': sum(df.memory_usage(deep=True).sum() for df in stored) / 2 ** 20,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--columns', type=int, default=10)
+    parser.add_argument('--categorical-fraction', type=float, default=0.5)
+    parser.add_argument('--cardinality', type=int, default=50)
+    parser.add_argument('--n-samples', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=str, default=None, help='optional path of a JSON file to write the results to')
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for mode in ['previous', 'default', 'lean']:
+        # Every mode runs in a fresh process, so resident memory is not shared between measurements.
+        queue = context.Queue()
+        process = context.Process(target=_measure, args=(mode, args, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+
+    table = pd.DataFrame(results).set_index('mode')
+    print(table.to_string(float_format='{:,.2f}'.format))
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump({'arguments': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
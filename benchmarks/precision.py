@@ -0,0 +1,92 @@
+"""
+Benchmark of the ``precision`` option of TableEvaluator. Runs the stages that compute on the numerical encoding with ``precision='float64'`` and
+``precision='float32'``, each in a fresh process on the same seeded data and sample, and reports per stage the wall time, the peak traced memory
+and, for stages that return a metric, the deviation of the float32 metric from the float64 one.
+
+Usage: python -m benchmarks.precision --rows 200000 --columns 20 --n-distance 5000
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import time
+import tracemalloc
+import warnings
+import numpy as np
+import pandas as pd
+from sklearn.exceptions import ConvergenceWarning
+from table_evaluator import TableEvaluator
+from .data import make_pair
+
+STAGES = {
+    'encoding': lambda e, args: e.encoding and None,
+    'convert_numerical_one_hot': lambda e, args: e.convert_numerical_one_hot() and None,
+    'association_matrix': lambda e, args: float(e.association_matrix('fake').to_numpy().mean()),
+    'correlation_correlation': lambda e, args: e.correlation_correlation(),
+    'basic_statistical_evaluation': lambda e, args: e.basic_statistical_evaluation(),
+    'pca_correlation': lambda e, args: e.pca_correlation(),
+    'row_distance': lambda e, args: float(e.row_distance(n_samples=args.n_distance)[0]),
+    'estimator_evaluation': lambda e, args: e.estimator_evaluation(e.categorical_columns[0], target_type='class') if e.categorical_columns
+    else e.estimator_evaluation(e.numerical_columns[0], target_type='regr'),
+}
+
+
+def _measure(precision: str, args: argparse.Namespace, queue: multiprocessing.Queue):
+    warnings.filterwarnings(action='ignore', category=ConvergenceWarning)
+    real, fake = make_pair(args.rows, args.columns, categorical_fraction=args.categorical_fraction, cardinality=args.cardinality, seed=args.seed)
+    # The evaluator samples with the global random state, so both precisions evaluate the same rows.
+    np.random.seed(args.seed)
+    evaluator = TableEvaluator(real, fake, seed=args.seed, precision=precision)
+    results = []
+    for stage in args.stages:
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        value = STAGES[stage](evaluator, args)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append({'precision': precision, 'stage': stage, 'seconds': elapsed, 'peak_traced_mb': peak / 2 ** 20, 'value': value})
+    queue.put(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--columns', type=int, default=20)
+    parser.add_argument('--categorical-fraction', type=float, default=0.3)
+    parser.add_argument('--cardinality', type=int, default=20)
+    parser.add_argument('--n-distance', type=int, default=5000, help='number of rows of the row distance')
+    parser.add_argument('--stages', nargs='+', default=list(STAGES), choices=list(STAGES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=str, default=None, help='optional path of a JSON file to write the results to')
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for precision in ['float64', 'float32']:
+        # Every precision runs in a fresh process, so neither inherits caches or memory from the other.
+        queue = context.Queue()
+        process = context.Process(target=_measure, args=(precision, args, queue))
+        process.start()
+        results.extend(queue.get())
+        process.join()
+
+    table = pd.DataFrame(results).pivot(index='stage', columns='precision').reindex(args.stages)
+    summary = pd.DataFrame({
+        'float64 s': table['seconds', 'float64'],
+        'float32 s': table['seconds', 'float32'],
+        'speedup': table['seconds', 'float64'] / table['seconds', 'float32'],
+        'float64 peak MB': table['peak_traced_mb', 'float64'],
+        'float32 peak MB': table['peak_traced_mb', 'float32'],
+        'float64 value': table['value', 'float64'],
+        'abs deviation': (table['value', 'float32'].astype(float) - table['value', 'float64'].astype(float)).abs(),
+    })
+    print(summary.to_string(float_format='{:,.6g}'.format))
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump({'arguments': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,318 @@
+"""
+Benchmark suite for TableEvaluator. Every case generates a seeded pair of real and fake tables with `data.make_pair` and times every public
+method of TableEvaluator and the metric functions ``js_distance_df``, ``kolmogorov_smirnov_df`` and ``column_correlations`` on it. Results are
+written to a JSON file, and two result files, e.g. of two commits, can be compared with a regression threshold.
+
+Usage:
+    python -m benchmarks.suite run --grid default --output before.json
+    python -m benchmarks.suite run --rows 10000 100000 --columns 10 100 --skip estimator_evaluation --output after.json
+    python -m benchmarks.suite compare before.json after.json --threshold 1.2
+"""
+import argparse
+import gc
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import subprocess
+import sys
+import time
+import tracemalloc
+import matplotlib
+import numpy as np
+import pandas as pd
+import scipy
+import sklearn
+from typing import Callable, Dict, List
+
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from table_evaluator import TableEvaluator
+from table_evaluator.metrics import column_correlations, js_distance_df, kolmogorov_smirnov_df
+from .data import make_pair
+
+GRIDS = {
+    'smoke': {'rows': [1000], 'columns': [10], 'categorical_fraction': [0.5], 'cardinality': [10]},
+    'default': {'rows': [1000, 10000, 100000], 'columns': [10, 50], 'categorical_fraction': [0.2, 0.8], 'cardinality': [10, 1000]},
+    'full': {'rows': [1000, 10000, 100000, 1000000], 'columns': [10, 100, 500], 'categorical_fraction': [0.0, 0.5, 0.9],
+             'cardinality': [10, 1000]},
+}
+CASE_FIELDS = ['rows', 'columns', 'categorical_fraction', 'cardinality']
+
+
+class BenchmarkState:
+    """
+    Data of one case, shared by its benchmarks.
+    """
+
+    def __init__(self, real: pd.DataFrame, fake: pd.DataFrame, seed: int):
+        self.real = real
+        self.fake = fake
+        self.seed = seed
+        self.evaluator = TableEvaluator(real, fake, seed=seed)
+        # Classification on a categorical column when there is one, so the classifiers are benchmarked on the usual path.
+        categorical = self.evaluator.categorical_columns
+        self.target_col = categorical[0] if categorical else self.evaluator.numerical_columns[0]
+        self.target_type = 'class' if categorical else 'regr'
+        self.estimators_ready = False
+
+    def prepare_estimators(self):
+        if not self.estimators_ready:
+            self.evaluator.estimator_evaluation(self.target_col, target_type=self.target_type)
+            self.estimators_ready = True
+
+
+class Benchmark:
+    """
+    A timed callable. ``setup`` runs once, untimed, before the repetitions.
+    """
+
+    def __init__(self, name: str, run: Callable[[BenchmarkState], object], setup: Callable[[BenchmarkState], None] = None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+
+
+def _evaluate(state: BenchmarkState):
+    return state.evaluator.evaluate(state.target_col, target_type=state.target_type, return_outputs=True)
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark('TableEvaluator.__init__', lambda s: TableEvaluator(s.real, s.fake, seed=s.seed)),
+    Benchmark('TableEvaluator.convert_numerical', lambda s: s.evaluator.convert_numerical()),
+    Benchmark('TableEvaluator.convert_numerical_one_hot', lambda s: s.evaluator.convert_numerical_one_hot()),
+    Benchmark('TableEvaluator.association_matrix', lambda s: s.evaluator.association_matrix('real')),
+    Benchmark('TableEvaluator.row_hash_index', lambda s: s.evaluator.row_hash_index('real')),
+    Benchmark('TableEvaluator.descriptive_statistics', lambda s: s.evaluator.descriptive_statistics('real')),
+    Benchmark('TableEvaluator.basic_statistical_evaluation', lambda s: s.evaluator.basic_statistical_evaluation()),
+    Benchmark('TableEvaluator.correlation_correlation', lambda s: s.evaluator.correlation_correlation()),
+    Benchmark('TableEvaluator.correlation_distance', lambda s: s.evaluator.correlation_distance(how='rmse')),
+    Benchmark('TableEvaluator.column_correlations', lambda s: s.evaluator.column_correlations()),
+    Benchmark('TableEvaluator.get_copies', lambda s: s.evaluator.get_copies()),
+    Benchmark('TableEvaluator.get_duplicates', lambda s: s.evaluator.get_duplicates()),
+    Benchmark('TableEvaluator.get_near_copies', lambda s: s.evaluator.get_near_copies()),
+    Benchmark('TableEvaluator.pca_correlation', lambda s: s.evaluator.pca_correlation()),
+    Benchmark('TableEvaluator.row_distance', lambda s: s.evaluator.row_distance(n_samples=20000)),
+    Benchmark('TableEvaluator.closest_record_distances', lambda s: s.evaluator.closest_record_distances()),
+    Benchmark('TableEvaluator.estimator_evaluation', lambda s: s.evaluator.estimator_evaluation(s.target_col, target_type=s.target_type)),
+    Benchmark('TableEvaluator.fit_estimators', lambda s: s.evaluator.fit_estimators(), setup=BenchmarkState.prepare_estimators),
+    Benchmark('TableEvaluator.score_estimators', lambda s: s.evaluator.score_estimators(), setup=BenchmarkState.prepare_estimators),
+    Benchmark('TableEvaluator.evaluate', _evaluate),
+    Benchmark('TableEvaluator.bootstrap', lambda s: s.evaluator.bootstrap(n_replicates=50, target_col=s.target_col, target_type=s.target_type)),
+    Benchmark('TableEvaluator.plot_mean_std', lambda s: s.evaluator.plot_mean_std()),
+    Benchmark('TableEvaluator.plot_cumsums', lambda s: s.evaluator.plot_cumsums()),
+    Benchmark('TableEvaluator.plot_distributions', lambda s: s.evaluator.plot_distributions()),
+    Benchmark('TableEvaluator.plot_correlation_difference', lambda s: s.evaluator.plot_correlation_difference()),
+    Benchmark('TableEvaluator.plot_pca', lambda s: s.evaluator.plot_pca()),
+    Benchmark('TableEvaluator.visual_evaluation', lambda s: s.evaluator.visual_evaluation()),
+    Benchmark('metrics.js_distance_df', lambda s: js_distance_df(s.evaluator.real, s.evaluator.fake, s.evaluator.numerical_columns)),
+    Benchmark('metrics.kolmogorov_smirnov_df', lambda s: kolmogorov_smirnov_df(s.evaluator.real, s.evaluator.fake, s.evaluator.numerical_columns)),
+    Benchmark('metrics.column_correlations', lambda s: column_correlations(s.evaluator.real, s.evaluator.fake, s.evaluator.categorical_columns)),
+]
+
+
+def select_benchmarks(only: List[str] = None, skip: List[str] = None) -> List[Benchmark]:
+    """
+    Benchmarks whose name contains one of the patterns of ``only`` and none of ``skip``, e.g. ``plot`` for all plotting methods.
+    """
+    return [b for b in BENCHMARKS if (not only or any(p in b.name for p in only)) and not any(p in b.name for p in (skip or []))]
+
+
+def environment() -> Dict:
+    """
+    Versions and hardware the results were measured with.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scipy': scipy.__version__,
+        'scikit-learn': sklearn.__version__,
+    }
+
+
+def _measure(benchmark: Benchmark, state: BenchmarkState, repeat: int) -> Dict:
+    """
+    Time ``repeat`` runs of a benchmark without memory tracing, then measure its peak traced memory in one more run. Caches of the evaluator are
+    dropped before every run, so every run does the full work.
+    """
+    if benchmark.setup is not None:
+        benchmark.setup(state)
+    times = []
+    for _ in range(repeat):
+        state.evaluator.invalidate_cache()
+        gc.collect()
+        start = time.perf_counter()
+        benchmark.run(state)
+        times.append(time.perf_counter() - start)
+        plt.close('all')
+
+    state.evaluator.invalidate_cache()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        benchmark.run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        plt.close('all')
+    return {'seconds': min(times), 'times': times, 'peak_memory_mb': peak / 2 ** 20}
+
+
+def _run_case(case: Dict, names: List[str], repeat: int, seed: int, results: multiprocessing.Queue):
+    """
+    Run the benchmarks of one case in a worker process and put one result per benchmark on ``results``.
+    """
+    real, fake = make_pair(case['rows'], case['columns'], categorical_fraction=case['categorical_fraction'], cardinality=case['cardinality'],
+                           seed=seed)
+    state = BenchmarkState(real, fake, seed)
+    for benchmark in [b for b in BENCHMARKS if b.name in names]:
+        try:
+            result = _measure(benchmark, state, repeat)
+        except Exception as e:
+            result = {'error': f'{type(e).__name__}: {e}'}
+        results.put({**case, 'benchmark': benchmark.name, **result})
+
+
+def run_suite(cases: List[Dict], benchmarks: List[Benchmark], repeat: int = 3, seed: int = 0, timeout: float = None) -> List[Dict]:
+    """
+    Run the benchmarks on every case. Every case runs in a fresh process, so the memory and caches of one case do not affect the next.
+
+    :param cases: dictionaries with the keys ``rows``, ``columns``, ``categorical_fraction`` and ``cardinality``
+    :param benchmarks: benchmarks to run, see `select_benchmarks`
+    :param repeat: number of timed runs per benchmark. The fastest run is reported as ``seconds``.
+    :param seed: seed of the generated data and of the evaluator
+    :param timeout: maximum number of seconds per case. The benchmark running when it expires, and the ones after it, are reported as errors.
+    :return: one dictionary per case and benchmark
+    """
+    context = multiprocessing.get_context('spawn')
+    names = [b.name for b in benchmarks]
+    all_results = []
+    for case in cases:
+        print(f'Case {case}', file=sys.stderr)
+        results = context.Queue()
+        process = context.Process(target=_run_case, args=(case, names, repeat, seed, results))
+        process.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        case_results = []
+        while len(case_results) < len(names):
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                result = results.get(timeout=remaining if remaining is not None else 5)
+            except queue.Empty:
+                if (deadline is not None and time.monotonic() >= deadline) or not process.is_alive():
+                    break
+                continue
+            print(f'  {result["benchmark"]}: {result.get("seconds", result.get("error"))}', file=sys.stderr)
+            case_results.append(result)
+        if process.is_alive() and len(case_results) < len(names):
+            process.terminate()
+        process.join()
+        for name in names[len(case_results):]:
+            reason = 'timeout' if deadline is not None and time.monotonic() >= deadline else f'worker exited with code {process.exitcode}'
+            case_results.append({**case, 'benchmark': name, 'error': reason})
+        all_results.extend(case_results)
+    return all_results
+
+
+def compare(baseline: List[Dict], current: List[Dict], threshold: float = 1.2, memory_threshold: float = None,
+            min_seconds: float = 0.01) -> pd.DataFrame:
+    """
+    Compare two lists of results by case and benchmark.
+
+    :param baseline: results of the reference run, e.g. of the previous commit
+    :param current: results of the run to check
+    :param threshold: ratio of the current to the baseline time above which a benchmark is a regression
+    :param memory_threshold: same as ``threshold`` for the peak memory. Memory is not checked if None.
+    :param min_seconds: time differences below this number of seconds are treated as noise
+    :return: DataFrame with one row per case and benchmark measured in both runs, with a boolean ``regression`` column
+    """
+    keys = [*CASE_FIELDS, 'benchmark']
+    columns = [*keys, 'seconds', 'peak_memory_mb']
+    base = pd.DataFrame(baseline).reindex(columns=columns)
+    new = pd.DataFrame(current).reindex(columns=columns)
+    merged = base.merge(new, on=keys, suffixes=('_baseline', '_current'))
+    merged = merged.dropna(subset=['seconds_baseline', 'seconds_current'])
+
+    merged['time_ratio'] = merged['seconds_current'] / merged['seconds_baseline']
+    merged['memory_ratio'] = merged['peak_memory_mb_current'] / merged['peak_memory_mb_baseline']
+    slower = (merged['time_ratio'] > threshold) & (merged['seconds_current'] - merged['seconds_baseline'] > min_seconds)
+    if memory_threshold is not None:
+        slower |= merged['memory_ratio'] > memory_threshold
+    merged['regression'] = slower
+    return merged.set_index(keys)
+
+
+def _grid_cases(args: argparse.Namespace) -> List[Dict]:
+    grid = dict(GRIDS[args.grid])
+    for field in CASE_FIELDS:
+        if getattr(args, field) is not None:
+            grid[field] = getattr(args, field)
+    return [dict(zip(CASE_FIELDS, values)) for values in itertools.product(*[grid[field] for field in CASE_FIELDS])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the benchmarks and write the results to a JSON file')
+    run.add_argument('--grid', choices=list(GRIDS), default='default', help='grid of table shapes, overridden per field by the options below')
+    run.add_argument('--rows', type=int, nargs='+')
+    run.add_argument('--columns', type=int, nargs='+')
+    run.add_argument('--categorical-fraction', dest='categorical_fraction', type=float, nargs='+')
+    run.add_argument('--cardinality', type=int, nargs='+')
+    run.add_argument('--only', nargs='+', help='only run benchmarks whose name contains one of these patterns')
+    run.add_argument('--skip', nargs='+', help='skip benchmarks whose name contains one of these patterns')
+    run.add_argument('--repeat', type=int, default=3)
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--timeout', type=float, default=None, help='maximum number of seconds per case')
+    run.add_argument('--output', type=str, required=True, help='path of the JSON file to write the results to')
+
+    check = commands.add_parser('compare', help='compare two result files and exit with status 1 on a regression')
+    check.add_argument('baseline', type=str)
+    check.add_argument('current', type=str)
+    check.add_argument('--threshold', type=float, default=1.2, help='maximum ratio of the current to the baseline time')
+    check.add_argument('--memory-threshold', type=float, default=None, help='maximum ratio of the current to the baseline peak memory')
+    check.add_argument('--min-seconds', type=float, default=0.01, help='time differences below this are ignored')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        benchmarks = select_benchmarks(args.only, args.skip)
+        results = run_suite(_grid_cases(args), benchmarks, repeat=args.repeat, seed=args.seed, timeout=args.timeout)
+        arguments = {k: v for k, v in vars(args).items() if k not in ('command', 'output')}
+        with open(args.output, 'w') as f:
+            json.dump({'environment': environment(), 'arguments': arguments, 'results': results}, f, indent=2)
+        table = pd.DataFrame(results).set_index([*CASE_FIELDS, 'benchmark'])
+        print(table.drop(columns='times', errors='ignore').to_string(float_format='{:,.4f}'.format))
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    for field in ['commit', 'numpy', 'pandas', 'scipy', 'scikit-learn']:
+        if baseline['environment'].get(field) != current['environment'].get(field):
+            print(f'{field}: {baseline["environment"].get(field)} -> {current["environment"].get(field)}')
+    comparison = compare(baseline['results'], current['results'], threshold=args.threshold, memory_threshold=args.memory_threshold,
+                         min_seconds=args.min_seconds)
+    print(comparison.to_string(float_format='{:,.4f}'.format))
+    regressions = comparison[comparison['regression']]
+    if len(regressions):
+        print(f'\n{len(regressions)} regressions:')
+        print(regressions[['seconds_baseline', 'seconds_current', 'time_ratio', 'memory_ratio']].to_string(float_format='{:,.4f}'.format))
+        sys.exit(1)
+    print('\nNo regressions.')
+
+
+if __name__ == '__main__':
+    main()
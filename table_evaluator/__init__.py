@@ -1,2 +1,5 @@
 from .table_evaluator import TableEvaluator
-from .utils import load_data
\ No newline at end of file
+from .streaming import StreamingTableEvaluator
+from .utils import load_data, read_chunks
+from .profile import RealProfile
+from .multi import MultiTableEvaluator
@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from typing import List, Tuple, Union
+
+
+def _resolve_nominal_columns(dataset: pd.DataFrame, nominal_columns: Union[List, str, None]) -> List:
+    if nominal_columns is None:
+        return []
+    elif isinstance(nominal_columns, str) and nominal_columns == 'all':
+        return dataset.columns.tolist()
+    elif isinstance(nominal_columns, str) and nominal_columns == 'auto':
+        return dataset.select_dtypes(include=['object', 'category']).columns.tolist()
+    return [col for col in dataset.columns if col in set(nominal_columns)]
+
+
+def pearson_matrix(x: np.ndarray) -> np.ndarray:
+    """
+    Pearson's r between all columns of ``x``, computed as a single matrix product of the centered data.
+
+    :param x: 2-D array with one column per variable
+    :return: square matrix of correlation coefficients
+    """
+    centered = x - x.mean(axis=0)
+    comoments = centered.T @ centered
+    norms = np.sqrt(np.diag(comoments))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = comoments / np.outer(norms, norms)
+    return np.clip(corr, -1.0, 1.0)
+
+
+def correlation_ratio_matrix(x: np.ndarray, codes: List[np.ndarray]) -> np.ndarray:
+    """
+    Correlation ratio (eta) between every numerical column of ``x`` and every categorical variable in ``codes``. All categories of all variables are
+    mapped onto one shared integer code space, so the per-category sums of every numerical column come out of a single sparse matrix product.
+
+    :param x: 2-D array with the numerical columns
+    :param codes: list of 1-D integer arrays with the category codes (``0..k-1``) of each categorical variable
+    :return: array of shape ``(x.shape[1], len(codes))``
+    """
+    n_rows = x.shape[0]
+    sizes = np.array([c.max() + 1 for c in codes], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    shared_codes = np.concatenate([c + offset for c, offset in zip(codes, offsets)])
+    indicator = sparse.csr_matrix((np.ones(len(shared_codes), dtype=x.dtype), (np.tile(np.arange(n_rows), len(codes)), shared_codes)),
+                                  shape=(n_rows, int(sizes.sum())))
+
+    centered = x - x.mean(axis=0)
+    group_sums = np.asarray(indicator.T @ centered)
+    group_counts = np.asarray(indicator.sum(axis=0)).ravel()
+    between = np.add.reduceat(group_sums ** 2 / group_counts[:, None], offsets, axis=0).T
+    total = np.sum(centered ** 2, axis=0)[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        eta = np.sqrt(between / total)
+    return np.where(between == 0, 0.0, eta)
+
+
+def contingency_table(codes_a: np.ndarray, codes_b: np.ndarray, size_a: int, size_b: int) -> np.ndarray:
+    """
+    Contingency table of two categorical variables given as integer codes.
+
+    :return: array of shape ``(size_a, size_b)`` with the co-occurrence counts
+    """
+    return np.bincount(codes_a * size_b + codes_b, minlength=size_a * size_b).reshape(size_a, size_b)
+
+
+def sorted_contingency_table(counts_a: np.ndarray, counts_b: np.ndarray) -> sparse.csr_matrix:
+    """
+    Contingency table of two sorted samples paired element by element, i.e. of ``(sorted(a)[i], sorted(b)[i])``, computed from the category counts
+    of each sample alone. Sorted, every category covers a contiguous range of positions, so the pairs split into at most
+    ``len(counts_a) + len(counts_b) - 1`` runs with a single category on each side, and the table is stored sparse. If the samples differ in
+    length, only the first ``min(len(a), len(b))`` pairs are counted, like ``zip``.
+
+    :param counts_a: number of occurrences of each category of ``a``, in sort order
+    :param counts_b: number of occurrences of each category of ``b``, in sort order
+    :return: sparse matrix of shape ``(len(counts_a), len(counts_b))`` with the co-occurrence counts
+    """
+    n_pairs = min(counts_a.sum(), counts_b.sum())
+    bounds_a, bounds_b = np.cumsum(counts_a), np.cumsum(counts_b)
+    ends = np.union1d(bounds_a[bounds_a < n_pairs], bounds_b[bounds_b < n_pairs])
+    starts = np.concatenate([[0], ends])
+    lengths = np.diff(np.concatenate([starts, [n_pairs]]))
+    rows, cols = np.searchsorted(bounds_a, starts, side='right'), np.searchsorted(bounds_b, starts, side='right')
+    return sparse.csr_matrix((lengths, (rows, cols)), shape=(len(counts_a), len(counts_b)))
+
+
+def _entropy(counts: np.ndarray) -> float:
+    p = counts[counts > 0] / counts.sum()
+    return -np.sum(p * np.log(p))
+
+
+def theils_u_from_contingency(table: np.ndarray) -> Tuple[float, float]:
+    """
+    Theil's U in both directions from a contingency table of variables ``a`` (rows) and ``b`` (columns).
+
+    :param table: contingency table as returned by `contingency_table` or `sorted_contingency_table`
+    :return: tuple ``(U(a|b), U(b|a))``
+    """
+    h_a = _entropy(np.asarray(table.sum(axis=1)).ravel())
+    h_b = _entropy(np.asarray(table.sum(axis=0)).ravel())
+    mutual_information = h_a + h_b - _entropy(table.data if sparse.issparse(table) else table.ravel())
+    u_ab = mutual_information / h_a if h_a != 0 else 1.0
+    u_ba = mutual_information / h_b if h_b != 0 else 1.0
+    return u_ab, u_ba
+
+
+def cramers_v_from_contingency(table: np.ndarray, bias_correction: bool = True) -> float:
+    """
+    Cramer's V from a contingency table, including the Yates correction `scipy.stats.chi2_contingency` applies to 2x2 tables.
+
+    :param table: contingency table as returned by `contingency_table` or `sorted_contingency_table`, without empty rows or columns
+    :param bias_correction: use the bias correction from Bergsma and Wicher (2013)
+    :return: Cramer's V, or NaN if the bias-corrected value is undefined
+    """
+    r, k = table.shape
+    dof = (r - 1) * (k - 1)
+    if sparse.issparse(table) and dof > 1:
+        # Only the stored cells contribute to sum((O - E)^2 / E) = sum(O^2 / E) - n, so the dense table is never built.
+        table = sparse.coo_matrix(table, dtype=float)
+        n = table.sum()
+        row_sums, col_sums = np.asarray(table.sum(axis=1)).ravel(), np.asarray(table.sum(axis=0)).ravel()
+        chi2 = np.sum(table.data ** 2 / (row_sums[table.row] * col_sums[table.col] / n)) - n
+    else:
+        table = table.toarray() if sparse.issparse(table) else table
+        table = table.astype(float)
+        n = table.sum()
+        expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+        if dof == 0:
+            chi2 = 0.0
+        else:
+            if dof == 1:
+                diff = expected - table
+                table = table + np.minimum(0.5, np.abs(diff)) * np.sign(diff)
+            chi2 = np.sum((table - expected) ** 2 / expected)
+    phi2 = chi2 / n
+    if bias_correction:
+        phi2corr = max(0, phi2 - ((k - 1) * (r - 1)) / (n - 1))
+        rcorr = r - ((r - 1) ** 2) / (n - 1)
+        kcorr = k - ((k - 1) ** 2) / (n - 1)
+        if min((kcorr - 1), (rcorr - 1)) == 0:
+            return np.nan
+        return np.sqrt(phi2corr / min((kcorr - 1), (rcorr - 1)))
+    return np.sqrt(phi2 / min(k - 1, r - 1))
+
+
+def compute_associations(dataset: pd.DataFrame, nominal_columns: Union[List, str, None] = 'auto', mark_columns: bool = False, theil_u: bool = False,
+                         bias_correction: bool = True, nan_replace_value=0.0, dtype=float) -> pd.DataFrame:
+    """
+    Vectorized drop-in replacement for `dython.nominal.compute_associations`. Calculates the strength of association between all columns of a dataset
+    with both categorical and continuous features:
+
+    - Continuous - Continuous: Pearson's r, computed for all pairs with a single matrix product.
+    - Continuous - Categorical: correlation ratio, computed from per-category sums over shared integer codes.
+    - Categorical - Categorical: Theil's U (or Cramer's V), computed from contingency tables built with `np.bincount`.
+
+    Like dython, missing values are replaced by ``nan_replace_value``, columns holding a single value get an association of 0 with every column and
+    NaN or infinite associations are reported as 0. For Theil's U, the entry at row ``i`` and column ``j`` is ``U(j|i)``.
+
+    :param dataset: DataFrame for which the associations are computed
+    :param nominal_columns: columns holding categorical values. Can also be ``all``, ``auto`` (object and category dtypes) or None.
+    :param mark_columns: suffix column names with ``(nom)`` or ``(con)``
+    :param theil_u: use Theil's U instead of Cramer's V for categorical-categorical pairs
+    :param bias_correction: use bias correction for Cramer's V
+    :param nan_replace_value: value used to replace missing values
+    :param dtype: floating point type the numerical columns are computed in, e.g. ``np.float32`` to halve the memory traffic
+    :return: DataFrame with the associations between all columns
+    """
+    columns = dataset.columns.tolist()
+    nominal_columns = _resolve_nominal_columns(dataset, nominal_columns)
+    nominal_set = set(nominal_columns)
+    corr = np.zeros((len(columns), len(columns)))
+
+    codes = {}
+    numerical = {}
+    for col in columns:
+        if col in nominal_set:
+            col_codes, uniques = pd.factorize(dataset[col], use_na_sentinel=False)
+            if len(uniques) > 1:
+                codes[col] = col_codes.astype(np.int64)
+        else:
+            values = dataset[col].fillna(nan_replace_value).to_numpy(dtype=dtype)
+            if len(values) > 0 and not np.all(values == values[0]):
+                numerical[col] = values
+    position = {col: i for i, col in enumerate(columns)}
+
+    num_idx = [position[col] for col in numerical]
+    nom_idx = [position[col] for col in codes]
+    corr[num_idx + nom_idx, num_idx + nom_idx] = 1.0
+
+    if numerical:
+        x = np.column_stack(list(numerical.values()))
+        corr[np.ix_(num_idx, num_idx)] = pearson_matrix(x)
+        if codes:
+            eta = correlation_ratio_matrix(x, list(codes.values()))
+            corr[np.ix_(num_idx, nom_idx)] = eta
+            corr[np.ix_(nom_idx, num_idx)] = eta.T
+
+    nominal = list(codes.items())
+    sizes = {col: int(c.max()) + 1 for col, c in nominal}
+    for a in range(len(nominal)):
+        col_a, codes_a = nominal[a]
+        for b in range(a + 1, len(nominal)):
+            col_b, codes_b = nominal[b]
+            table = contingency_table(codes_a, codes_b, sizes[col_a], sizes[col_b])
+            if theil_u:
+                u_ab, u_ba = theils_u_from_contingency(table)
+                corr[position[col_a], position[col_b]] = u_ba
+                corr[position[col_b], position[col_a]] = u_ab
+            else:
+                cell = cramers_v_from_contingency(table, bias_correction=bias_correction)
+                corr[position[col_a], position[col_b]] = cell
+                corr[position[col_b], position[col_a]] = cell
+
+    corr[~np.isfinite(corr)] = 0.0
+    if mark_columns:
+        columns = [f'{col} (nom)' if col in nominal_set else f'{col} (con)' for col in columns]
+    return pd.DataFrame(corr, index=columns, columns=columns)
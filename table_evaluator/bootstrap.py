@@ -0,0 +1,412 @@
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from scipy import sparse, stats
+from scipy.spatial.distance import jensenshannon
+from typing import Dict, List
+from .associations import sorted_contingency_table, theils_u_from_contingency
+from .metrics import _bin_codes, js_bin_edges
+from .neighbors import DEFAULT_MEMORY_BUDGET
+
+BOOTSTRAP_METRICS = ('basic_statistics', 'correlation_correlation', 'column_correlations', 'estimators', 'js_distance', 'ks_test')
+
+# Size of the first batch under a time budget, which measures the cost of a replicate.
+_PROBE_REPLICATES = 8
+
+
+def resample_counts(rng: np.random.Generator, n_rows: int, n_replicates: int) -> np.ndarray:
+    """
+    Draw ``n_replicates`` resamples of ``n_rows`` rows with replacement as an index matrix, and count how often every row is drawn in each
+    resample. Rows are drawn one replicate after the other, so the first replicates do not depend on how many are drawn at once.
+
+    :return: integer array of shape ``(n_replicates, n_rows)``
+    """
+    index = rng.integers(0, n_rows, size=(n_replicates, n_rows))
+    index += np.arange(n_replicates)[:, None] * n_rows
+    return np.bincount(index.ravel(), minlength=n_replicates * n_rows).reshape(n_replicates, n_rows)
+
+
+def _row_pearson(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Pearson's r between every row of ``a`` and the same row of ``b``. Constant rows give NaN.
+    """
+    a = a - a.mean(axis=1, keepdims=True)
+    b = b - b.mean(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = np.einsum('ij,ij->i', a, b) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    return np.clip(corr, -1.0, 1.0)
+
+
+def _weighted_sums(weights: np.ndarray, indicator: sparse.csr_matrix) -> np.ndarray:
+    """
+    Sum of the weights of the rows in every column of a sparse indicator matrix, for every row of ``weights`` at once.
+
+    :return: array of shape ``(len(weights), indicator.shape[1])``
+    """
+    return np.asarray(indicator.T @ weights.T).T
+
+
+def _segment_entropies(counts: np.ndarray, offsets: np.ndarray, total: int) -> np.ndarray:
+    """
+    Entropy of the distribution of the counts in every segment of the columns of ``counts``, for every row. Segments start at ``offsets`` and
+    every segment of a row sums to ``total``.
+    """
+    p = counts / total
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = np.where(p > 0, p * np.log(p), 0.0)
+    return -np.add.reduceat(terms, offsets, axis=1)
+
+
+def _indicator(codes: np.ndarray, n_columns: int) -> sparse.csr_matrix:
+    """
+    Sparse matrix with a one in every row at the column given by ``codes``, for 2-D ``codes`` one per column of ``codes``.
+    """
+    codes = codes.reshape(len(codes), -1)
+    rows = np.repeat(np.arange(len(codes)), codes.shape[1])
+    return sparse.csr_matrix((np.ones(codes.size), (rows, codes.ravel())), shape=(len(codes), n_columns))
+
+
+class _Sample:
+    """
+    Arrays of the real or the fake sample of an `encoding.EncodedData` that the replicates of `Bootstrap` are computed from.
+    """
+
+    def __init__(self, encoding, dataset: str, js_edges: np.ndarray):
+        numerical = [encoding.columns.index(col) for col in encoding.numerical_columns]
+        self.values = encoding.ordinal(dataset)[:, numerical]
+        self.n_rows = len(self.values)
+        self.mean = self.values.mean(axis=0)
+        self.centered = self.values - self.mean
+        self.squared = self.centered ** 2
+        self.order = np.argsort(self.values, axis=0, kind='stable')
+        self.sorted = np.take_along_axis(self.values, self.order, axis=0)
+
+        sizes = np.array([encoding.codebook.size(col) for col in encoding.categorical_columns], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+        codes = getattr(encoding, f'{dataset}_codes')
+        self.categories = _indicator(codes + self.offsets, int(sizes.sum()))
+        # Joint categories of every pair of categorical columns, only those that occur, for Theil's U.
+        self.pairs = []
+        for a in range(codes.shape[1]):
+            for b in range(a + 1, codes.shape[1]):
+                # Compact codes of float32 mode are small unsigned integers, which the product of two sizes would overflow.
+                joint_codes, uniques = pd.factorize(codes[:, a].astype(np.int64) * sizes[b] + codes[:, b])
+                self.pairs.append((a, b, _indicator(joint_codes, len(uniques))))
+
+        n_bins = js_edges.shape[1] - 1
+        bin_codes = _bin_codes(self.values, js_edges, uniform=True) + np.arange(len(numerical)) * (n_bins + 2)
+        self.bins = _indicator(bin_codes, len(numerical) * (n_bins + 2))
+
+
+class Bootstrap:
+    """
+    Bootstrap replicates of the metrics of a `TableEvaluator`. A replicate resamples the rows of the real and of the fake sample independently,
+    with replacement, and is represented by how often every row is drawn. The metrics of a batch of replicates are weighted sums over arrays
+    prepared once, so no DataFrame is resampled and no metric is recomputed from scratch per replicate:
+
+    - ``basic_statistics``: weighted moments, and medians from cumulative counts over the sorted columns, compared with Spearman's rho.
+    - ``correlation_correlation``: weighted Pearson's r, correlation ratios and Theil's U from sparse category indicators.
+    - ``column_correlations``: the sorted resamples follow from the counts over the sorted columns, category counts for categorical columns.
+    - ``js_distance``: weighted bin counts, on the bins of the full real sample.
+    - ``ks_test``: weighted empirical CDFs over the merged sorted columns.
+    - ``estimators``: the estimators fitted by `TableEvaluator.estimator_evaluation` predict their test sets once, and the replicates resample
+      the test rows. Refitting is left out, so the intervals cover the variation of the test sets only. With ``kfold``, the last fold is used.
+
+    With all rows drawn once, every metric equals its value in `TableEvaluator.evaluate`, except the estimators after a ``kfold`` evaluation.
+    """
+
+    def __init__(self, evaluator, metrics: List[str] = None, target_col: str = None, target_type: str = 'class'):
+        """
+        :param evaluator: `TableEvaluator` to bootstrap
+        :param metrics: names of the metrics, from ``BOOTSTRAP_METRICS``. All of them by default, without ``estimators`` if there is no
+            ``target_col``.
+        :param target_col: target of the estimators. The estimators of the evaluator are fitted first if they were not for this target.
+        :param target_type: ``class`` or ``regr``
+        """
+        if metrics is None:
+            metrics = [name for name in BOOTSTRAP_METRICS if name != 'estimators' or target_col is not None]
+        unknown = [name for name in metrics if name not in BOOTSTRAP_METRICS]
+        if unknown:
+            raise ValueError(f'Unknown metrics {unknown}, choose from {list(BOOTSTRAP_METRICS)}.')
+        if 'estimators' in metrics and target_col is None:
+            raise ValueError('Bootstrapping the estimators needs a `target_col`.')
+        self.metrics = list(metrics)
+        self.target_type = target_type
+        self.comparison_metric = evaluator.comparison_metric
+
+        encoding = evaluator.encoding
+        self.columns = encoding.columns
+        self.numerical = np.array([encoding.columns.index(col) for col in encoding.numerical_columns], dtype=np.int64)
+        self.nominal = np.array([encoding.columns.index(col) for col in encoding.categorical_columns], dtype=np.int64)
+        self.n_rows = evaluator.n_samples
+        if evaluator.profile is not None:
+            js_edges = evaluator.profile.js_edges
+        else:
+            js_edges = js_bin_edges(encoding.ordinal('real')[:, self.numerical])
+        self.real, self.fake = _Sample(encoding, 'real', js_edges), _Sample(encoding, 'fake', js_edges)
+
+        # Merged sort order of every numerical column, with the positions that end a run of ties, for the KS statistic.
+        merged = np.concatenate([self.real.values, self.fake.values]).T
+        self.ks_order = np.argsort(merged, axis=1, kind='stable')
+        merged = np.take_along_axis(merged, self.ks_order, axis=1)
+        self.ks_last_of_value = np.ones(merged.shape, dtype=bool)
+        np.not_equal(merged[:, 1:], merged[:, :-1], out=self.ks_last_of_value[:, :-1])
+
+        self.test_rows = 0
+        if 'estimators' in self.metrics:
+            self._prepare_estimators(evaluator, target_col, target_type)
+
+    def _prepare_estimators(self, evaluator, target_col: str, target_type: str):
+        """
+        Predict the test sets of the fitted estimators of ``evaluator``, fitting them first if needed, and keep the hits (``class``) or the
+        squared errors (``regr``) of every estimator on every test row.
+        """
+        if getattr(evaluator, 'target_col', None) != target_col or getattr(evaluator, 'target_type', None) != target_type or \
+                not hasattr(evaluator, 'f_estimators'):
+            evaluator.estimator_evaluation(target_col, target_type=target_type)
+        x = {'real': evaluator.real_x_test, 'fake': evaluator.fake_x_test}
+        y = {'real': evaluator.real_y_test.to_numpy(), 'fake': evaluator.fake_y_test.to_numpy()}
+        self.test_rows = len(y['real'])
+        self.test_scores = {}
+        for trained_on, estimators in [('real', evaluator.r_estimators), ('fake', evaluator.f_estimators)]:
+            for tested_on in ['real', 'fake']:
+                predictions = np.array([estimator.predict(x[tested_on]) for estimator in estimators])
+                if target_type == 'class':
+                    self.test_scores[trained_on, tested_on] = (predictions == y[tested_on]).astype(float)
+                else:
+                    self.test_scores[trained_on, tested_on] = (predictions - y[tested_on]) ** 2
+
+    def _weighted(self, sample: _Sample, counts: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Weighted statistics of one sample shared by the metrics of a batch: the weights, the shift of the mean, the median and whether a
+        column is constant, per numerical column, and the number of occurrences of every category.
+        """
+        n = self.n_rows
+        weights = counts.astype(float)
+        state = {'weights': weights, 'shift': weights @ sample.centered / n}
+        if {'basic_statistics', 'correlation_correlation'} & set(self.metrics):
+            medians = np.empty((len(counts), len(self.numerical)))
+            constant = np.empty((len(counts), len(self.numerical)), dtype=bool)
+            for j in range(len(self.numerical)):
+                drawn = np.cumsum(counts[:, sample.order[:, j]], axis=1)
+                lower, upper = np.argmax(drawn > (n - 1) // 2, axis=1), np.argmax(drawn > n // 2, axis=1)
+                medians[:, j] = (sample.sorted[lower, j] + sample.sorted[upper, j]) / 2
+                first, last = np.argmax(drawn > 0, axis=1), np.argmax(drawn >= n, axis=1)
+                constant[:, j] = sample.sorted[first, j] == sample.sorted[last, j]
+            state['median'], state['constant'] = medians, constant
+        state['category_counts'] = _weighted_sums(weights, sample.categories)
+        return state
+
+    def _summary(self, sample: _Sample, state: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Mean, median, standard deviation and variance of every numerical column, as compared by `TableEvaluator.basic_statistical_evaluation`.
+        """
+        n, shift = self.n_rows, state['shift']
+        variance = (state['weights'] @ sample.squared / n - shift ** 2) * n / (n - 1)
+        return np.hstack([sample.mean + shift, state['median'], np.sqrt(variance), variance])
+
+    def _associations(self, sample: _Sample, state: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Off-diagonal entries of the association matrix of every replicate, as `associations.compute_associations` computes them with Theil's U.
+
+        :return: array of shape ``(n_replicates, n_columns * (n_columns - 1))``, in the order of `TableEvaluator.correlation_correlation`
+        """
+        n, weights, shift, counts = self.n_rows, state['weights'], state['shift'], state['category_counts']
+        n_replicates, n_columns = len(weights), len(self.columns)
+        corr = np.zeros((n_replicates, n_columns, n_columns))
+        constant = np.zeros((n_replicates, n_columns), dtype=bool)
+
+        if len(self.numerical):
+            comoments = np.empty((n_replicates, len(self.numerical), len(self.numerical)))
+            for i in range(len(self.numerical)):
+                comoments[:, i] = (weights * sample.centered[:, i]) @ sample.centered
+            comoments -= n * shift[:, :, None] * shift[:, None, :]
+            variances = np.diagonal(comoments, axis1=1, axis2=2)
+            norms = np.sqrt(variances)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                corr[:, self.numerical[:, None], self.numerical] = np.clip(comoments / (norms[:, :, None] * norms[:, None, :]), -1.0, 1.0)
+            constant[:, self.numerical] = state['constant']
+
+        if len(self.nominal):
+            constant[:, self.nominal] = np.add.reduceat(counts > 0, sample.offsets, axis=1) <= 1
+            for i in range(len(self.numerical)):
+                group_sums = _weighted_sums(weights * sample.centered[:, i], sample.categories)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    between = np.add.reduceat(np.where(counts > 0, group_sums ** 2 / counts, 0.0), sample.offsets, axis=1)
+                    between = np.maximum(between - n * shift[:, i:i + 1] ** 2, 0.0)
+                    eta = np.where(between == 0, 0.0, np.sqrt(between / variances[:, i:i + 1]))
+                corr[:, self.numerical[i], self.nominal] = eta
+                corr[:, self.nominal, self.numerical[i]] = eta
+            entropies = _segment_entropies(counts, sample.offsets, n)
+            for a, b, joint in sample.pairs:
+                joint_entropies = _segment_entropies(_weighted_sums(weights, joint), np.zeros(1, dtype=np.int64), n)[:, 0]
+                mutual_information = entropies[:, a] + entropies[:, b] - joint_entropies
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    corr[:, self.nominal[a], self.nominal[b]] = mutual_information / entropies[:, b]
+                    corr[:, self.nominal[b], self.nominal[a]] = mutual_information / entropies[:, a]
+
+        corr[~np.isfinite(corr)] = 0.0
+        # Like dython, columns holding a single value are associated with nothing.
+        corr *= ~(constant[:, :, None] | constant[:, None, :])
+        return corr[:, ~np.eye(n_columns, dtype=bool)]
+
+    def _column_correlations(self, real: Dict[str, np.ndarray], fake: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        `metrics.column_correlations` of every replicate. The sorted resample of a column repeats every value of the sorted column as often as
+        its row was drawn.
+        """
+        n_replicates = len(real['weights'])
+        correlations = np.empty((n_replicates, len(self.columns)))
+        positions = np.tile(np.arange(self.n_rows), n_replicates)
+        for j in range(len(self.numerical)):
+            resampled = []
+            for sample, state in [(self.real, real), (self.fake, fake)]:
+                drawn = np.repeat(positions, state['weights'][:, sample.order[:, j]].astype(np.int64).ravel())
+                resampled.append(sample.sorted[drawn.reshape(n_replicates, self.n_rows), j])
+            correlations[:, j] = _row_pearson(*resampled)
+
+        # Categorical columns are sorted by their codes, so the category counts in code order determine the sorted contingency table.
+        real_counts, fake_counts = np.rint(real['category_counts']).astype(np.int64), np.rint(fake['category_counts']).astype(np.int64)
+        bounds = np.append(self.real.offsets, real_counts.shape[1])
+        for k in range(len(self.nominal)):
+            for i in range(n_replicates):
+                table = sorted_contingency_table(real_counts[i, bounds[k]:bounds[k + 1]], fake_counts[i, bounds[k]:bounds[k + 1]])
+                correlations[i, len(self.numerical) + k] = theils_u_from_contingency(table)[0]
+        return correlations.mean(axis=1)
+
+    def _js_distances(self, real: Dict[str, np.ndarray], fake: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Jensen-Shannon distance of every numerical column in every replicate, on the bins of the full real sample.
+        """
+        n_columns = len(self.numerical)
+        probabilities = []
+        for sample, state in [(self.real, real), (self.fake, fake)]:
+            counts = _weighted_sums(state['weights'], sample.bins).reshape(len(state['weights']), n_columns, -1)[:, :, 1:-1]
+            totals = counts.sum(axis=2, keepdims=True)
+            probabilities.append(np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0))
+        return jensenshannon(*probabilities, axis=2)
+
+    def _ks_statistics(self, real: Dict[str, np.ndarray], fake: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Kolmogorov-Smirnov statistic of every numerical column in every replicate, from the weighted empirical CDFs over the merged columns.
+        """
+        weights = np.concatenate([real['weights'], -fake['weights']], axis=1) / self.n_rows
+        statistics = np.empty((len(weights), len(self.numerical)))
+        for j in range(len(self.numerical)):
+            differences = np.cumsum(weights[:, self.ks_order[j]], axis=1)[:, self.ks_last_of_value[j]]
+            statistics[:, j] = np.abs(differences).max(axis=1)
+        return statistics
+
+    def _estimator_scores(self, real_test: np.ndarray, fake_test: np.ndarray) -> np.ndarray:
+        """
+        Score of `TableEvaluator.estimator_evaluation` on every replicate of the test sets: ``1 - MAPE`` of the F1 scores (micro-averaged, i.e. the
+        accuracy) for ``class``, the comparison metric of the RMSE scores for ``regr``.
+        """
+        weights = {'real': real_test.astype(float), 'fake': fake_test.astype(float)}
+        scores = {key: values @ weights[key[1]].T for key, values in self.test_scores.items()}
+        if self.target_type == 'class':
+            scores = {key: value / self.test_rows for key, value in scores.items()}
+            f1_real = np.concatenate([scores['real', 'real'], scores['real', 'fake']])
+            f1_fake = np.concatenate([scores['fake', 'real'], scores['fake', 'fake']])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return 1 - np.mean(np.abs((f1_real - f1_fake) / f1_real), axis=0)
+        scores = {key: np.sqrt(value) for key, value in scores.items()}
+        on_real = np.concatenate([scores['real', 'real'], scores['fake', 'real']])
+        on_fake = np.concatenate([scores['real', 'fake'], scores['fake', 'fake']])
+        return np.array([self.comparison_metric(on_real[:, i], on_fake[:, i])[0] for i in range(on_real.shape[1])])
+
+    def evaluate(self, real_counts: np.ndarray, fake_counts: np.ndarray, real_test_counts: np.ndarray = None,
+                 fake_test_counts: np.ndarray = None) -> Dict[str, np.ndarray]:
+        """
+        Metrics of a batch of replicates.
+
+        :param real_counts: how often every real row is drawn, one row per replicate
+        :param fake_counts: how often every fake row is drawn
+        :param real_test_counts: how often every row of the real test set of the estimators is drawn, for ``estimators``
+        :param fake_test_counts: how often every row of the fake test set is drawn
+        :return: dictionary from metric name to an array with one value per replicate, or one row per replicate with a value per numerical
+            column for ``js_distance`` and ``ks_test``
+        """
+        real, fake = self._weighted(self.real, real_counts), self._weighted(self.fake, fake_counts)
+        results = {}
+        if 'basic_statistics' in self.metrics:
+            ranks = [stats.rankdata(self._summary(sample, state), axis=1) for sample, state in [(self.real, real), (self.fake, fake)]]
+            results['basic_statistics'] = _row_pearson(*ranks)
+        if 'correlation_correlation' in self.metrics:
+            real_associations, fake_associations = self._associations(self.real, real), self._associations(self.fake, fake)
+            results['correlation_correlation'] = np.array([self.comparison_metric(r, f)[0] for r, f in zip(real_associations, fake_associations)])
+        if 'column_correlations' in self.metrics:
+            results['column_correlations'] = self._column_correlations(real, fake)
+        if 'estimators' in self.metrics:
+            results['estimators'] = self._estimator_scores(real_test_counts, fake_test_counts)
+        if 'js_distance' in self.metrics:
+            results['js_distance'] = self._js_distances(real, fake)
+        if 'ks_test' in self.metrics:
+            results['ks_test'] = self._ks_statistics(real, fake)
+        return results
+
+    def estimates(self) -> Dict[str, np.ndarray]:
+        """
+        Metrics of the samples themselves, as a batch of one replicate that draws every row once.
+        """
+        rows = [self.n_rows, self.n_rows] + ([self.test_rows, self.test_rows] if self.test_rows else [])
+        return self.evaluate(*[np.ones((1, n_rows), dtype=np.int64) for n_rows in rows])
+
+    def replicates(self, n_replicates: int = 200, time_budget: float = None, seed: int = None,
+                   memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Dict[str, np.ndarray]:
+        """
+        Draw bootstrap replicates and compute their metrics, batch by batch. The real rows, the fake rows and both test sets are drawn from
+        independent streams of ``seed``, so a replicate does not depend on the batch it is computed in.
+
+        :param n_replicates: number of replicates
+        :param time_budget: seconds to spend at most. Under a budget, a small first batch measures the time per replicate, and the replicates
+            are cut off at the number that fits. At least that first batch is computed.
+        :param seed: seed of the resamples
+        :param memory_budget: approximate number of bytes of the temporary arrays of a batch
+        :return: dictionary from metric name to the values of all replicates, see `evaluate`
+        """
+        if n_replicates < 1:
+            raise ValueError(f'`n_replicates` must be at least 1, but is {n_replicates}.')
+        streams = [np.random.default_rng(sequence) for sequence in np.random.SeedSequence(seed).spawn(4)]
+        rows = [self.n_rows, self.n_rows] + ([self.test_rows, self.test_rows] if self.test_rows else [])
+        # A replicate holds a few arrays of counts, weights and resampled values per row.
+        memory_batch_size = int(np.clip(memory_budget // (64 * self.n_rows + 16 * self.test_rows + 1), 1, n_replicates))
+        batch_size = memory_batch_size if time_budget is None else min(memory_batch_size, _PROBE_REPLICATES)
+
+        start, done, batches = time.perf_counter(), 0, []
+        while done < n_replicates:
+            size = min(batch_size, n_replicates - done)
+            if time_budget is not None and done:
+                elapsed = time.perf_counter() - start
+                size = min(size, int((time_budget - elapsed) / (elapsed / done)))
+                if size < 1:
+                    break
+                # Past the probe, batches grow back to the memory budget.
+                batch_size = memory_batch_size
+            batches.append(self.evaluate(*[resample_counts(rng, n_rows, size) for rng, n_rows in zip(streams, rows)]))
+            done += size
+        return {name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]}
+
+
+def bootstrap_intervals(replicates: pd.DataFrame, estimates: pd.Series, confidence: float = 0.95) -> pd.DataFrame:
+    """
+    Percentile confidence intervals of bootstrap replicates. Replicates for which a metric is undefined (NaN) are left out of its interval.
+
+    :param replicates: one row per replicate and one column per metric
+    :param estimates: value of every metric on the original samples
+    :param confidence: coverage of the intervals
+    :return: DataFrame indexed by metric with the columns ``estimate``, ``mean``, ``std``, ``lower``, ``upper`` and ``replicates``, the number of
+        replicates the metric is defined in
+    """
+    if not 0 < confidence < 1:
+        raise ValueError(f'`confidence` must lie between 0 and 1, but is {confidence}.')
+    alpha = (1 - confidence) / 2
+    values = replicates.to_numpy(dtype=float)
+    defined = np.isfinite(values).sum(axis=0)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        lower, upper = np.nanquantile(values, [alpha, 1 - alpha], axis=0) if len(values) else (np.full(values.shape[1], np.nan),) * 2
+        mean, std = np.nanmean(values, axis=0), np.nanstd(values, axis=0, ddof=1)
+    return pd.DataFrame({'estimate': estimates.reindex(replicates.columns).to_numpy(dtype=float), 'mean': mean, 'std': std, 'lower': lower,
+                         'upper': upper, 'replicates': defined}, index=replicates.columns)
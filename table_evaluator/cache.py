@@ -0,0 +1,60 @@
+import pandas as pd
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class AssociationCache:
+    """
+    Memoizes association matrices per dataset. Entries are keyed by the name of the dataset (``real`` or ``fake``), the set of nominal columns
+    and the categorical association measure, so a lookup costs no pass over the data. The owner drops the entries of a dataset with `invalidate`
+    whenever its contents change.
+    """
+
+    def __init__(self):
+        self._store: Dict[Tuple[str, Tuple, bool], pd.DataFrame] = {}
+
+    @staticmethod
+    def key(dataset: str, nominal_columns: Optional[List], theil_u: bool = True) -> Tuple[str, Tuple, bool]:
+        """
+        Build the cache key for ``dataset``.
+
+        :param dataset: name of the dataset the associations are computed on
+        :param nominal_columns: columns treated as nominal
+        :param theil_u: whether Theil's U (True) or Cramer's V (False) is used for nominal-nominal pairs
+        :return: hashable key
+        """
+        nominal = tuple(sorted(map(str, nominal_columns))) if nominal_columns is not None else ()
+        return dataset, nominal, theil_u
+
+    def get(self, dataset: str, nominal_columns: Optional[List], compute: Callable[[], pd.DataFrame],
+            theil_u: bool = True) -> pd.DataFrame:
+        """
+        Return the association matrix of ``dataset``, computing and storing it with ``compute`` on a cache miss.
+
+        :param dataset: name of the dataset the associations are computed on
+        :param nominal_columns: columns treated as nominal
+        :param compute: callable without arguments returning the association matrix
+        :param theil_u: whether Theil's U (True) or Cramer's V (False) is used for nominal-nominal pairs
+        :return: copy of the cached association matrix
+        """
+        key = self.key(dataset, nominal_columns, theil_u)
+        if key not in self._store:
+            self._store[key] = compute()
+        return self._store[key].copy()
+
+    def invalidate(self, dataset: str = None):
+        """
+        Drop cached matrices. If ``dataset`` is given only the entries computed for that dataset are removed, otherwise the whole cache is cleared.
+
+        :param dataset: optional name of the dataset whose entries should be dropped
+        """
+        if dataset is None:
+            self._store.clear()
+            return
+        for key in [k for k in self._store if k[0] == dataset]:
+            del self._store[key]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._store
+
+    def __len__(self) -> int:
+        return len(self._store)
@@ -0,0 +1,268 @@
+import warnings
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Sequence, Tuple, Union
+from .sketches import KLLSketch, QuantileView
+
+QUANTILE_MODES = ('exact', 'sketch', None)
+
+
+def block_moments(values: np.ndarray, block_rows: int = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Count, mean, sum of squared deviations (M2), minimum and maximum of every column of ``values`` in one pass. Rows are processed in blocks small
+    enough to stay in cache, so every block is read from memory once, and the per-block moments are combined with the parallel update of Chan et al.
+    Missing values are skipped.
+
+    :param values: 2-D array with one column per variable
+    :param block_rows: number of rows per block. By default blocks hold about 64k values.
+    :return: tuple of 1-D arrays ``(count, mean, m2, minimum, maximum)``. Columns without values have a NaN mean, minimum and maximum.
+    """
+    n_rows, n_columns = values.shape
+    block_rows = block_rows or max(1024, 65536 // max(n_columns, 1))
+    n_blocks = max(-(-n_rows // block_rows), 1)
+    count, mean, m2 = np.zeros((n_blocks, n_columns)), np.zeros((n_blocks, n_columns)), np.zeros((n_blocks, n_columns))
+    minimum, maximum = np.full((n_blocks, n_columns), np.nan), np.full((n_blocks, n_columns), np.nan)
+    for i, start in enumerate(range(0, n_rows, block_rows)):
+        block = values[start:start + block_rows]
+        missing = np.isnan(block)
+        if missing.any():
+            count[i] = len(block) - missing.sum(axis=0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean[i] = np.where(missing, 0.0, block).sum(axis=0) / count[i]
+            deviations = np.where(missing, 0.0, block - mean[i])
+            minimum[i], maximum[i] = np.fmin.reduce(block, axis=0), np.fmax.reduce(block, axis=0)
+        else:
+            count[i] = len(block)
+            mean[i] = block.sum(axis=0) / len(block)
+            deviations = block - mean[i]
+            minimum[i], maximum[i] = block.min(axis=0), block.max(axis=0)
+        m2[i] = np.einsum('ij,ij->j', deviations, deviations)
+
+    total = count.sum(axis=0)
+    weights = np.divide(count, total, out=np.zeros_like(count), where=total > 0)
+    mean = np.where(count > 0, mean, 0.0)
+    total_mean = np.where(total > 0, (weights * mean).sum(axis=0), np.nan)
+    total_m2 = m2.sum(axis=0) + (count * (mean - np.nan_to_num(total_mean)) ** 2).sum(axis=0)
+    return total, total_mean, total_m2, np.fmin.reduce(minimum, axis=0), np.fmax.reduce(maximum, axis=0)
+
+
+def _combine_moments(count_a, mean_a, m2_a, count_b, mean_b, m2_b) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    count = count_a + count_b
+    delta = np.nan_to_num(mean_b) - np.nan_to_num(mean_a)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(count > 0, count_b / count, 0.0)
+        mean = np.where(count > 0, np.nan_to_num(mean_a) + delta * ratio, np.nan)
+        m2 = m2_a + m2_b + np.where(count > 0, delta ** 2 * count_a * ratio, 0.0)
+    return count, mean, m2
+
+
+class DescriptiveStatistics:
+    """
+    Descriptive statistics of the columns of one dataset, shared by `TableEvaluator.basic_statistical_evaluation`, `viz.plot_mean_std` and the
+    streaming evaluator:
+
+    - per numerical column the count, mean and M2 (so variance and standard deviation need no extra pass), minimum and maximum, from `block_moments`;
+    - quantiles, either exact at fixed ``levels`` or from a `KLLSketch` per column;
+    - per categorical column the number of occurrences of every category.
+
+    Statistics are built with `update` and can be combined with `merge`, e.g. over the chunks of a dataset. Exact quantiles cannot be merged; use
+    ``quantiles='sketch'`` for statistics that are built from several parts.
+    """
+
+    def __init__(self, numerical_columns: List, categorical_columns: List = None, quantiles: Union[str, None] = 'exact',
+                 levels: Sequence[float] = (0.5,), sketch_size: int = 2000, seed: int = None):
+        """
+        :param numerical_columns: columns treated as numerical
+        :param categorical_columns: columns treated as categorical
+        :param quantiles: ``exact`` to compute the quantiles at ``levels`` from the data, ``sketch`` to keep a `KLLSketch` per column, or None
+        :param levels: quantile levels computed by ``quantiles='exact'``
+        :param sketch_size: ``k`` of the sketches of ``quantiles='sketch'``
+        :param seed: seed for the sketches
+        """
+        if quantiles not in QUANTILE_MODES:
+            raise ValueError(f'`quantiles` must be one of {QUANTILE_MODES}, got {quantiles}')
+        self.numerical_columns = list(numerical_columns)
+        self.categorical_columns = list(categorical_columns or [])
+        self.quantile_mode = quantiles
+        self.levels = tuple(levels)
+
+        p = len(self.numerical_columns)
+        self.count, self.mean, self.m2 = np.zeros(p), np.full(p, np.nan), np.zeros(p)
+        self.minimum, self.maximum = np.full(p, np.nan), np.full(p, np.nan)
+        self.exact_quantiles: Dict[float, np.ndarray] = None
+        rng = np.random.default_rng(seed)
+        self.sketches: Dict[str, Union[KLLSketch, QuantileView]] = None
+        if quantiles == 'sketch':
+            self.sketches = {col: KLLSketch(sketch_size, seed=rng.integers(2 ** 32)) for col in self.numerical_columns}
+        self.categories: Dict[str, np.ndarray] = {col: np.empty(0, dtype=object) for col in self.categorical_columns}
+        self.category_counts: Dict[str, np.ndarray] = {col: np.zeros(0) for col in self.categorical_columns}
+        self._updates = 0
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, numerical_columns: List, categorical_columns: List = None, **kwargs) -> 'DescriptiveStatistics':
+        """
+        Statistics of a DataFrame. Categorical columns are factorized in sort order.
+
+        :param kwargs: passed to the constructor
+        """
+        statistics = cls(numerical_columns, categorical_columns, **kwargs)
+        codes, categories = [], []
+        for col in statistics.categorical_columns:
+            col_codes, uniques = pd.factorize(data[col], sort=True, use_na_sentinel=False)
+            codes.append(col_codes)
+            categories.append(np.asarray(uniques, dtype=object))
+        codes = np.column_stack(codes) if codes else None
+        return statistics.update(data[statistics.numerical_columns].to_numpy(dtype=float), codes, categories)
+
+    @classmethod
+    def from_encoding(cls, encoding, dataset: str, **kwargs) -> 'DescriptiveStatistics':
+        """
+        Statistics of the real or fake data of an `encoding.EncodedData`. Category counts use the shared codebook, so they line up between the
+        statistics of both datasets.
+
+        :param encoding: `EncodedData` of a `TableEvaluator`
+        :param dataset: ``real`` or ``fake``
+        :param kwargs: passed to the constructor
+        """
+        statistics = cls(encoding.numerical_columns, encoding.categorical_columns, **kwargs)
+        position = [encoding.columns.index(col) for col in encoding.numerical_columns]
+        categories = [encoding.codebook[col] for col in encoding.categorical_columns]
+        return statistics.update(encoding.ordinal(dataset)[:, position], getattr(encoding, f'{dataset}_codes'), categories)
+
+    @classmethod
+    def from_moments(cls, numerical_columns: List, count: np.ndarray, mean: np.ndarray, m2: np.ndarray, minimum: np.ndarray, maximum: np.ndarray,
+                     sketches: Dict[str, Union[KLLSketch, QuantileView]] = None, category_counts: Dict[str, pd.Series] = None) -> 'DescriptiveStatistics':
+        """
+        Statistics from moments accumulated elsewhere, e.g. by `streaming.DatasetStatistics`.
+
+        :param sketches: sketch or `QuantileView` per numerical column, for the quantiles
+        :param category_counts: Series with the number of occurrences per category, per categorical column
+        """
+        category_counts = category_counts or {}
+        statistics = cls(numerical_columns, list(category_counts), quantiles=None)
+        statistics.count, statistics.mean, statistics.m2 = np.asarray(count, dtype=float), np.asarray(mean, dtype=float), np.asarray(m2, dtype=float)
+        statistics.minimum, statistics.maximum = np.asarray(minimum, dtype=float), np.asarray(maximum, dtype=float)
+        if sketches is not None:
+            statistics.quantile_mode, statistics.sketches = 'sketch', dict(sketches)
+        for col, counts in category_counts.items():
+            statistics.categories[col], statistics.category_counts[col] = counts.index.to_numpy(dtype=object), counts.to_numpy(dtype=float)
+        return statistics
+
+    def update(self, values: np.ndarray, codes: np.ndarray = None, categories: List[np.ndarray] = None) -> 'DescriptiveStatistics':
+        """
+        Add a block of rows to the statistics.
+
+        :param values: 2-D array with the numerical columns, in the order of ``numerical_columns``
+        :param codes: 2-D integer array with the codes of the categorical columns, in the order of ``categorical_columns``
+        :param categories: per categorical column the category of every code
+        :return: the statistics itself
+        """
+        if self.quantile_mode == 'exact' and self._updates:
+            raise ValueError("Exact quantiles cannot be updated, use quantiles='sketch' to build statistics from several blocks.")
+        self._updates += 1
+        count, mean, m2, minimum, maximum = block_moments(values)
+        self.count, self.mean, self.m2 = _combine_moments(self.count, self.mean, self.m2, count, mean, m2)
+        self.minimum, self.maximum = np.fmin(self.minimum, minimum), np.fmax(self.maximum, maximum)
+        if self.quantile_mode == 'exact':
+            # One row per column, so the partitions run over contiguous memory.
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                quantile = np.quantile if np.all(count == len(values)) else np.nanquantile
+                quantiles = quantile(np.ascontiguousarray(values.T), self.levels, axis=1).reshape(len(self.levels), values.shape[1])
+            self.exact_quantiles = dict(zip(self.levels, quantiles))
+        elif self.quantile_mode == 'sketch':
+            for i, col in enumerate(self.numerical_columns):
+                self.sketches[col].update(values[:, i])
+
+        if self.categorical_columns:
+            sizes = np.array([len(c) for c in categories], dtype=np.int64)
+            offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+            counts = np.bincount((codes + offsets).ravel(), minlength=sizes.sum())
+            for col, col_categories, offset, size in zip(self.categorical_columns, categories, offsets, sizes):
+                self._add_counts(col, np.asarray(col_categories, dtype=object), counts[offset:offset + size])
+        return self
+
+    def _add_counts(self, column: str, categories: np.ndarray, counts: np.ndarray):
+        if np.array_equal(categories, self.categories[column]):
+            self.category_counts[column] = self.category_counts[column] + counts
+            return
+        combined = pd.Series(self.category_counts[column], index=self.categories[column], dtype=float)
+        combined = combined.add(pd.Series(counts, index=categories, dtype=float), fill_value=0)
+        self.categories[column], self.category_counts[column] = combined.index.to_numpy(dtype=object), combined.to_numpy()
+
+    def merge(self, other: 'DescriptiveStatistics') -> 'DescriptiveStatistics':
+        """
+        Merge the statistics of another part of the same dataset into these. Both must keep their quantiles in sketches, or not at all.
+
+        :return: the statistics itself
+        """
+        if 'exact' in (self.quantile_mode, other.quantile_mode) or self.quantile_mode != other.quantile_mode:
+            raise ValueError('Only statistics with sketched quantiles, or without quantiles, can be merged.')
+        self.count, self.mean, self.m2 = _combine_moments(self.count, self.mean, self.m2, other.count, other.mean, other.m2)
+        self.minimum, self.maximum = np.fmin(self.minimum, other.minimum), np.fmax(self.maximum, other.maximum)
+        if self.sketches is not None:
+            for col in self.numerical_columns:
+                self.sketches[col].merge(other.sketches[col])
+        for col in self.categorical_columns:
+            self._add_counts(col, other.categories[col], other.category_counts[col])
+        return self
+
+    @property
+    def variance(self) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.count > 1, self.m2 / (self.count - 1), np.nan)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.variance)
+
+    def quantile(self, q: float) -> np.ndarray:
+        """
+        Quantile ``q`` of every numerical column, exact or from the sketches.
+        """
+        if self.exact_quantiles is not None and q in self.exact_quantiles:
+            return self.exact_quantiles[q]
+        if self.sketches is not None:
+            views = [sketch.view() if isinstance(sketch, KLLSketch) else sketch for sketch in self.sketches.values()]
+            return np.array([view.quantile(q) if view.n else np.nan for view in views])
+        raise ValueError(f'Quantile {q} is not available, the statistics hold exact quantiles at {self.levels} only.')
+
+    @property
+    def median(self) -> np.ndarray:
+        return self.quantile(0.5)
+
+    def frequencies(self, column: str) -> pd.Series:
+        """
+        Relative frequency of every category of a categorical column.
+        """
+        counts = self.category_counts[column]
+        return pd.Series(counts / max(counts.sum(), 1), index=self.categories[column])
+
+    def summary(self, include_categorical: bool = False) -> Dict[str, float]:
+        """
+        Flat mapping of statistic name to value, as compared by `TableEvaluator.basic_statistical_evaluation`: the mean, median, standard
+        deviation and variance of every numerical column and optionally the relative frequency of every category.
+
+        :param include_categorical: add ``frequency_<column>_<category>`` entries
+        """
+        metrics = {}
+        for prefix, values in [('mean', self.mean), ('median', self.median), ('std', self.std), ('variance', self.variance)]:
+            for col, value in zip(self.numerical_columns, values):
+                metrics[f'{prefix}_{col}'] = value
+        if include_categorical:
+            for col in self.categorical_columns:
+                for category, value in self.frequencies(col).items():
+                    metrics[f'frequency_{col}_{category}'] = value
+        return metrics
+
+
+def summary_frame(real: DescriptiveStatistics, fake: DescriptiveStatistics, include_categorical: bool = False) -> pd.DataFrame:
+    """
+    Side by side summaries of the real and fake statistics. Categories that only occur in one dataset get a frequency of 0 in the other.
+
+    :return: DataFrame indexed by statistic name with the columns ``real`` and ``fake``
+    """
+    real_summary = real.summary(include_categorical)
+    fake_summary = fake.summary(include_categorical)
+    index = list(real_summary) + [key for key in fake_summary if key not in real_summary]
+    return pd.DataFrame({'real': [real_summary.get(key, 0.0) for key in index], 'fake': [fake_summary.get(key, 0.0) for key in index]}, index=index)
@@ -0,0 +1,322 @@
+import threading
+import numpy as np
+import pandas as pd
+from scipy import sparse as sp
+from typing import Dict, List, Optional, Tuple, Union
+
+PRECISIONS = ('float64', 'float32')
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    array = np.ascontiguousarray(array)
+    array.setflags(write=False)
+    return array
+
+
+def compact_codes(codes: np.ndarray) -> np.ndarray:
+    """
+    ``codes`` in the smallest unsigned integer type that holds all of them.
+    """
+    return codes.astype(np.min_scalar_type(int(codes.max(initial=0))))
+
+
+class Codebook:
+    """
+    Joint mapping from category to integer code for every categorical column, shared by the real and the fake data. Categories are sorted, so codes
+    follow the same order as the sorted category values and the same category always gets the same code in both datasets.
+    """
+
+    def __init__(self, categories: Dict[str, np.ndarray]):
+        """
+        :param categories: sorted array of categories per categorical column
+        """
+        self.categories = categories
+        self._positions: Dict[str, Dict] = {}
+        # The codebook of a profile is shared by the evaluators of all candidates, which look codes up from several threads.
+        self._positions_lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_positions_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._positions_lock = threading.Lock()
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.categories[column]
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.categories
+
+    def size(self, column: str) -> int:
+        """
+        Number of categories of ``column`` over both datasets.
+        """
+        return len(self.categories[column])
+
+    def lookup(self, column: str, values: pd.Series) -> Optional[np.ndarray]:
+        """
+        Codes of ``values`` in the categories of ``column``.
+
+        :return: integer array with one code per value, or None if some value is not a category of ``column``
+        """
+        with self._positions_lock:
+            if column not in self._positions:
+                self._positions[column] = {category: code for code, category in enumerate(self.categories[column])}
+            position = self._positions[column]
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        mapping = np.array([position.get(u, -1) for u in uniques], dtype=np.int64)
+        if (mapping < 0).any():
+            return None
+        return mapping[codes]
+
+    @staticmethod
+    def factorize(real_col: pd.Series, fake_col: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Jointly factorize a real and a fake column.
+
+        :return: tuple with the sorted categories, the real codes and the fake codes
+        """
+        if real_col.dtype == 'category' and fake_col.dtype == real_col.dtype and real_col.cat.categories.is_monotonic_increasing:
+            return real_col.cat.categories.to_numpy(dtype=object), real_col.cat.codes.to_numpy(), fake_col.cat.codes.to_numpy()
+        real_codes, real_uniques = pd.factorize(real_col, use_na_sentinel=False)
+        fake_codes, fake_uniques = pd.factorize(fake_col, use_na_sentinel=False)
+        categories = sorted(set(real_uniques) | set(fake_uniques), key=str)
+        position = {category: code for code, category in enumerate(categories)}
+        real_map = np.array([position[u] for u in real_uniques], dtype=np.int64)
+        fake_map = np.array([position[u] for u in fake_uniques], dtype=np.int64)
+        return np.array(categories, dtype=object), real_map[real_codes], fake_map[fake_codes]
+
+
+class EncodedData:
+    """
+    Immutable numerical representation of a real and a fake dataset, built once per `TableEvaluator`. Categorical columns are encoded with a joint
+    `Codebook`, and all matrices are C-contiguous, read-only arrays of the ``precision`` floating point type with one row per sample:
+
+    - ``real_ordinal`` / ``fake_ordinal``: one column per original column, categorical columns replaced by their codes.
+    - ``real_one_hot`` / ``fake_one_hot``: numerical columns unchanged, categorical columns with one category as a column of zeros, with two
+      categories as their code and with more categories one-hot encoded. Columns are sorted by name, see ``one_hot_columns``.
+
+    The one-hot matrices are only built on first use. ``one_hot(dataset, sparse=True)`` returns the same matrix in CSR format without ever
+    materializing the dense one, so high-cardinality columns cost memory proportional to the number of rows instead of rows times categories.
+
+    With ``precision='float32'``, the matrices take half the memory and the codes (``real_codes`` / ``fake_codes``) are stored in the smallest
+    unsigned integer type that holds them, at the cost of about seven significant digits.
+
+    Given the encoding of the same real data on its own, e.g. of a `profile.RealProfile`, only the fake data is encoded when it has no categories
+    the real data lacks, and the real matrices are shared with that encoding.
+    """
+
+    def __init__(self, real: pd.DataFrame, fake: pd.DataFrame, categorical_columns: List, real_encoding: 'EncodedData' = None,
+                 precision: str = 'float64'):
+        """
+        :param real: real dataset, as stored by the `TableEvaluator`
+        :param fake: fake dataset with the same columns
+        :param categorical_columns: columns to encode with the codebook
+        :param real_encoding: encoding of ``real`` with a codebook of the real categories only, to reuse for the real side
+        :param precision: floating point type of the matrices, ``float64`` or ``float32``
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f'`precision` must be one of {PRECISIONS}, but is {precision}.')
+        self.precision = precision
+        self.dtype = np.dtype(precision)
+        self.columns = real.columns.tolist()
+        categorical = set(categorical_columns)
+        self.categorical_columns = [c for c in self.columns if c in categorical]
+        self.numerical_columns = [c for c in self.columns if c not in categorical]
+
+        categories, real_codes, fake_codes = {}, [], []
+        reused = real_encoding is not None
+        for column in self.categorical_columns:
+            f_codes = real_encoding.codebook.lookup(column, fake[column]) if reused else None
+            if f_codes is not None:
+                categories[column] = real_encoding.codebook[column]
+                r_codes = real_encoding.real_codes[:, real_encoding.categorical_columns.index(column)]
+            else:
+                reused = False
+                categories[column], r_codes, f_codes = Codebook.factorize(real[column], fake[column])
+            real_codes.append(r_codes)
+            fake_codes.append(f_codes)
+        self.codebook = Codebook(categories)
+        # The real side of ``real_encoding`` only applies if every column kept the real codebook, and is only shared as is in the same precision.
+        self._real_encoding = real_encoding if reused and real_encoding.precision == precision else None
+        if self._real_encoding is not None:
+            self.real_codes, self.real_ordinal = real_encoding.real_codes, real_encoding.real_ordinal
+        elif reused:
+            self.real_codes = _readonly(self._codes(real_encoding.real_codes))
+            self.real_ordinal = _readonly(real_encoding.real_ordinal.astype(self.dtype))
+        else:
+            self.real_codes = _readonly(self._codes(np.column_stack(real_codes) if real_codes else np.empty((len(real), 0), dtype=np.int64)))
+            self.real_ordinal = _readonly(self._ordinal(real, self.real_codes))
+        self.fake_codes = _readonly(self._codes(np.column_stack(fake_codes) if fake_codes else np.empty((len(fake), 0), dtype=np.int64)))
+        self.fake_ordinal = _readonly(self._ordinal(fake, self.fake_codes))
+
+        self.one_hot_columns, self._one_hot_layout, self._output_position = self._one_hot_layout_for()
+        self._one_hot_cache = {}
+        # One-hot matrices are built on first use, possibly by metrics running in several threads.
+        self._one_hot_lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_one_hot_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._one_hot_lock = threading.Lock()
+
+    def _codes(self, codes: np.ndarray) -> np.ndarray:
+        return codes if self.dtype == np.float64 else compact_codes(codes)
+
+    def _ordinal(self, data: pd.DataFrame, codes: np.ndarray) -> np.ndarray:
+        matrix = np.empty((len(data), len(self.columns)), dtype=self.dtype)
+        code_position = {column: i for i, column in enumerate(self.categorical_columns)}
+        for i, column in enumerate(self.columns):
+            if column in code_position:
+                matrix[:, i] = codes[:, code_position[column]]
+            else:
+                matrix[:, i] = data[column].to_numpy(dtype=self.dtype)
+        return matrix
+
+    def _one_hot_layout_for(self) -> Tuple[List[str], List[Tuple[str, int, int]], np.ndarray]:
+        """
+        Output columns of the one-hot encoding sorted by name, for every original column its kind, its ordinal position and its first unsorted output
+        column, and the sorted position of every unsorted output column.
+        """
+        names = []
+        for column in self.columns:
+            if column in self.codebook and self.codebook.size(column) > 2:
+                names.extend(f'{column}_{category}' for category in self.codebook[column])
+            else:
+                names.append(column)
+        order = sorted(range(len(names)), key=lambda i: names[i])
+        output_position = {source: target for target, source in enumerate(order)}
+
+        layout, source = [], 0
+        for i, column in enumerate(self.columns):
+            if column in self.codebook and self.codebook.size(column) > 2:
+                layout.append(('one_hot', i, source))
+                source += self.codebook.size(column)
+            else:
+                layout.append(('single_value' if column in self.codebook and self.codebook.size(column) == 1 else 'copy', i, source))
+                source += 1
+        return [names[i] for i in order], layout, np.array([output_position[i] for i in range(len(names))], dtype=np.int64)
+
+    def _one_hot(self, ordinal: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        matrix = np.zeros((len(ordinal), len(self.one_hot_columns)), dtype=self.dtype)
+        rows = np.arange(len(ordinal))
+        for kind, position, source in self._one_hot_layout:
+            if kind == 'one_hot':
+                code_position = self.categorical_columns.index(self.columns[position])
+                matrix[rows, self._output_position[source + codes[:, code_position].astype(np.intp)]] = 1.0
+            elif kind == 'copy':
+                matrix[:, self._output_position[source]] = ordinal[:, position]
+        return matrix
+
+    def _one_hot_sparse(self, ordinal: np.ndarray, codes: np.ndarray) -> sp.csr_matrix:
+        """
+        CSR version of `_one_hot`. Columns copied from the ordinal matrix store every row explicitly, zeros included, so they can be standardized by
+        rewriting the stored values only (see `standardize_columns`).
+        """
+        n_rows = len(ordinal)
+        columns, values = [], []
+        for kind, position, source in self._one_hot_layout:
+            if kind == 'one_hot':
+                code_position = self.categorical_columns.index(self.columns[position])
+                columns.append(self._output_position[source + codes[:, code_position].astype(np.intp)])
+                values.append(np.ones(n_rows, dtype=self.dtype))
+            elif kind == 'copy':
+                columns.append(np.full(n_rows, self._output_position[source]))
+                values.append(ordinal[:, position])
+        if not columns:
+            return sp.csr_matrix((n_rows, len(self.one_hot_columns)), dtype=self.dtype)
+        # Every row stores exactly one entry per non-constant source column, so the CSR arrays can be written directly once the entries of each row
+        # are sorted by output column. Unlike building through COO, this keeps the explicit zeros.
+        columns, values = np.column_stack(columns), np.column_stack(values)
+        order = np.argsort(columns, axis=1, kind='stable')
+        indices = np.take_along_axis(columns, order, axis=1).ravel()
+        data = np.take_along_axis(values, order, axis=1).ravel()
+        indptr = np.arange(0, n_rows * columns.shape[1] + 1, columns.shape[1])
+        return sp.csr_matrix((data, indices, indptr), shape=(n_rows, len(self.one_hot_columns)))
+
+    @property
+    def real_one_hot(self) -> np.ndarray:
+        return self.one_hot('real')
+
+    @property
+    def fake_one_hot(self) -> np.ndarray:
+        return self.one_hot('fake')
+
+    def ordinal(self, dataset: str) -> np.ndarray:
+        """
+        Ordinal matrix of ``real`` or ``fake``.
+        """
+        return getattr(self, f'{dataset}_ordinal')
+
+    def one_hot(self, dataset: str, sparse: bool = False) -> Union[np.ndarray, sp.csr_matrix]:
+        """
+        One-hot matrix of ``real`` or ``fake``, built on first use and cached.
+
+        :param dataset: ``real`` or ``fake``
+        :param sparse: return a CSR matrix instead of a dense array. Treat it as read-only, like the dense matrix.
+        :return: matrix with one column per entry of ``one_hot_columns``
+        """
+        if dataset == 'real' and self._real_encoding is not None:
+            return self._real_encoding.one_hot('real', sparse=sparse)
+        key = (dataset, sparse)
+        with self._one_hot_lock:
+            if key not in self._one_hot_cache:
+                ordinal, codes = self.ordinal(dataset), getattr(self, f'{dataset}_codes')
+                self._one_hot_cache[key] = self._one_hot_sparse(ordinal, codes) if sparse else _readonly(self._one_hot(ordinal, codes))
+            return self._one_hot_cache[key]
+
+    def one_hot_nbytes(self, dataset: str) -> int:
+        """
+        Size in bytes of the dense one-hot matrix of ``dataset``, without building it.
+        """
+        return len(self.ordinal(dataset)) * len(self.one_hot_columns) * self.dtype.itemsize
+
+    def continuous_one_hot_columns(self) -> np.ndarray:
+        """
+        Boolean mask over ``one_hot_columns`` marking the columns with more than two distinct real values, i.e. the columns that are standardized
+        before computing row distances.
+        """
+        mask = np.zeros(len(self.one_hot_columns), dtype=bool)
+        for kind, position, source in self._one_hot_layout:
+            if kind == 'copy' and self.columns[position] not in self.codebook:
+                mask[self._output_position[source]] = len(np.unique(self.real_ordinal[:, position])) > 2
+        return mask
+
+
+def standardize_columns(matrix: Union[np.ndarray, sp.csr_matrix], mask: np.ndarray) -> Union[np.ndarray, sp.csr_matrix]:
+    """
+    Standardize the columns selected by ``mask`` to zero mean and unit variance (``ddof=1``), leaving the other columns untouched. Sparse matrices
+    are handled without densifying them: only the stored values of the selected columns are rewritten, so those columns must store every row
+    explicitly, as the matrices from `EncodedData.one_hot` do.
+
+    :param matrix: dense array or CSR matrix
+    :param mask: boolean mask over the columns
+    :return: standardized copy of ``matrix``
+    """
+    dtype = matrix.dtype if matrix.dtype.kind == 'f' else float
+    if not sp.issparse(matrix):
+        matrix = np.array(matrix, dtype=dtype)
+        matrix[:, mask] = (matrix[:, mask] - matrix[:, mask].mean(axis=0)) / matrix[:, mask].std(axis=0, ddof=1)
+        return matrix
+
+    matrix = sp.csr_matrix(matrix, dtype=dtype, copy=True)
+    if not mask.any():
+        return matrix
+    selected = matrix[:, mask]
+    if selected.nnz != selected.shape[0] * selected.shape[1]:
+        raise ValueError('Standardized columns of a sparse matrix must store every row explicitly.')
+    selected = selected.toarray()
+    mean = np.zeros(matrix.shape[1])
+    std = np.ones(matrix.shape[1])
+    mean[mask] = selected.mean(axis=0)
+    std[mask] = selected.std(axis=0, ddof=1)
+    stored = mask[matrix.indices]
+    matrix.data[stored] = (matrix.data[stored] - mean[matrix.indices[stored]]) / std[matrix.indices[stored]]
+    return matrix
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+from typing import List, Tuple
+from sklearn.model_selection import KFold
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.neural_network import MLPClassifier
+from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
+from sklearn.linear_model import Lasso, Ridge, ElasticNet, LogisticRegression
+
+TARGET_TYPES = ('class', 'regr')
+
+
+def make_estimators(target_type: str) -> List:
+    """
+    Unfitted estimators of `TableEvaluator.estimator_evaluation`.
+
+    :param target_type: ``class`` for classifiers or ``regr`` for regressors
+    :return: list of scikit-learn estimators with fixed random states
+    """
+    if target_type == 'regr':
+        return [
+            RandomForestRegressor(n_estimators=20, max_depth=5, random_state=42),
+            Lasso(random_state=42),
+            Ridge(alpha=1.0, random_state=42),
+            ElasticNet(random_state=42),
+        ]
+    elif target_type == 'class':
+        return [
+            LogisticRegression(multi_class='auto', solver='lbfgs', max_iter=500, random_state=42),
+            RandomForestClassifier(n_estimators=10, random_state=42),
+            DecisionTreeClassifier(random_state=42),
+            MLPClassifier([50, 50], solver='adam', activation='relu', learning_rate='adaptive', random_state=42),
+        ]
+    raise ValueError(f'target_type must be \'regr\' or \'class\'')
+
+
+def estimator_folds(n_rows: int, kfold: bool = False) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Train and test positions of the folds of `TableEvaluator.estimator_evaluation`: the five folds of an unshuffled `KFold`, or only the first one
+    (an 80%/20% split) if ``kfold`` is False.
+    """
+    folds = list(KFold(n_splits=5).split(np.arange(n_rows)))
+    return folds if kfold else folds[:1]
+
+
+def split_target(encoding, dataset: str, index: pd.Index, target_col: str) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Split the ordinal matrix of ``dataset`` into the features and the target of the estimators.
+
+    :param encoding: `encoding.EncodedData` holding the dataset
+    :param dataset: ``real`` or ``fake``
+    :param index: index of the rows of the dataset
+    :param target_col: column to predict
+    :return: tuple with the DataFrame of the other columns and the Series of ``target_col``
+    """
+    ordinal = encoding.ordinal(dataset)
+    target_idx = encoding.columns.index(target_col)
+    x_idx = [i for i in range(len(encoding.columns)) if i != target_idx]
+    x = pd.DataFrame(ordinal[:, x_idx], index=index, columns=[encoding.columns[i] for i in x_idx])
+    y = pd.Series(ordinal[:, target_idx], index=index, name=target_col)
+    return x, y
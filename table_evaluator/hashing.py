@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+from typing import Tuple
+
+
+def hash_column(column: pd.Series) -> np.ndarray:
+    """
+    Vectorized 64-bit hash of every value in ``column``. Numerical values are hashed as float64, so ``1`` and ``1.0`` (and ``0.0`` and ``-0.0``)
+    get the same hash, as they would with Python's ``hash``.
+
+    :param column: Series to hash
+    :return: uint64 array with one hash per value
+    """
+    if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+        values = column.to_numpy(dtype=float) + 0.0
+        values[np.isnan(values)] = np.nan
+        return pd.util.hash_array(values)
+    return pd.util.hash_array(column.to_numpy(dtype=object))
+
+
+def hash_rows(data: pd.DataFrame) -> np.ndarray:
+    """
+    Vectorized 64-bit hash of every row in ``data``. Each column is hashed separately and the column hashes are combined in column order, so no
+    per-row Python code runs.
+
+    :param data: DataFrame to hash
+    :return: uint64 array with one hash per row
+    """
+    n_columns = len(data.columns)
+    combined = np.full(len(data), 0x345678, dtype=np.uint64)
+    multiplier = np.uint64(1000003)
+    with np.errstate(over='ignore'):
+        for i, (_, column) in enumerate(data.items()):
+            combined ^= hash_column(column)
+            combined *= multiplier
+            multiplier += np.uint64(82520 + 2 * (n_columns - i))
+        combined += np.uint64(97531)
+    return combined
+
+
+def _rows_equal(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    equal = (a == b) | (pd.isna(a) & pd.isna(b))
+    return equal.all(axis=1)
+
+
+class RowHashIndex:
+    """
+    Sorted index of the row hashes of a DataFrame. Built once per dataset, it answers membership queries from other datasets and within-set
+    duplicate queries with binary searches instead of re-hashing.
+    """
+
+    def __init__(self, data: pd.DataFrame, hashes: np.ndarray = None, order: np.ndarray = None):
+        """
+        :param data: DataFrame to index. It is kept to allow verifying hash matches against the actual row values.
+        :param hashes: row hashes of ``data`` from `hash_rows`, e.g. stored with a `profile.RealProfile`. Computed if None.
+        :param order: stable argsort of ``hashes``. Computed if None.
+        """
+        self.data = data
+        self.hashes = hash_rows(data) if hashes is None else hashes
+        self.order = np.argsort(self.hashes, kind='stable') if order is None else order
+        self.sorted_hashes = self.hashes[self.order]
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def _ranges(self, hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return np.searchsorted(self.sorted_hashes, hashes, side='left'), np.searchsorted(self.sorted_hashes, hashes, side='right')
+
+    def contains(self, other: 'RowHashIndex', verify: bool = False) -> np.ndarray:
+        """
+        Boolean mask over the rows of ``other`` that also occur in this index.
+
+        :param other: index of the dataset to look up
+        :param verify: compare the values of rows with matching hashes, to rule out hash collisions.
+        :return: boolean array of length ``len(other)``
+        """
+        lo, hi = self._ranges(other.hashes)
+        mask = hi > lo
+        if verify and mask.any():
+            candidates = np.flatnonzero(mask)
+            counts = (hi - lo)[candidates]
+            other_pos = np.repeat(candidates, counts)
+            starts = np.repeat(lo[candidates] - np.cumsum(counts) + counts, counts)
+            self_pos = self.order[starts + np.arange(counts.sum())]
+            equal = _rows_equal(other.data.to_numpy(dtype=object)[other_pos], self.data.to_numpy(dtype=object)[self_pos])
+            mask[:] = False
+            mask[other_pos[equal]] = True
+        return mask
+
+    def duplicated(self, verify: bool = False) -> np.ndarray:
+        """
+        Boolean mask of the rows that occur more than once, marking every occurrence (like ``DataFrame.duplicated(keep=False)``).
+
+        :param verify: compare the values of rows with matching hashes, to rule out hash collisions.
+        :return: boolean array of length ``len(self)``
+        """
+        lo, hi = self._ranges(self.hashes)
+        mask = (hi - lo) > 1
+        if verify and mask.any():
+            candidates = np.flatnonzero(mask)
+            mask[candidates] = self.data.iloc[candidates].duplicated(keep=False).values
+        return mask
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from typing import List, Tuple
+
+NAN_CATEGORY = '[NAN]'
+
+
+def exceeds_cardinality(column: pd.Series, threshold: int, probe_size: int = 10000) -> bool:
+    """
+    Check whether ``column`` has more than ``threshold`` distinct values. Only a small head of the column is scanned when that is already enough to
+    decide, so the full unique pass is skipped for most continuous columns.
+
+    :param column: Series to check
+    :param threshold: number of distinct values to exceed
+    :param probe_size: number of leading rows scanned before falling back to the full column
+    :return: True if the number of distinct values (NaN included) is larger than ``threshold``
+    """
+    if len(column) > probe_size and column.iloc[:probe_size].nunique(dropna=False) > threshold:
+        return True
+    return column.nunique(dropna=False) > threshold
+
+
+def infer_column_types(data: pd.DataFrame, unique_thresh: int = 0) -> Tuple[List, List]:
+    """
+    Split the columns of ``data`` into numerical and categorical columns. A column is numerical if it holds (or, for object columns, can be inferred
+    to hold) numbers and has more than ``unique_thresh`` distinct values. Object columns are inferred one at a time, so the frame is never copied as a
+    whole.
+
+    :param data: DataFrame to type
+    :param unique_thresh: Threshold for automatic evaluation if column is numeric
+    :return: tuple with the list of numerical and the list of categorical columns
+    """
+    numerical_columns = []
+    for column in data.columns:
+        values = data[column]
+        if values.dtype == object:
+            values = values.infer_objects()
+        if pd.api.types.is_numeric_dtype(values) and exceeds_cardinality(values, unique_thresh):
+            numerical_columns.append(column)
+    categorical_columns = [column for column in data.columns if column not in numerical_columns]
+    return numerical_columns, categorical_columns
+
+
+def shared_categorical(real_col: pd.Series, fake_col: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Convert a real and a fake column to pandas Categoricals with one shared, sorted set of string categories. Values are stringified like
+    ``fillna('[NAN]').astype(str)`` would, but only the distinct values are converted to Python strings; the rows are stored as small integer codes.
+
+    :param real_col: real column
+    :param fake_col: matching fake column
+    :return: tuple with the real and the fake column as categorical Series
+    """
+    codes, labels = [], []
+    for col in (real_col, fake_col):
+        col_codes, uniques = pd.factorize(col, use_na_sentinel=False)
+        codes.append(col_codes)
+        labels.append(np.array([NAN_CATEGORY if pd.isna(u) else str(u) for u in uniques], dtype=object))
+    categories = np.unique(np.concatenate(labels))
+    dtype = pd.CategoricalDtype(categories=categories)
+    result = []
+    for col, col_codes, col_labels in zip((real_col, fake_col), codes, labels):
+        mapped = np.searchsorted(categories, col_labels)[col_codes] if len(col_codes) else col_codes
+        result.append(pd.Series(pd.Categorical.from_codes(mapped, dtype=dtype), index=col.index, name=col.name))
+    return result[0], result[1]
+
+
+def fill_missing(data: pd.DataFrame, numerical_columns: List, categorical_columns: List, stringify: bool = True):
+    """
+    Prepare a sampled dataset for evaluation, in place: missing numerical values are replaced by the column mean and, if ``stringify`` is set,
+    categorical columns are converted to strings with missing values as ``NAN_CATEGORY``.
+
+    :param data: DataFrame to modify
+    :param numerical_columns: numerical columns of ``data``
+    :param categorical_columns: categorical columns of ``data``
+    :param stringify: convert the categorical columns. False when they are already shared Categoricals, see `shared_categorical`.
+    """
+    if stringify:
+        data.loc[:, categorical_columns] = data.loc[:, categorical_columns].fillna(NAN_CATEGORY).astype(str)
+    data.loc[:, numerical_columns] = data.loc[:, numerical_columns].fillna(data[numerical_columns].mean())
@@ -0,0 +1,147 @@
+import functools
+import threading
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+
+class StageTiming:
+    """
+    Measurements of one call of a stage or method.
+    """
+
+    def __init__(self, name: str, kind: str, wall_time: float, cpu_time: float, peak_memory: Optional[int]):
+        """
+        :param name: name of the stage, or qualified name of the method
+        :param kind: ``stage`` for a step of `TableEvaluator.evaluate`, ``method`` for a public method
+        :param wall_time: elapsed time in seconds
+        :param cpu_time: CPU time in seconds of the thread that ran the stage. Time spent in other threads or processes, e.g. BLAS or joblib workers,
+            is not included.
+        :param peak_memory: peak traced memory in bytes above the traced memory at the start of the stage, or None if memory was not traced
+        """
+        self.name = name
+        self.kind = kind
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.peak_memory = peak_memory
+
+    def __repr__(self):
+        return f'StageTiming(name={self.name!r}, kind={self.kind!r}, wall_time={self.wall_time:.4f}, cpu_time={self.cpu_time:.4f}, ' \
+               f'peak_memory={self.peak_memory})'
+
+
+class _OpenStage:
+    def __init__(self, baseline: int):
+        self.baseline = baseline
+        self.peak = baseline
+
+
+class Instrumentation:
+    """
+    Records wall time, CPU time and optionally peak traced memory of stages. Stages can be nested and can run concurrently in several threads.
+
+    Memory is traced with `tracemalloc`, which NumPy reports its buffers to. Tracing slows down allocations, so it is off by default. When stages
+    run concurrently, the peak of a stage includes the allocations of the stages running at the same time.
+    """
+
+    def __init__(self, trace_memory: bool = False, hook: Callable[[StageTiming], None] = None):
+        """
+        :param trace_memory: trace memory allocations to record the peak memory of every stage
+        :param hook: called with the `StageTiming` of every finished stage, e.g. to export it to a metrics pipeline
+        """
+        self.trace_memory = trace_memory
+        self.hook = hook
+        self.records: List[StageTiming] = []
+        self._lock = threading.Lock()
+        self._open: List[_OpenStage] = []
+        self._started_tracing = False
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(_lock=None, _open=[], _started_tracing=False)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _observe_peak(self):
+        # Called with the lock held. tracemalloc keeps a single peak, so it is handed to all open stages before it is reset.
+        current, peak = tracemalloc.get_traced_memory()
+        for stage in self._open:
+            stage.peak = max(stage.peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    @contextmanager
+    def stage(self, name: str, kind: str = 'method') -> Iterator[None]:
+        """
+        Context manager that records the code it wraps as a stage.
+
+        :param name: name of the stage
+        :param kind: ``stage`` or ``method``, see `StageTiming`
+        """
+        open_stage = None
+        if self.trace_memory:
+            with self._lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._started_tracing = True
+                open_stage = _OpenStage(self._observe_peak())
+                self._open.append(open_stage)
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall_time, cpu_time = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+            peak_memory = None
+            if open_stage is not None:
+                with self._lock:
+                    self._observe_peak()
+                    self._open.remove(open_stage)
+                    peak_memory = open_stage.peak - open_stage.baseline
+                    if not self._open and self._started_tracing:
+                        tracemalloc.stop()
+                        self._started_tracing = False
+            record = StageTiming(name, kind, wall_time, cpu_time, peak_memory)
+            self.records.append(record)
+            if self.hook is not None:
+                self.hook(record)
+
+    def frame(self, start: int = 0) -> pd.DataFrame:
+        """
+        Records aggregated per stage: the number of calls, the total wall and CPU time and the largest peak memory.
+
+        :param start: only use the records from this position on, e.g. ``len(records)`` before a run
+        :return: DataFrame indexed by ``name`` with the columns ``kind``, ``calls``, ``wall_time``, ``cpu_time`` and ``peak_memory``
+        """
+        records = self.records[start:]
+        frame = pd.DataFrame({
+            'name': [r.name for r in records],
+            'kind': [r.kind for r in records],
+            'wall_time': [r.wall_time for r in records],
+            'cpu_time': [r.cpu_time for r in records],
+            'peak_memory': [np.nan if r.peak_memory is None else r.peak_memory for r in records],
+        })
+        grouped = frame.groupby(['name', 'kind'], sort=False)
+        result = grouped.agg(calls=('wall_time', 'size'), wall_time=('wall_time', 'sum'), cpu_time=('cpu_time', 'sum'),
+                             peak_memory=('peak_memory', 'max'))
+        return result.reset_index(level='kind')
+
+
+def instrumented(method: Callable) -> Callable:
+    """
+    Decorator that records every call of a method in the ``instrumentation`` of its object, if it has one. The stage is named after the qualified
+    name of the method, e.g. ``TableEvaluator.row_distance``, to tell it apart from the stage of `evaluate` with the same name.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        instrumentation = getattr(self, 'instrumentation', None)
+        if instrumentation is None:
+            return method(self, *args, **kwargs)
+        with instrumentation.stage(method.__qualname__):
+            return method(self, *args, **kwargs)
+    return wrapper
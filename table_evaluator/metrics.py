@@ -1,12 +1,19 @@
+import math
+import warnings
 import pandas as pd
 import numpy as np
-import scipy.stats as ss
-from dython.nominal import theils_u, cramers_v
 from sklearn.metrics import mean_squared_error
 from scipy.spatial.distance import jensenshannon
-from joblib import Parallel, delayed
-from typing import Dict, Any, List
-from scipy.stats import ks_2samp
+from typing import Dict, Any, List, Tuple, Union
+from scipy.stats import ks_2samp, kstwo
+try:
+    from scipy.stats._stats_py import _attempt_exact_2kssamp
+except ImportError:
+    # scipy < 1.8
+    from scipy.stats.stats import _attempt_exact_2kssamp
+from .associations import cramers_v_from_contingency, sorted_contingency_table, theils_u_from_contingency
+from .sketches import KLLSketch, QuantileView, FixedEdgeHistogram, StreamingHistogram, SketchSummary, cut_edges, histogram_from_view, ks_from_views, \
+    js_error_bound
 
 def mean_absolute_error(y_true: np.ndarray, y_pred: np.ndarray):
     """
@@ -58,9 +65,41 @@ def cosine_similarity(y_true: np.ndarray, y_pred: np.ndarray):
     return np.sum(y_true * y_pred) / (np.sqrt(np.sum(y_true ** 2)) * np.sqrt(np.sum(y_pred ** 2)))
 
 
+def sorted_pearson(values_a: np.ndarray, values_b: np.ndarray) -> np.ndarray:
+    """
+    Pearson's r between every sorted column of ``values_a`` and the same sorted column of ``values_b``, for all columns at once. Columns holding a
+    single value or NaN give NaN, like `scipy.stats.pearsonr`.
+
+    :param values_a: 2-D array with one column per variable
+    :param values_b: 2-D array with the same columns and number of rows
+    :return: 1-D array with one coefficient per column
+    """
+    # Work on one row per column, so the sorts run over contiguous memory.
+    sorted_a, sorted_b = np.sort(np.ascontiguousarray(values_a.T, dtype=float)), np.sort(np.ascontiguousarray(values_b.T, dtype=float))
+    sorted_a -= sorted_a.mean(axis=1, keepdims=True)
+    sorted_b -= sorted_b.mean(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sorted_a /= np.linalg.norm(sorted_a, axis=1, keepdims=True)
+        sorted_b /= np.linalg.norm(sorted_b, axis=1, keepdims=True)
+    return np.clip(np.einsum('ij,ij->i', sorted_a, sorted_b), -1.0, 1.0)
+
+
+def sorted_category_counts(column_a: pd.Series, column_b: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Occurrences of every category of ``column_a`` and ``column_b`` on shared integer codes that follow the order of `pd.Series.sort_values`, with
+    missing values as the last category.
+
+    :return: tuple with the counts of ``column_a`` and the counts of ``column_b``
+    """
+    codes, uniques = pd.factorize(pd.concat([column_a, column_b], ignore_index=True), sort=True, use_na_sentinel=False)
+    return np.bincount(codes[:len(column_a)], minlength=len(uniques)), np.bincount(codes[len(column_a):], minlength=len(uniques))
+
+
 def column_correlations(dataset_a, dataset_b, categorical_columns, theil_u=True):
     """
-    Column-wise correlation calculation between ``dataset_a`` and ``dataset_b``.
+    Column-wise correlation calculation between ``dataset_a`` and ``dataset_b``. Every column of ``dataset_a`` is sorted and compared with the same
+    sorted column of ``dataset_b``: numerical columns with Pearson's r, all at once with `sorted_pearson`, and categorical columns with Theil's U or
+    Cramer's V on the contingency table of the sorted pairs, which follows from the category counts alone (see `sorted_contingency_table`).
 
     :param dataset_a: First DataFrame
     :param dataset_b: Second DataFrame
@@ -73,39 +112,145 @@ def column_correlations(dataset_a, dataset_b, categorical_columns, theil_u=True)
     elif categorical_columns == 'all':
         categorical_columns = dataset_a.columns
     assert dataset_a.columns.tolist() == dataset_b.columns.tolist()
-    corr = pd.DataFrame(columns=dataset_a.columns, index=['correlation'])
-
-    for column in dataset_a.columns.tolist():
-        if column in categorical_columns:
-            if theil_u:
-                corr[column] = theils_u(dataset_a[column].sort_values(), dataset_b[column].sort_values())
-            else:
-                corr[column] = cramers_v(dataset_a[column].sort_values(), dataset_b[column].sort_vaues())
+    categorical = [column for column in dataset_a.columns if column in set(categorical_columns)]
+    numerical = [column for column in dataset_a.columns if column not in set(categorical_columns)]
+
+    correlations = [sorted_pearson(dataset_a[numerical].to_numpy(dtype=float), dataset_b[numerical].to_numpy(dtype=float))]
+    for column in categorical:
+        table = sorted_contingency_table(*sorted_category_counts(dataset_a[column], dataset_b[column]))
+        if theil_u:
+            correlations.append([theils_u_from_contingency(table)[0]])
         else:
-            corr[column], _ = ss.pearsonr(dataset_a[column].sort_values(), dataset_b[column].sort_values())
-    corr.fillna(value=np.nan, inplace=True)
-    correlation = np.mean(corr.values.flatten())
-    return correlation
+            # Like `pd.crosstab`, only categories that occur among the pairs count towards the shape of the table.
+            table = table[table.getnnz(axis=1) > 0][:, table.getnnz(axis=0) > 0]
+            correlations.append([cramers_v_from_contingency(table)])
+    return np.mean(np.concatenate(correlations))
+
+
+JS_BIN_STRATEGIES = ('uniform', 'quantile')
 
 
-def js_distance_df(real: pd.DataFrame, fake: pd.DataFrame, numerical_columns: List) -> pd.DataFrame:
+def js_bin_edges(real: np.ndarray, bins: int = 25, bin_strategy: str = 'uniform') -> np.ndarray:
+    """
+    Bin edges for every column of ``real``, computed at once. Bins are right-closed, ``(edges[i], edges[i + 1]]``, and the first edge lies 0.1% of
+    the column range below the minimum, like `pd.cut`.
+
+    :param real: 2-D array with one numerical column per variable
+    :param bins: number of bins per column
+    :param bin_strategy: ``uniform`` for equal-width bins over the range of each column, as `pd.cut` makes them, or ``quantile`` for bins holding
+        (about) the same number of real values. Quantile bins of columns with many ties can be empty.
+    :return: array of shape ``(real.shape[1], bins + 1)``
+    """
+    if bin_strategy not in JS_BIN_STRATEGIES:
+        raise ValueError(f'`bin_strategy` must be one of {JS_BIN_STRATEGIES}, but is {bin_strategy}.')
+    minimum, maximum = np.nanmin(real, axis=0), np.nanmax(real, axis=0)
+    if bin_strategy == 'quantile':
+        edges = np.nanquantile(real, np.linspace(0, 1, bins + 1), axis=0).T
+    else:
+        constant = minimum == maximum
+        # pd.cut widens the range of constant columns by 0.1% on both sides.
+        low = np.where(constant, np.where(minimum != 0, minimum - 0.001 * np.abs(minimum), -0.001), minimum)
+        high = np.where(constant, np.where(maximum != 0, maximum + 0.001 * np.abs(maximum), 0.001), maximum)
+        edges = np.linspace(low, high, bins + 1, axis=1)
+    edges[:, 0] -= (maximum - minimum) * 0.001
+    return edges
+
+
+def _bin_codes(values: np.ndarray, edges: np.ndarray, uniform: bool) -> np.ndarray:
+    """
+    Bin index of every value: 1 to ``bins`` for values inside the edges of their column, 0 below or missing and ``bins + 1`` above.
+    """
+    n_bins = edges.shape[1] - 1
+    columns = np.arange(edges.shape[0])
+    if uniform:
+        # Equal-width bins: guess the bin arithmetically and correct rounding against the actual edges, which is exact and needs no search.
+        # The guess is off by at most one bin, also around the lowered first edge.
+        step = (edges[:, -1] - edges[:, 0]) / n_bins
+        with np.errstate(invalid='ignore', divide='ignore'):
+            guess = np.ceil((values - edges[:, 0]) / np.where(step > 0, step, 1.0))
+        # fmax/fmin also map NaN guesses into the valid range; missing values are reset below.
+        codes = np.fmin(np.fmax(guess, 1), n_bins, out=guess).astype(np.intp)
+        flat = codes + columns * (n_bins + 1)
+        flat_edges = edges.ravel()
+        codes -= values <= np.take(flat_edges, flat - 1)
+        codes += values > np.take(flat_edges, flat)
+    else:
+        codes = np.column_stack([np.searchsorted(edges[i], values[:, i], side='left') for i in columns]) if len(columns) else \
+            np.zeros(values.shape, dtype=np.int64)
+    codes[np.isnan(values)] = 0
+    return codes
+
+
+def binned_probabilities(values: np.ndarray, edges: np.ndarray, uniform: bool = False) -> np.ndarray:
+    """
+    Fraction of the values of every column in each of its bins, normalized over the values inside the edges, like
+    ``pd.cut(...).value_counts(normalize=True)``. All columns are counted with a single `np.bincount`.
+
+    :param values: 2-D array with one column per variable
+    :param edges: bin edges per column, as returned by `js_bin_edges`
+    :param uniform: whether the edges are equal-width, which allows binning without a search
+    :return: array of shape ``(values.shape[1], bins)``
+    """
+    n_columns, n_bins = edges.shape[0], edges.shape[1] - 1
+    codes = _bin_codes(values, edges, uniform)
+    counts = np.bincount((codes + np.arange(n_columns) * (n_bins + 2)).ravel(), minlength=n_columns * (n_bins + 2))
+    counts = counts.reshape(n_columns, n_bins + 2)[:, 1:-1].astype(float)
+    totals = counts.sum(axis=1, keepdims=True)
+    return np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+
+
+def js_distances(real: np.ndarray, fake: np.ndarray, bins: int = 25, bin_strategy: str = 'uniform') -> np.ndarray:
+    """
+    Jensen-Shannon distance between every column of ``real`` and the same column of ``fake``, on bins derived from ``real``.
+
+    :param real: 2-D array with the real values
+    :param fake: 2-D array with the fake values, with the same columns
+    :param bins: number of bins per column
+    :param bin_strategy: how bins are placed, see `js_bin_edges`
+    :return: 1-D array with one distance per column
+    """
+    edges = js_bin_edges(real, bins=bins, bin_strategy=bin_strategy)
+    uniform = bin_strategy == 'uniform'
+    return jensenshannon(binned_probabilities(real, edges, uniform), binned_probabilities(fake, edges, uniform), axis=1)
+
+
+def js_distance_df(real: pd.DataFrame, fake: pd.DataFrame, numerical_columns: List, bins: int = 25, bin_strategy: str = 'uniform') -> pd.DataFrame:
+    """
+    Jensen-Shannon distance per numerical column between ``real`` and ``fake``. All columns are binned and compared in one vectorized pass.
+
+    :param real: real DataFrame
+    :param fake: fake DataFrame with the same columns
+    :param numerical_columns: columns to compare
+    :param bins: number of bins per column
+    :param bin_strategy: ``uniform`` (like `pd.cut`) or ``quantile``, see `js_bin_edges`
+    :return: DataFrame indexed by ``col_name`` with a ``js_distance`` column
+    """
     assert real.columns.tolist() == fake.columns.tolist(), f'Colums are not identical between `real` and `fake`. '
-    real_iter = real[numerical_columns].iteritems()
-    fake_iter = fake[numerical_columns].iteritems()
-    distances = Parallel(n_jobs=-1)(
-        delayed(jensenshannon_distance)
-        (colname, real_col, fake_col) for (colname, real_col), (_, fake_col) in zip(real_iter, fake_iter))
+    distances = js_distances(real[numerical_columns].to_numpy(dtype=float), fake[numerical_columns].to_numpy(dtype=float), bins=bins,
+                             bin_strategy=bin_strategy)
+    return pd.DataFrame({'col_name': list(numerical_columns), 'js_distance': distances}).set_index('col_name')
+
 
-    distances_df = pd.DataFrame(distances)
-    # distances_df = distances_df.append({'colname': 'mean', 'js_distance': distances_df.js_distance.mean()})
-    return distances_df.set_index('col_name')
+def js_distance_df_from_binned(edges: np.ndarray, real_probabilities: np.ndarray, fake: pd.DataFrame, numerical_columns: List,
+                               bin_strategy: str = 'uniform') -> pd.DataFrame:
+    """
+    `js_distance_df` from real bins computed beforehand, e.g. by a `profile.RealProfile`, so only ``fake`` is binned. The output is identical to
+    `js_distance_df` on the real data the bins were computed from.
+
+    :param edges: bin edges per numerical column, from `js_bin_edges`
+    :param real_probabilities: real bin probabilities per numerical column, from `binned_probabilities`
+    :param fake: fake DataFrame
+    :param numerical_columns: columns to compare, in the order of ``edges``
+    :param bin_strategy: strategy the edges were computed with
+    :return: DataFrame indexed by ``col_name`` with a ``js_distance`` column
+    """
+    fake_probabilities = binned_probabilities(fake[numerical_columns].to_numpy(dtype=float), edges, uniform=bin_strategy == 'uniform')
+    distances = jensenshannon(real_probabilities, fake_probabilities, axis=1)
+    return pd.DataFrame({'col_name': list(numerical_columns), 'js_distance': distances}).set_index('col_name')
 
 
 def jensenshannon_distance(colname: str, real_col: pd.Series, fake_col: pd.Series, bins=25) -> Dict[str, Any]:
-    binned_values_real, bins = pd.cut(real_col, bins=bins, retbins=True)
-    binned_probs_real = binned_values_real.value_counts(normalize=True, sort=False)
-    binned_probs_fake = pd.cut(fake_col, bins=bins).value_counts(normalize=True, sort=False)
-    js_distance = jensenshannon(binned_probs_real, binned_probs_fake)
+    js_distance = js_distances(real_col.to_numpy(dtype=float)[:, None], fake_col.to_numpy(dtype=float)[:, None], bins=bins)[0]
     return {'col_name': colname, 'js_distance': js_distance}
 
 
@@ -114,12 +259,252 @@ def kolmogorov_smirnov_test(col_name, real_col, fake_col):
     equality = 'identical' if p_value > 0.01 else 'different'
     return {'col_name': col_name, 'statistic': statistic, 'p-value': p_value, 'equality': equality}
 
-def kolmogorov_smirnov_df(real: pd.DataFrame, fake: pd.DataFrame, numerical_columns: List) -> List[Dict[str, Any]]:
+# Largest sample size for which `ks_2samp` computes exact p-values by default.
+KS_EXACT_MAX_N = 10000
+
+
+def ks_statistics(real: np.ndarray, fake: np.ndarray, presorted: bool = False, block_size: int = 4000000) -> np.ndarray:
+    """
+    Two-sample Kolmogorov-Smirnov statistic between every column of ``real`` and the same column of ``fake``, for all columns in one vectorized
+    pass. Both matrices are sorted column-wise and every real column is merged with its fake column by a stable sort, which finds the two sorted
+    runs and merges them in linear time. The empirical CDFs are the running counts of real and fake values in the merged order, read where a run
+    of equal values ends, as `ks_2samp` reads them with `np.searchsorted`. The result is the value `ks_2samp` returns before any exact-mode
+    rounding, see `ks_2samp_from_statistics` for that and the p-values.
+
+    :param real: 2-D array with the real values, without NaN
+    :param fake: 2-D array with the fake values, with the same columns
+    :param presorted: the columns of ``real`` and ``fake`` are already sorted, skip sorting them
+    :param block_size: number of merged values held in memory at a time. Columns are merged in blocks of at least one column.
+    :return: 1-D array with one statistic per column
+    """
+    n_real, n_fake = len(real), len(fake)
+    # Work on one row per column, so every sort and merge runs over contiguous memory.
+    real, fake = np.ascontiguousarray(real.T, dtype=float), np.ascontiguousarray(fake.T, dtype=float)
+    if not presorted:
+        real.sort(axis=1)
+        fake.sort(axis=1)
+    statistics = np.empty(len(real))
+    positions = np.arange(1, n_real + n_fake + 1)
+    columns_per_block = max(block_size // (n_real + n_fake), 1)
+    for start in range(0, len(real), columns_per_block):
+        merged = np.concatenate([real[start:start + columns_per_block], fake[start:start + columns_per_block]], axis=1)
+        # Ties keep their real values first, so the counts at the end of a run of equal values are those of a right-sided search.
+        order = np.argsort(merged, axis=1, kind='stable')
+        merged = np.take_along_axis(merged, order, axis=1)
+        real_counts = np.cumsum(order < n_real, axis=1)
+        gaps = real_counts / n_real - (positions - real_counts) / n_fake
+        gaps[~_last_of_value(merged)] = 0.0
+        statistics[start:start + columns_per_block] = np.maximum(gaps.max(axis=1), -gaps.min(axis=1))
+    return statistics
+
+
+def _last_of_value(values: np.ndarray) -> np.ndarray:
+    """
+    Mask of the last occurrence of every distinct value in each row of a row-wise sorted 2-D array.
+    """
+    last = np.ones(values.shape, dtype=bool)
+    np.not_equal(values[:, 1:], values[:, :-1], out=last[:, :-1])
+    return last
+
+
+def ks_statistic_sorted(real: np.ndarray, fake: np.ndarray, block_size: int = 1000000) -> float:
+    """
+    Two-sample Kolmogorov-Smirnov statistic of two sorted 1-D arrays, evaluated block by block with `np.searchsorted`. Only one block of each array
+    is held in memory at a time, so the arrays can be memory-mapped files (e.g. ``np.load(path, mmap_mode='r')``) larger than memory.
+
+    :param real: sorted real values, without NaN
+    :param fake: sorted fake values, without NaN
+    :param block_size: number of values evaluated per block
+    :return: the statistic, as `ks_statistics` returns it
+    """
+    n_real, n_fake = len(real), len(fake)
+    max_gap, min_gap = -np.inf, np.inf
+    for data in (real, fake):
+        for start in range(0, len(data), block_size):
+            block = np.asarray(data[start:start + block_size])
+            differences = np.searchsorted(real, block, side='right') / n_real - np.searchsorted(fake, block, side='right') / n_fake
+            max_gap, min_gap = max(max_gap, differences.max()), min(min_gap, differences.min())
+    min_gap = np.clip(-min_gap, 0, 1)
+    return min_gap if min_gap > max_gap else max_gap
+
+
+def ks_p_values(statistics: np.ndarray, n_real: int, n_fake: int) -> np.ndarray:
+    """
+    Asymptotic two-sided p-values of Kolmogorov-Smirnov statistics, as `ks_2samp` computes them for samples larger than ``KS_EXACT_MAX_N``.
+    """
+    m, n = sorted([float(n_real), float(n_fake)], reverse=True)
+    return np.clip(kstwo.sf(statistics, np.round(m * n / (m + n))), 0, 1)
+
+
+def ks_2samp_from_statistics(statistics: np.ndarray, n_real: int, n_fake: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Statistics and p-values `ks_2samp` returns in its default ``auto`` mode, from statistics computed by `ks_statistics` or
+    `ks_statistic_sorted`. Samples of at most ``KS_EXACT_MAX_N`` (10000) rows get the exact p-value, once per distinct statistic, and their
+    statistic is rounded to a multiple of ``1 / lcm(n_real, n_fake)`` like `ks_2samp` rounds it. If the exact computation fails, or for larger
+    samples, the p-values come from the asymptotic distribution, see `ks_p_values`.
+
+    :param statistics: Kolmogorov-Smirnov statistics
+    :param n_real: number of real values per statistic
+    :param n_fake: number of fake values per statistic
+    :return: the statistics and their p-values
+    """
+    statistics = np.asarray(statistics, dtype=float)
+    if max(n_real, n_fake) > KS_EXACT_MAX_N:
+        return statistics, ks_p_values(statistics, n_real, n_fake)
+    exact_statistics, p_values = np.empty_like(statistics), np.empty_like(statistics)
+    distinct, inverse = np.unique(statistics, return_inverse=True)
+    for i, statistic in enumerate(distinct):
+        success, statistic, p_value = _attempt_exact_2kssamp(n_real, n_fake, math.gcd(n_real, n_fake), statistic, 'two-sided')
+        if not success:
+            warnings.warn('ks_2samp: Exact calculation unsuccessful. Switching to method=asymp.', RuntimeWarning)
+            p_value = ks_p_values(statistic, n_real, n_fake)
+        exact_statistics[inverse == i], p_values[inverse == i] = statistic, np.clip(p_value, 0, 1)
+    return exact_statistics, p_values
+
+
+def _ks_frame(col_names: List, statistics: np.ndarray, p_values: np.ndarray) -> pd.DataFrame:
+    equality = np.where(p_values > 0.01, 'identical', 'different')
+    return pd.DataFrame({'col_name': list(col_names), 'statistic': statistics, 'p-value': p_values, 'equality': equality}).set_index('col_name')
+
+
+def kolmogorov_smirnov_df(real: pd.DataFrame, fake: pd.DataFrame, numerical_columns: List, presorted: bool = False) -> pd.DataFrame:
+    """
+    Two-sample Kolmogorov-Smirnov test per numerical column, identical to calling `ks_2samp` on every column. The statistics of all columns
+    without NaN come from one pass of `ks_statistics` and their p-values from `ks_2samp_from_statistics`, which is exact for samples of at most
+    ``KS_EXACT_MAX_N`` (10000) rows and asymptotic for larger ones, as in `ks_2samp`. Columns with NaN are passed to `ks_2samp` directly.
+
+    For samples too large to sort in memory, see `kolmogorov_smirnov_df_from_sorted` and `kolmogorov_smirnov_df_from_summaries`.
+
+    :param real: real DataFrame
+    :param fake: fake DataFrame with the same columns
+    :param numerical_columns: columns to test
+    :param presorted: every numerical column of ``real`` and ``fake`` is already sorted ascending
+    :return: DataFrame indexed by ``col_name`` with the columns ``statistic``, ``p-value`` and ``equality``
+    """
     assert real.columns.tolist() == fake.columns.tolist(), f'Colums are not identical between `real` and `fake`. '
-    real_iter = real[numerical_columns].iteritems()
-    fake_iter = fake[numerical_columns].iteritems()
-    distances = Parallel(n_jobs=-1)(
-        delayed(kolmogorov_smirnov_test)
-        (colname, real_col, fake_col) for (colname, real_col), (_, fake_col) in zip(real_iter, fake_iter))
-    distances_df = pd.DataFrame(distances)
-    return distances_df.set_index('col_name')
\ No newline at end of file
+    real_values, fake_values = real[numerical_columns].to_numpy(dtype=float), fake[numerical_columns].to_numpy(dtype=float)
+    n_real, n_fake = len(real_values), len(fake_values)
+    missing = np.isnan(real_values).any(axis=0) | np.isnan(fake_values).any(axis=0)
+
+    statistics, p_values = np.empty(len(numerical_columns)), np.empty(len(numerical_columns))
+    if not missing.all():
+        statistics[~missing], p_values[~missing] = ks_2samp_from_statistics(
+            ks_statistics(real_values[:, ~missing], fake_values[:, ~missing], presorted=presorted), n_real, n_fake)
+    for i in np.flatnonzero(missing):
+        statistics[i], p_values[i] = ks_2samp(real_values[:, i], fake_values[:, i])
+    return _ks_frame(numerical_columns, statistics, p_values)
+
+
+def kolmogorov_smirnov_df_from_sorted(real: Dict[str, np.ndarray], fake: Dict[str, np.ndarray], numerical_columns: List = None,
+                                      block_size: int = 1000000) -> pd.DataFrame:
+    """
+    `kolmogorov_smirnov_df` computed from sorted columns, e.g. memory-mapped arrays written by an external sort. Columns whose values fit in
+    ``block_size`` are stacked by sample size and go through one pass of `ks_statistics`; larger columns are read block by block with
+    `ks_statistic_sorted`. The p-values come from `ks_2samp_from_statistics`, so the output is identical to `kolmogorov_smirnov_df` on the same
+    values.
+
+    :param real: sorted 1-D array of real values per column, without NaN
+    :param fake: sorted 1-D array of fake values per column, without NaN
+    :param numerical_columns: columns to test. All columns of ``real`` if None.
+    :param block_size: number of values held in memory per column, see `ks_statistic_sorted`
+    """
+    numerical_columns = list(real) if numerical_columns is None else numerical_columns
+    statistics, p_values = np.empty(len(numerical_columns)), np.empty(len(numerical_columns))
+    groups: Dict[Tuple[int, int], List[int]] = {}
+    for i, col in enumerate(numerical_columns):
+        n_real, n_fake = len(real[col]), len(fake[col])
+        if n_real + n_fake <= block_size:
+            groups.setdefault((n_real, n_fake), []).append(i)
+        else:
+            column_statistics, column_p_values = ks_2samp_from_statistics(
+                np.array([ks_statistic_sorted(real[col], fake[col], block_size=block_size)]), n_real, n_fake)
+            statistics[i], p_values[i] = column_statistics[0], column_p_values[0]
+    for (n_real, n_fake), indices in groups.items():
+        columns = [numerical_columns[i] for i in indices]
+        real_values = np.column_stack([np.asarray(real[col]) for col in columns])
+        fake_values = np.column_stack([np.asarray(fake[col]) for col in columns])
+        statistics[indices], p_values[indices] = ks_2samp_from_statistics(
+            ks_statistics(real_values, fake_values, presorted=True, block_size=block_size), n_real, n_fake)
+    return _ks_frame(numerical_columns, statistics, p_values)
+
+
+def _as_view(sketch: Union[KLLSketch, QuantileView]) -> QuantileView:
+    return sketch.view() if isinstance(sketch, KLLSketch) else sketch
+
+
+def kolmogorov_smirnov_from_sketches(col_name: str, real_sketch: Union[KLLSketch, QuantileView],
+                                     fake_sketch: Union[KLLSketch, QuantileView]) -> Dict[str, Any]:
+    """
+    Approximate `kolmogorov_smirnov_test` from quantile sketches, using the asymptotic distribution of the statistic. The statistic is within
+    ``error_bound`` of the exact one with probability 0.99, see `sketches.ks_from_views`.
+    """
+    real_view, fake_view = _as_view(real_sketch), _as_view(fake_sketch)
+    statistic, error_bound = ks_from_views(real_view, fake_view)
+    en = real_view.n * fake_view.n / (real_view.n + fake_view.n)
+    p_value = kstwo.sf(statistic, np.round(en))
+    equality = 'identical' if p_value > 0.01 else 'different'
+    return {'col_name': col_name, 'statistic': statistic, 'p-value': p_value, 'equality': equality, 'error_bound': error_bound}
+
+
+def kolmogorov_smirnov_df_from_summaries(real: SketchSummary, fake: SketchSummary, numerical_columns: List = None) -> pd.DataFrame:
+    """
+    `kolmogorov_smirnov_df` computed from (merged) sketch summaries instead of raw columns, with an extra ``error_bound`` column.
+
+    :param real: summary of the real data
+    :param fake: summary of the fake data
+    :param numerical_columns: columns to compare. All columns of ``real`` if None.
+    """
+    numerical_columns = real.columns if numerical_columns is None else numerical_columns
+    distances = [kolmogorov_smirnov_from_sketches(col, real.sketches[col], fake.sketches[col]) for col in numerical_columns]
+    return pd.DataFrame(distances).set_index('col_name')
+
+
+def jensenshannon_from_sketches(col_name: str, real_sketch: Union[KLLSketch, QuantileView], fake_sketch: Union[KLLSketch, QuantileView], bins=25,
+                                real_histogram: Union[FixedEdgeHistogram, StreamingHistogram] = None,
+                                fake_histogram: Union[FixedEdgeHistogram, StreamingHistogram] = None) -> Dict[str, Any]:
+    """
+    Approximate `jensenshannon_distance` from summaries. Bins span the exact range of the real values, like `pd.cut`, or follow the edges of a
+    `FixedEdgeHistogram` of the real data. Each distribution is read from the most accurate summary available:
+
+    - a `FixedEdgeHistogram` with the same edges is exact;
+    - a `StreamingHistogram` can only misplace the values of the fine bins that contain an edge;
+    - the CDF of the sketch puts every bin probability within twice the rank error of the exact one.
+
+    The reported ``error_bound`` combines both sides with `sketches.js_error_bound` and is loose; the actual error is usually far smaller.
+    """
+    real_view, fake_view = _as_view(real_sketch), _as_view(fake_sketch)
+    if isinstance(real_histogram, FixedEdgeHistogram):
+        edges = real_histogram.edges
+    else:
+        edges = cut_edges(real_view.min, real_view.max, bins)
+
+    def probabilities(histogram, view):
+        if isinstance(histogram, FixedEdgeHistogram) and np.array_equal(histogram.edges, edges):
+            return histogram.probabilities(), 0.0
+        if isinstance(histogram, StreamingHistogram):
+            return histogram.bin_probabilities(edges)
+        return histogram_from_view(view, edges)
+
+    real_probs, real_error = probabilities(real_histogram, real_view)
+    fake_probs, fake_error = probabilities(fake_histogram, fake_view)
+    js_distance = jensenshannon(real_probs, fake_probs)
+    error_bound = js_error_bound(real_error) + js_error_bound(fake_error)
+    return {'col_name': col_name, 'js_distance': js_distance, 'error_bound': error_bound}
+
+
+def js_distance_df_from_summaries(real: SketchSummary, fake: SketchSummary, numerical_columns: List = None, bins=25) -> pd.DataFrame:
+    """
+    `js_distance_df` computed from (merged) sketch summaries instead of raw columns, with an extra ``error_bound`` column. The distances are exact
+    when both summaries hold fixed-edge histograms over the same edges, e.g. ``real.edges()`` of a merged real summary passed to the workers of a
+    second pass. Otherwise they are read from the streaming histograms, which is close to exact.
+
+    :param real: summary of the real data
+    :param fake: summary of the fake data
+    :param numerical_columns: columns to compare. All columns of ``real`` if None.
+    :param bins: number of bins when no histograms are available
+    """
+    numerical_columns = real.columns if numerical_columns is None else numerical_columns
+    distances = [jensenshannon_from_sketches(col, real.sketches[col], fake.sketches[col], bins=bins, real_histogram=real.histograms.get(col),
+                                             fake_histogram=fake.histograms.get(col))
+                 for col in numerical_columns]
+    return pd.DataFrame(distances).set_index('col_name')
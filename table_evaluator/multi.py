@@ -0,0 +1,138 @@
+import warnings
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from sklearn.exceptions import ConvergenceWarning
+from typing import Any, Callable, Dict, Hashable, List, Union
+from .profile import RealProfile
+from .table_evaluator import TableEvaluator, _overview_results
+from .viz import plot_correlation_comparison, plot_mean_std_comparison
+
+
+def _leaderboard_row(results: Dict, target_type: str) -> Dict[str, float]:
+    """
+    Flat mapping of metric name to value for one candidate, from the results of its `EvaluationPlan`.
+    """
+    row = _overview_results(results, target_type)
+    if 'duplicates' in results:
+        row['Duplicate rows (real)'], row['Duplicate rows (fake)'] = results['duplicates']
+    if 'near_copies' in results:
+        row['Near-copy rate (fake)'], row['Near-copy rate (real baseline)'] = results['near_copies']
+    if 'row_distance' in results:
+        row['nearest neighbor mean'], row['nearest neighbor std'] = results['row_distance']
+    if 'correlation_distance_rmse' in results:
+        row['Column Correlation Distance RMSE'] = results['correlation_distance_rmse']
+    if 'correlation_distance_mae' in results:
+        row['Column Correlation distance MAE'] = results['correlation_distance_mae']
+    if 'js_distance' in results:
+        row['Mean Jensen-Shannon distance'] = results['js_distance']['js_distance'].mean()
+    if 'ks_test' in results:
+        row['Mean Kolmogorov-Smirnov statistic'] = results['ks_test']['statistic'].mean()
+        row['Columns with different distributions'] = int((results['ks_test']['equality'] == 'different').sum())
+    return row
+
+
+class MultiTableEvaluator:
+    """
+    Evaluate many synthetic candidates against one real dataset. The real data is sampled, prepared and analysed once, into a
+    `profile.RealProfile`, and every candidate gets a `TableEvaluator` on that profile, so each additional candidate only costs its fake-side
+    work. Candidates are evaluated concurrently on a thread pool and summarized in a leaderboard.
+
+    The evaluators share the profile, whose caches are read-only arrays or built under a lock, and every candidate is sampled with its own
+    random generator, so the leaderboard does not depend on ``max_workers``.
+    """
+
+    def __init__(self, real: Union[pd.DataFrame, RealProfile], fakes: Union[Dict[Hashable, pd.DataFrame], List[pd.DataFrame]], cat_cols=None,
+                 unique_thresh=0, metric='pearsonr', verbose=False, n_samples=None, seed=1337, lean: bool = False, max_workers: int = 1,
+                 precision: str = 'float64'):
+        """
+        :param real: real dataset, or a `profile.RealProfile` of it
+        :param fakes: synthetic datasets, as a dictionary from candidate name to DataFrame or as a list, in which case candidates are named by
+            their position
+        :param cat_cols: The columns that are to be evaluated as discrete. Ignored if ``real`` is a profile.
+        :param unique_thresh: Threshold for automatic evaluation if column is numeric. Ignored if ``real`` is a profile.
+        :param metric: the metric to use for evaluation linear relations. Pearson's r by default, but supports all models in scipy.stats
+        :param verbose: Whether to print verbose output
+        :param n_samples: Number of rows of every dataset to evaluate. If None, the length of the smallest dataset. Ignored if ``real`` is a
+            profile, which brings its own sample.
+        :param seed: seed of every `TableEvaluator` and of the samples of the candidates, each drawn with its own random generator
+        :param lean: see `TableEvaluator`
+        :param max_workers: number of candidates evaluated concurrently
+        :param precision: see `TableEvaluator`
+        """
+        if not isinstance(fakes, dict):
+            fakes = dict(enumerate(fakes))
+        if not fakes:
+            raise ValueError('`fakes` must hold at least one synthetic dataset.')
+        if isinstance(real, RealProfile):
+            self.profile = real
+        else:
+            if n_samples is None:
+                n_samples = min(len(real), *[len(fake) for fake in fakes.values()])
+            self.profile = RealProfile.from_frame(real, cat_cols=cat_cols, unique_thresh=unique_thresh, n_samples=n_samples, seed=seed,
+                                                 precision=precision)
+        # Build the real encoding once, before the evaluators share it across threads.
+        self.profile.encoding
+        self.max_workers = max_workers
+        rngs = [np.random.default_rng(sequence) for sequence in np.random.SeedSequence(seed).spawn(len(fakes))]
+        self.evaluators: Dict[Hashable, TableEvaluator] = {
+            name: TableEvaluator(self.profile, fake, metric=metric, verbose=verbose, name=name, seed=seed, lean=lean, precision=precision, rng=rng)
+            for (name, fake), rng in zip(fakes.items(), rngs)
+        }
+        self.results: Dict[Hashable, Dict[str, Any]] = {}
+
+    def _map(self, function: Callable[[TableEvaluator], Any]) -> Dict[Hashable, Any]:
+        """
+        Apply ``function`` to the evaluator of every candidate, on ``max_workers`` threads.
+        """
+        names = list(self.evaluators)
+        if self.max_workers == 1:
+            return {name: function(self.evaluators[name]) for name in names}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(zip(names, executor.map(lambda name: function(self.evaluators[name]), names)))
+
+    def evaluate(self, target_col: str, target_type: str = 'class', n_samples_distance: int = 20000, kfold: bool = False,
+                 distance_method: str = 'exact', n_jobs: int = 1, metrics: List[str] = None, skip: List[str] = None) -> pd.DataFrame:
+        """
+        Run the metrics of `TableEvaluator.evaluate` for every candidate. The real estimators are trained once, by the profile. The full results
+        per candidate are kept in ``self.results``, and each evaluator in ``self.evaluators`` can still render its own report.
+
+        See `TableEvaluator.evaluate` for the parameters.
+
+        :return: leaderboard with one row per candidate and one column per metric, sorted by ``Similarity Score`` if it was computed
+        """
+        warnings.filterwarnings(action='ignore', category=ConvergenceWarning)
+        pd.options.display.float_format = '{:,.4f}'.format
+
+        first = next(iter(self.evaluators.values()))
+        selected = first.evaluation_plan(target_col, target_type=target_type).select(metrics, skip)
+        if 'estimators' in selected and (target_col, target_type, bool(kfold)) not in self.profile.estimators:
+            self.profile.fit_estimators(target_col, target_type, kfold=kfold)
+
+        def run(evaluator: TableEvaluator) -> Dict[str, Any]:
+            plan = evaluator.evaluation_plan(target_col, target_type=target_type, n_samples_distance=n_samples_distance, kfold=kfold,
+                                             distance_method=distance_method, n_jobs=n_jobs)
+            return plan.run(metrics=metrics, skip=skip, instrumentation=evaluator.instrumentation)
+
+        self.results = self._map(run)
+        leaderboard = pd.DataFrame.from_dict({name: _leaderboard_row(results, target_type) for name, results in self.results.items()},
+                                             orient='index')
+        leaderboard.index.name = 'candidate'
+        if 'Similarity Score' in leaderboard:
+            leaderboard = leaderboard.sort_values('Similarity Score', ascending=False)
+        return leaderboard
+
+    def plot_correlation_comparison(self, annot=False, rplt=False):
+        """
+        Plot the association matrices of all candidates next to the real one, with `viz.plot_correlation_comparison`. The real matrix comes from the
+        profile and the fake matrices are computed concurrently.
+        """
+        self._map(lambda evaluator: evaluator.association_matrix('fake'))
+        return plot_correlation_comparison(list(self.evaluators.values()), annot=annot, rplt=rplt)
+
+    def plot_mean_std_comparison(self, rplt=False):
+        """
+        Plot the means and standard deviations of all candidates, with `viz.plot_mean_std_comparison`.
+        """
+        self._map(lambda evaluator: (evaluator.descriptive_statistics('real'), evaluator.descriptive_statistics('fake')))
+        return plot_mean_std_comparison(list(self.evaluators.values()), rplt=rplt)
@@ -0,0 +1,208 @@
+import numpy as np
+from scipy import sparse as sp
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
+from typing import Dict, Tuple, Type, Union
+
+DEFAULT_MEMORY_BUDGET = 256 * 2 ** 20
+
+
+def _float_dtype(data: Union[np.ndarray, sp.spmatrix]) -> np.dtype:
+    """
+    Floating point type to compute with: float32 for float32 data, float64 for everything else.
+    """
+    return np.dtype(np.float32) if data.dtype == np.float32 else np.dtype(np.float64)
+
+
+class NearestNeighborIndex:
+    """
+    Base class for nearest neighbour backends. A backend is fitted on a reference set and returns, for every query row, the distance to its closest
+    reference row.
+    """
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        """
+        :param memory_budget: upper bound in bytes for the temporary memory used while querying.
+        """
+        self.memory_budget = memory_budget
+        self.reference = None
+
+    def fit(self, reference: np.ndarray) -> 'NearestNeighborIndex':
+        self.reference = np.ascontiguousarray(reference, dtype=_float_dtype(np.asarray(reference)))
+        return self
+
+    def query(self, queries: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+
+def _squared_row_norms(matrix: Union[np.ndarray, sp.csr_matrix]) -> np.ndarray:
+    if not sp.issparse(matrix):
+        return np.einsum('ij,ij->i', matrix, matrix)
+    return np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()
+
+
+class BruteForceIndex(NearestNeighborIndex):
+    """
+    Exact nearest neighbours. Queries are compared against the reference set in fixed-size blocks whose distance matrices fit in ``memory_budget``,
+    and only the running minimum per query row is kept. Results are identical to taking the row-wise minimum of a full `cdist` matrix.
+
+    Sparse (CSR) inputs are supported for the euclidean metric. Blocks of squared distances are then computed as ``|a|^2 + |b|^2 - 2 a.b`` with a
+    sparse matrix product, so the cost scales with the number of non-zeros instead of the number of columns. The distance to the closest reference
+    row found this way is recomputed exactly from the row difference, so exact copies still get a distance of 0. Dense float32 inputs take the same
+    path with the euclidean metric, as `cdist` always computes in float64, while the matrix product runs in single precision.
+    """
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET, metric: str = 'euclidean'):
+        """
+        :param memory_budget: upper bound in bytes for a single block of the distance matrix.
+        :param metric: any metric supported by `scipy.spatial.distance.cdist`.
+        """
+        super().__init__(memory_budget)
+        self.metric = metric
+
+    def fit(self, reference: Union[np.ndarray, sp.spmatrix]) -> 'BruteForceIndex':
+        if not sp.issparse(reference):
+            return super().fit(reference)
+        self.reference = sp.csr_matrix(reference, dtype=_float_dtype(reference))
+        return self
+
+    def block_shape(self, n_queries: int, itemsize: int = 8) -> Tuple[int, int]:
+        """
+        Number of query rows and reference rows compared at once, such that a block with ``itemsize`` bytes per pair of rows stays within the memory
+        budget.
+        """
+        elements = max(1, self.memory_budget // itemsize)
+        reference_block = min(self.reference.shape[0], elements)
+        query_block = max(1, min(n_queries, elements // max(1, reference_block)))
+        return query_block, reference_block
+
+    def query(self, queries: Union[np.ndarray, sp.spmatrix]) -> np.ndarray:
+        dtype = np.result_type(_float_dtype(queries if sp.issparse(queries) else np.asarray(queries)), self.reference.dtype)
+        if sp.issparse(queries) or sp.issparse(self.reference):
+            if self.metric != 'euclidean':
+                raise ValueError(f'Sparse inputs are only supported for the euclidean metric, not {self.metric}.')
+            return self._query_product(sp.csr_matrix(queries, dtype=dtype), sp.csr_matrix(self.reference, dtype=dtype))
+        queries = np.ascontiguousarray(queries, dtype=dtype)
+        if dtype == np.float32 and self.metric == 'euclidean':
+            return self._query_product(queries, self.reference)
+        query_block, reference_block = self.block_shape(len(queries))
+        min_distances = np.full(len(queries), np.inf)
+        for q_start in range(0, len(queries), query_block):
+            q_stop = q_start + query_block
+            for r_start in range(0, len(self.reference), reference_block):
+                distances = cdist(queries[q_start:q_stop], self.reference[r_start:r_start + reference_block], metric=self.metric)
+                np.minimum(min_distances[q_start:q_stop], distances.min(axis=1), out=min_distances[q_start:q_stop])
+        return min_distances
+
+    def _query_product(self, queries: Union[np.ndarray, sp.csr_matrix], reference: Union[np.ndarray, sp.csr_matrix]) -> np.ndarray:
+        """
+        Euclidean distances from the matrix product of blocks of queries and reference rows, both CSR matrices or both dense arrays.
+        """
+        query_norms = _squared_row_norms(queries)
+        reference_norms = _squared_row_norms(reference)
+
+        # The sparse product, its dense copy and the squared distances are alive at the same time, so budget three values per pair.
+        query_block, reference_block = self.block_shape(queries.shape[0], itemsize=3 * queries.dtype.itemsize)
+        min_distances = np.empty(queries.shape[0])
+        for q_start in range(0, queries.shape[0], query_block):
+            q_stop = min(q_start + query_block, queries.shape[0])
+            block = queries[q_start:q_stop]
+            best = np.full(q_stop - q_start, np.inf)
+            best_index = np.zeros(q_stop - q_start, dtype=np.int64)
+            for r_start in range(0, reference.shape[0], reference_block):
+                r_stop = min(r_start + reference_block, reference.shape[0])
+                squared = block @ reference[r_start:r_stop].T
+                if sp.issparse(squared):
+                    squared = squared.toarray()
+                squared *= -2
+                squared += query_norms[q_start:q_stop, None]
+                squared += reference_norms[None, r_start:r_stop]
+                candidates = squared.argmin(axis=1)
+                candidate_distances = squared[np.arange(len(candidates)), candidates]
+                improved = candidate_distances < best
+                best[improved] = candidate_distances[improved]
+                best_index[improved] = candidates[improved] + r_start
+            difference = block - reference[best_index]
+            min_distances[q_start:q_stop] = np.sqrt(_squared_row_norms(difference))
+        return min_distances
+
+
+class KDTreeIndex(NearestNeighborIndex):
+    """
+    Exact nearest neighbours using a kd-tree on the reference set. Memory grows linearly with the number of rows. Fast for low-dimensional data, but
+    degrades towards brute force for wide tables.
+    """
+    eps = 0.0
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET, leafsize: int = 32, n_jobs: int = 1):
+        """
+        :param memory_budget: upper bound in bytes for the per-block query results.
+        :param leafsize: leaf size of the kd-tree.
+        :param n_jobs: number of threads used for querying. -1 uses all cores.
+        """
+        super().__init__(memory_budget)
+        self.leafsize = leafsize
+        self.n_jobs = n_jobs
+        self.tree = None
+
+    def fit(self, reference: np.ndarray) -> 'KDTreeIndex':
+        if sp.issparse(reference):
+            raise ValueError('kd-tree backends do not support sparse inputs, use the `exact` backend instead.')
+        super().fit(reference)
+        self.tree = cKDTree(self.reference, leafsize=self.leafsize)
+        return self
+
+    def query(self, queries: np.ndarray) -> np.ndarray:
+        if sp.issparse(queries):
+            raise ValueError('kd-tree backends do not support sparse inputs, use the `exact` backend instead.')
+        queries = np.ascontiguousarray(queries, dtype=float)
+        block = max(1, self.memory_budget // 16)
+        min_distances = np.empty(len(queries))
+        for start in range(0, len(queries), block):
+            min_distances[start:start + block], _ = self.tree.query(queries[start:start + block], k=1, eps=self.eps, workers=self.n_jobs)
+        return min_distances
+
+
+class ApproximateKDTreeIndex(KDTreeIndex):
+    """
+    Approximate nearest neighbours using a kd-tree that prunes branches early. Every returned distance is at most ``(1 + eps)`` times the exact one.
+    """
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET, leafsize: int = 32, n_jobs: int = 1, eps: float = 0.1):
+        """
+        :param eps: allowed relative error of the returned distances.
+        """
+        super().__init__(memory_budget, leafsize=leafsize, n_jobs=n_jobs)
+        self.eps = eps
+
+
+NEAREST_NEIGHBOR_BACKENDS: Dict[str, Type[NearestNeighborIndex]] = {
+    'exact': BruteForceIndex,
+    'kdtree': KDTreeIndex,
+    'approximate': ApproximateKDTreeIndex,
+}
+
+
+def register_backend(name: str, backend: Type[NearestNeighborIndex]):
+    """
+    Make a custom `NearestNeighborIndex` subclass available under ``name`` for `nearest_neighbor_distances` and `TableEvaluator.row_distance`.
+    """
+    NEAREST_NEIGHBOR_BACKENDS[name] = backend
+
+
+def nearest_neighbor_distances(queries: Union[np.ndarray, sp.spmatrix], reference: Union[np.ndarray, sp.spmatrix], method: str = 'exact',
+                               memory_budget: int = DEFAULT_MEMORY_BUDGET, **kwargs) -> np.ndarray:
+    """
+    Distance from every row in ``queries`` to its closest row in ``reference``.
+
+    :param queries: 2-D array or sparse matrix with the query rows. Sparse inputs require the ``exact`` backend.
+    :param reference: 2-D array or sparse matrix with the reference rows
+    :param method: name of a registered backend. Choose from [``exact``, ``kdtree``, ``approximate``] or a custom backend.
+    :param memory_budget: upper bound in bytes for the temporary memory used by the backend.
+    :param kwargs: backend specific keyword arguments
+    :return: 1-D array with one distance per query row
+    """
+    if method not in NEAREST_NEIGHBOR_BACKENDS:
+        raise ValueError(f'`method` must be one of {list(NEAREST_NEIGHBOR_BACKENDS)}, but is {method}.')
+    index = NEAREST_NEIGHBOR_BACKENDS[method](memory_budget=memory_budget, **kwargs)
+    return index.fit(reference).query(queries)
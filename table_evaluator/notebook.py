@@ -32,21 +32,21 @@ class EvaluationResult(object):
             if self.appendix: print(self.appendix)
 
 
-def visualize_notebook(table_evaluator, overview, privacy_metrics, ml_efficacy, statistical):
+def visualize_notebook(table_evaluator, overview, privacy_metrics, ml_efficacy, statistical, timings=()):
     dashboards = []
-    for tab in [overview, privacy_metrics, ml_efficacy, statistical]:
+    for tab in [overview, privacy_metrics, ml_efficacy, statistical, timings]:
         plots = []
         for evaluation_report in tab:
             evaluation_report.notebook = True
             plots.append(evaluation_report.show())
-        if plots:
-            dashboards.append(widgets.VBox(plots))
+        dashboards.append(widgets.VBox(plots))
     display(HTML(f'<h1 style="text-align: center">Synthetic Data Report</h1>'))
     tab = widgets.Tab(dashboards)
     tab.set_title(0, 'Overview')
     tab.set_title(1, 'Privacy Metrics')
     tab.set_title(2, 'ML Efficacy')
     tab.set_title(3, 'Statistical Metrics')
+    tab.set_title(4, 'Timings')
     display(tab)
 
 
@@ -0,0 +1,28 @@
+import os
+import shutil
+import tempfile
+import joblib
+import numpy as np
+from contextlib import contextmanager
+from typing import Iterator, List
+
+
+@contextmanager
+def shared_arrays(*arrays: np.ndarray) -> Iterator[List[np.memmap]]:
+    """
+    Dump arrays once to a temporary folder and yield read-only memory maps of them. Memory maps passed to `joblib.Parallel` are sent to the workers
+    by reference, so every task reads the same pages instead of receiving its own pickled copy. The folder is removed on exit.
+
+    :param arrays: NumPy arrays to share
+    :return: list with one read-only `np.memmap` per array
+    """
+    folder = tempfile.mkdtemp(prefix='table_evaluator_')
+    try:
+        maps = []
+        for i, array in enumerate(arrays):
+            path = os.path.join(folder, f'array_{i}.pkl')
+            joblib.dump(np.ascontiguousarray(array), path)
+            maps.append(joblib.load(path, mmap_mode='r'))
+        yield maps
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,87 @@
+import numpy as np
+from typing import Dict, Tuple, Union
+from sklearn.decomposition import PCA, IncrementalPCA
+
+PCA_SOLVERS = ('auto', 'full', 'randomized', 'incremental')
+# The ``auto`` solver only switches to a randomized SVD for samples with more rows and columns than these; the full SVD of a tall and narrow
+# matrix is faster.
+PCA_FULL_MAX_ROWS = 50000
+PCA_FULL_MAX_COLUMNS = 50
+
+
+def fit_pca(data: np.ndarray, n_components: int = 5, solver: str = 'auto', seed: int = None, batch_size: int = None) -> Union[PCA, IncrementalPCA]:
+    """
+    Fit a PCA with the given solver. At most as many components are kept as ``data`` has rows and columns.
+
+    :param data: 2-D array with one column per variable
+    :param n_components: number of components
+    :param solver: ``full`` for an exact SVD, ``randomized`` for the randomized SVD of Halko et al., which is faster for large and wide samples,
+        ``incremental`` for `IncrementalPCA`, which holds only one batch of rows in memory at a time, or ``auto`` for ``randomized`` on samples
+        larger than ``PCA_FULL_MAX_ROWS`` by ``PCA_FULL_MAX_COLUMNS`` and ``full`` otherwise
+    :param seed: random state of the randomized SVD
+    :param batch_size: rows per batch of the ``incremental`` solver, 10000 by default
+    :return: the fitted model
+    """
+    if solver not in PCA_SOLVERS:
+        raise ValueError(f'`solver` must be one of {PCA_SOLVERS}, but is {solver}.')
+    n_components = min(n_components, *data.shape)
+    if solver == 'auto':
+        solver = 'randomized' if data.shape[0] > PCA_FULL_MAX_ROWS and data.shape[1] > PCA_FULL_MAX_COLUMNS else 'full'
+    if solver == 'incremental':
+        return IncrementalPCA(n_components=n_components, batch_size=max(batch_size or 10000, n_components)).fit(data)
+    return PCA(n_components=n_components, svd_solver=solver, random_state=seed).fit(data)
+
+
+class PCAModels:
+    """
+    PCA of the real and the fake data of a `TableEvaluator`, shared by `TableEvaluator.pca_correlation` and `TableEvaluator.plot_pca`. Each
+    dataset is fitted once, on first use, and its projections are cached. Data can be projected onto its own components, or onto the components
+    of the real data (the shared basis), in which the real and the fake projections are directly comparable.
+    """
+
+    def __init__(self, encoding, n_components: int = 5, solver: str = 'auto', seed: int = None, real_model: PCA = None):
+        """
+        :param encoding: `encoding.EncodedData` whose ordinal matrices are decomposed
+        :param n_components: number of components of every fit
+        :param solver: see `fit_pca`
+        :param seed: see `fit_pca`
+        :param real_model: PCA already fitted to the real ordinal matrix, e.g. by a `profile.RealProfile`
+        """
+        if solver not in PCA_SOLVERS:
+            raise ValueError(f'`solver` must be one of {PCA_SOLVERS}, but is {solver}.')
+        self.encoding = encoding
+        self.n_components = n_components
+        self.solver = solver
+        self.seed = seed
+        self._models: Dict[str, Union[PCA, IncrementalPCA]] = {} if real_model is None else {'real': real_model}
+        self._projections: Dict[Tuple[str, str], np.ndarray] = {}
+
+    def model(self, dataset: str) -> Union[PCA, IncrementalPCA]:
+        """
+        PCA fitted to ``real`` or ``fake``.
+        """
+        if dataset not in ('real', 'fake'):
+            raise ValueError(f'`dataset` must be \'real\' or \'fake\', but is {dataset}.')
+        if dataset not in self._models:
+            self._models[dataset] = fit_pca(self.encoding.ordinal(dataset), n_components=self.n_components, solver=self.solver, seed=self.seed)
+        return self._models[dataset]
+
+    def transform(self, dataset: str, shared_basis: bool = False) -> np.ndarray:
+        """
+        Projection of ``real`` or ``fake`` onto the components of its own fit, or onto the components of the real data if ``shared_basis``.
+
+        :return: array with one row per sample and one column per component
+        """
+        basis = 'real' if shared_basis else dataset
+        if (dataset, basis) not in self._projections:
+            self._projections[dataset, basis] = self.model(basis).transform(self.encoding.ordinal(dataset))
+        return self._projections[dataset, basis]
+
+    def explained_variance(self, dataset: str, shared_basis: bool = False) -> np.ndarray:
+        """
+        Variance of ``real`` or ``fake`` along every component: the explained variances of its own fit, or the variances of its projection onto
+        the components of the real data if ``shared_basis``.
+        """
+        if not shared_basis or dataset == 'real':
+            return self.model(dataset).explained_variance_
+        return self.transform(dataset, shared_basis=True).var(axis=0, ddof=1)
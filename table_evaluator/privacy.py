@@ -0,0 +1,487 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Sequence, Tuple, Union
+from .neighbors import NearestNeighborIndex, DEFAULT_MEMORY_BUDGET
+
+# Multiplier of the polynomial hash that combines the bucket numbers of a table into one 64-bit key.
+_KEY_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+# Bucket number of missing numerical values.
+_MISSING_BUCKET = np.int64(-2 ** 62)
+# Low bits of a key that order the rows within their bucket.
+_POSITION_BITS = np.uint64(24)
+
+
+class GowerIndex(NearestNeighborIndex):
+    """
+    Approximate nearest neighbours of mixed-type rows under the Gower distance: the mean over all columns of the absolute difference divided by
+    the range of the reference column (at most 1) for numerical columns, and of 0 for equal and 1 for different values for categorical columns.
+    Missing numerical values are at distance 1 of everything.
+
+    Candidates are found with locality-sensitive hashing. A hash function picks a random column. A numerical column is cut into buckets of
+    ``bucket_width`` times its range at a random offset, and a categorical column hashes to its code. With ``bucket_width=1``, two rows collide
+    with probability ``1 - gower(a, b)``; narrower buckets separate distant numerical values faster. ``n_hashes`` functions make up the key of
+    each of ``n_tables`` hash tables. Close rows then share a bucket in at least one table with high probability, while a query only meets a
+    small part of the reference rows.
+
+    Every table is a sorted array of keys searched with `np.searchsorted`. The low bits of a key order the rows within their bucket by a random
+    projection. A query takes the ``max_candidates`` rows of its bucket that lie closest to it in that order. Candidates get their exact Gower
+    distance. A query without candidates falls back to an exact blocked search.
+
+    One index serves both sides of a privacy evaluation: `query` gives the distance from every synthetic row to its closest real row, `baseline`
+    the distance from real rows to their closest other real row.
+    """
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET, categorical: Sequence[int] = (), n_tables: int = 10, n_hashes: int = None,
+                 bucket_width: float = 0.25, max_candidates: int = 64, seed: int = None):
+        """
+        :param memory_budget: upper bound in bytes for the temporary memory used while querying
+        :param categorical: positions of the categorical columns, which hold integer codes
+        :param n_tables: number of hash tables. More tables find more true nearest neighbours; every table costs about 12 bytes per reference row.
+        :param n_hashes: number of hash functions per table. More functions make smaller buckets. If None, it is chosen such that two random
+            reference rows collide in a table with a chance of about ``max_candidates / n_rows``.
+        :param bucket_width: width of the buckets of numerical columns, relative to the range of the column
+        :param max_candidates: largest number of candidates taken from one bucket of one table
+        :param seed: seed of the hash functions
+        """
+        super().__init__(memory_budget)
+        self.categorical = np.asarray(categorical, dtype=np.int64)
+        self.n_tables = n_tables
+        self.n_hashes = n_hashes
+        self.bucket_width = bucket_width
+        self.max_candidates = max_candidates
+        self.seed = seed
+        self.columns: List = None
+        self.categories: Dict[str, pd.Index] = {}
+
+    @classmethod
+    def from_frame(cls, reference: pd.DataFrame, categorical_columns: List, **kwargs) -> 'GowerIndex':
+        """
+        Index the rows of a DataFrame. DataFrames passed to `query` are encoded with the categories of ``reference``; categories it lacks are at
+        distance 1 of every reference row.
+
+        :param reference: reference (real) rows
+        :param categorical_columns: columns compared as categorical
+        :param kwargs: passed to the constructor
+        """
+        columns = reference.columns.tolist()
+        index = cls(categorical=[columns.index(col) for col in categorical_columns], **kwargs)
+        index.columns = columns
+        for col in categorical_columns:
+            index.categories[col] = pd.Index(pd.factorize(reference[col], use_na_sentinel=False)[1])
+        return index.fit(index.encode(reference))
+
+    def encode(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Numerical matrix of a DataFrame with the columns of `from_frame`, categorical columns replaced by their codes.
+        """
+        if self.columns is None:
+            raise ValueError('Only indexes built with `from_frame` can encode DataFrames.')
+        matrix = np.empty((len(data), len(self.columns)))
+        for i, col in enumerate(self.columns):
+            if col in self.categories:
+                matrix[:, i] = self.categories[col].get_indexer(data[col].to_numpy(dtype=object))
+            else:
+                matrix[:, i] = data[col].to_numpy(dtype=float)
+        return matrix
+
+    def _split(self, data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Numerical columns scaled to the unit range of the reference, and categorical codes.
+        """
+        return (data[:, self._numerical_positions] - self._minimum) / self._range, data[:, self.categorical].astype(np.int64)
+
+    def fit(self, reference: Union[np.ndarray, pd.DataFrame]) -> 'GowerIndex':
+        if isinstance(reference, pd.DataFrame):
+            reference = self.encode(reference)
+        super().fit(reference)
+        n_rows, n_columns = self.reference.shape
+        self._numerical_positions = np.setdiff1d(np.arange(n_columns), self.categorical)
+        self._value_positions = {column: i for i, column in enumerate(self._numerical_positions)}
+        self._code_positions = {column: i for i, column in enumerate(self.categorical)}
+        numerical = self.reference[:, self._numerical_positions]
+        observed = ~np.isnan(numerical)
+        minimum = np.min(numerical, axis=0, initial=np.inf, where=observed)
+        span = np.max(numerical, axis=0, initial=-np.inf, where=observed) - minimum
+        self._minimum = np.where(np.isfinite(minimum), minimum, 0.0)
+        self._range = np.where(np.isfinite(span) & (span > 0), span, 1.0)
+        self._values, self._codes = self._split(self.reference)
+
+        rng = np.random.default_rng(self.seed)
+        if self.n_hashes is None:
+            self.n_hashes = self._default_n_hashes(rng)
+        self._hash_columns = rng.integers(0, n_columns, size=(self.n_tables, self.n_hashes))
+        self._hash_offsets = rng.uniform(0, self.bucket_width, size=(self.n_tables, self.n_hashes))
+        # Rows within a bucket are ordered by a random projection of the numerical columns, or of the codes if there are none.
+        self._directions = rng.normal(size=(self.n_tables, self._values.shape[1] or self._codes.shape[1]))
+        projections = self._project(self._values, self._codes)
+        self._projection_range = np.min(projections, axis=0, initial=np.inf), np.max(projections, axis=0, initial=-np.inf)
+        index_dtype = np.int32 if n_rows < 2 ** 31 else np.int64
+        self._orders, self._keys = [], []
+        for table in range(self.n_tables):
+            keys = self._keys_of(self._values, self._codes, projections, table)
+            order = np.argsort(keys, kind='stable').astype(index_dtype)
+            self._orders.append(order)
+            self._keys.append(keys[order])
+        return self
+
+    def _default_n_hashes(self, rng: np.random.Generator, n_pairs: int = 1000) -> int:
+        """
+        Number of hash functions per table such that two random reference rows share a bucket with a chance of about
+        ``max_candidates / n_rows``, estimated from the collision chances of a sample of random pairs.
+        """
+        n_rows, n_columns = self.reference.shape
+        if n_rows <= self.max_candidates or n_columns == 0:
+            return 1
+        first, second = rng.integers(0, n_rows, n_pairs), rng.integers(0, n_rows, n_pairs)
+        # A function on a numerical column separates two values with a chance of their distance over the bucket width, at most 1.
+        separated = np.fmin(np.abs(self._values[first] - self._values[second]) / self.bucket_width, 1.0).sum(axis=1)
+        separated += (self._codes[first] != self._codes[second]).sum(axis=1)
+        collision = 1 - separated / n_columns
+        n_hashes = np.arange(1, 65)
+        chances = (collision[None, :] ** n_hashes[:, None]).mean(axis=1)
+        return int(n_hashes[np.argmax(chances <= self.max_candidates / n_rows)]) if np.any(chances <= self.max_candidates / n_rows) else 64
+
+    def _hash(self, values: np.ndarray, codes: np.ndarray, table: int) -> np.ndarray:
+        """
+        Bucket hash of every row in hash table ``table``.
+        """
+        keys = np.zeros(len(values), dtype=np.uint64)
+        for column, offset in zip(self._hash_columns[table], self._hash_offsets[table]):
+            if column in self._code_positions:
+                buckets = codes[:, self._code_positions[column]]
+            else:
+                with np.errstate(invalid='ignore'):
+                    buckets = np.floor((values[:, self._value_positions[column]] + offset) / self.bucket_width)
+                buckets = np.where(np.isnan(buckets), _MISSING_BUCKET, buckets).astype(np.int64)
+            # Every function mixes in its column, so equal bucket numbers of different columns give different keys.
+            keys *= _KEY_MULTIPLIER
+            keys += buckets.view(np.uint64) ^ np.uint64(column)
+        return keys
+
+    def _project(self, values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        Projection of every row onto the random direction of every table.
+
+        :return: array of shape ``(n_rows, n_tables)``
+        """
+        data = np.nan_to_num(values) if values.shape[1] else codes.astype(float)
+        return data @ self._directions.T
+
+    def _keys_of(self, values: np.ndarray, codes: np.ndarray, projections: np.ndarray, table: int) -> np.ndarray:
+        """
+        Keys of every row in hash table ``table``: the bucket hash in the high bits and the quantized projection in the low bits.
+        """
+        low, high = self._projection_range[0][table], self._projection_range[1][table]
+        levels = 2 ** int(_POSITION_BITS)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            position = np.clip((projections[:, table] - low) / (high - low) * levels, 0, levels - 1) if high > low else np.zeros(len(values))
+        return (self._hash(values, codes, table) << _POSITION_BITS) | position.astype(np.uint64)
+
+    def _pair_distances(self, values: np.ndarray, codes: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """
+        Gower distance between every query row (given by its scaled values and codes) and the reference row at the same position in
+        ``candidates``.
+        """
+        n_columns = self.reference.shape[1]
+        distances = np.fmin(np.abs(values - self._values[candidates]), 1.0).sum(axis=1)
+        distances += (codes != self._codes[candidates]).sum(axis=1)
+        return distances / max(n_columns, 1)
+
+    def _exact(self, values: np.ndarray, codes: np.ndarray, exclude: np.ndarray = None) -> np.ndarray:
+        """
+        Exact Gower distance of every query row to its closest reference row, comparing blocks of queries with all reference rows.
+
+        :param exclude: reference position per query row that does not count, e.g. the query row itself
+        """
+        n_rows, n_columns = self.reference.shape
+        block = max(1, self.memory_budget // (16 * max(n_rows, 1)))
+        min_distances = np.full(len(values), np.inf)
+        for start in range(0, len(values), block):
+            stop = min(start + block, len(values))
+            distances = np.zeros((stop - start, n_rows))
+            for i in range(values.shape[1]):
+                distances += np.fmin(np.abs(values[start:stop, i, None] - self._values[None, :, i]), 1.0)
+            for i in range(codes.shape[1]):
+                distances += codes[start:stop, i, None] != self._codes[None, :, i]
+            if exclude is not None:
+                distances[np.arange(stop - start), exclude[start:stop]] = np.inf
+            if n_rows:
+                min_distances[start:stop] = distances.min(axis=1) / max(n_columns, 1)
+        return min_distances
+
+    def _query(self, values: np.ndarray, codes: np.ndarray, exclude: np.ndarray = None) -> np.ndarray:
+        """
+        Approximate Gower distance of every query row to its closest reference row, see `query`.
+        """
+        n_columns = max(self.reference.shape[1], 1)
+        # Every pair of a query and a candidate needs its row of differences, plus the candidate and query positions.
+        block = max(1, self.memory_budget // (self.n_tables * self.max_candidates * (16 * n_columns + 32)))
+        min_distances = np.empty(len(values))
+        for start in range(0, len(values), block):
+            stop = min(start + block, len(values))
+            block_values, block_codes = values[start:stop], codes[start:stop]
+            projections = self._project(block_values, block_codes)
+            rows, candidates = [], []
+            for table in range(self.n_tables):
+                keys = self._keys_of(block_values, block_codes, projections, table)
+                bucket = (keys >> _POSITION_BITS) << _POSITION_BITS
+                lower = np.searchsorted(self._keys[table], bucket, side='left')
+                upper = np.searchsorted(self._keys[table], bucket | np.uint64(2 ** int(_POSITION_BITS) - 1), side='right')
+                counts = np.minimum(upper - lower, self.max_candidates)
+                # The run of ``counts`` rows of the bucket centered on the position of the query.
+                first = np.searchsorted(self._keys[table], keys, side='left') - self.max_candidates // 2
+                first = np.clip(first, lower, upper - counts)
+                within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+                rows.append(np.repeat(np.arange(stop - start), counts))
+                candidates.append(self._orders[table][np.repeat(first, counts) + within])
+            rows, candidates = np.concatenate(rows), np.concatenate(candidates).astype(np.int64)
+            if exclude is not None:
+                keep = candidates != exclude[start:stop][rows]
+                rows, candidates = rows[keep], candidates[keep]
+
+            best = np.full(stop - start, np.inf)
+            np.minimum.at(best, rows, self._pair_distances(block_values[rows], block_codes[rows], candidates))
+            missing = np.flatnonzero(np.isinf(best))
+            if len(missing):
+                best[missing] = self._exact(block_values[missing], block_codes[missing], None if exclude is None else exclude[start:stop][missing])
+            min_distances[start:stop] = best
+        return min_distances
+
+    def query(self, queries: Union[np.ndarray, pd.DataFrame], exact: bool = False) -> np.ndarray:
+        """
+        Gower distance from every query row to its closest reference row.
+
+        :param queries: rows with the columns of the reference, as a matrix with the same layout or, for an index built with `from_frame`, as a
+            DataFrame
+        :param exact: compare every query with all reference rows instead of with its candidates, e.g. to measure the recall of the index
+        :return: 1-D array with one distance per query row
+        """
+        if isinstance(queries, pd.DataFrame):
+            queries = self.encode(queries)
+        values, codes = self._split(np.asarray(queries, dtype=float))
+        return self._exact(values, codes) if exact else self._query(values, codes)
+
+    def baseline(self, n_samples: int = None, seed: int = None, exact: bool = False) -> np.ndarray:
+        """
+        Gower distance from reference rows to their closest other reference row, from the same index. This is the distance to expect between a
+        real row and the real data, against which the distances of the synthetic rows are judged. Exact copies among the reference rows are
+        at distance 0.
+
+        :param n_samples: number of reference rows to query, sampled without replacement. All rows if None.
+        :param seed: seed of the sample
+        :param exact: compare with all reference rows instead of with the candidates only
+        :return: 1-D array with one distance per sampled reference row
+        """
+        n_rows = len(self.reference)
+        positions = np.arange(n_rows)
+        if n_samples is not None and n_samples < n_rows:
+            positions = np.sort(np.random.default_rng(seed).choice(n_rows, n_samples, replace=False))
+        values, codes = self._values[positions], self._codes[positions]
+        return self._exact(values, codes, exclude=positions) if exact else self._query(values, codes, exclude=positions)
+
+
+def _mix(keys: np.ndarray) -> np.ndarray:
+    """
+    SplitMix64 finalizer, spreading similar 64-bit keys over the whole range.
+    """
+    keys = keys ^ (keys >> np.uint64(30))
+    keys *= np.uint64(0xBF58476D1CE4E5B9)
+    keys ^= keys >> np.uint64(27)
+    keys *= np.uint64(0x94D049BB133111EB)
+    return keys ^ (keys >> np.uint64(31))
+
+
+class MinHashIndex:
+    """
+    Near copies among mixed-type rows: query rows that equal a reference row in all but at most ``max_mismatches`` columns, where numerical values
+    within ``resolution`` times the range of the reference column count as equal.
+
+    Every row is turned into one token per column: its code for categorical columns, and for numerical columns the bucket of width
+    ``resolution`` times the range. Rows are compared by the Jaccard similarity of their token sets, estimated with MinHash signatures of
+    ``n_bands`` bands of ``band_size`` hash values each. Rows that agree on all values of at least one band share a bucket, and only the pairs of
+    a query row and the reference rows in its buckets are verified column by column.
+
+    Like in `GowerIndex`, every band is a sorted array of keys whose low bits order the rows within their bucket, here by one more MinHash value.
+    A query takes at most ``max_candidates`` rows of its bucket in every band, those closest to it in that order, so time and memory stay linear
+    in the number of rows even if most rows share a bucket, as on tables with few categories.
+    """
+
+    def __init__(self, categorical: Sequence[int] = (), max_mismatches: int = 1, resolution: float = 0.01, n_bands: int = 20, band_size: int = None,
+                 max_candidates: int = 100, memory_budget: int = DEFAULT_MEMORY_BUDGET, seed: int = None):
+        """
+        :param categorical: positions of the categorical columns, which hold integer codes
+        :param max_mismatches: largest number of differing columns of a near copy
+        :param resolution: width of the buckets of numerical columns relative to the range of the column, and the largest difference of equal
+            numerical values
+        :param n_bands: number of LSH bands. More bands find more near copies and cost more time.
+        :param band_size: hash values per band. Larger bands make smaller buckets. If None, the smallest size is taken for which a query row is
+            expected to meet at most ``max_candidates`` random reference rows.
+        :param max_candidates: largest number of candidates taken from one bucket of one band, and target number of candidates per query row of
+            the automatic ``band_size``
+        :param memory_budget: upper bound in bytes for the temporary memory used while querying
+        :param seed: seed of the hash functions
+        """
+        self.categorical = np.asarray(categorical, dtype=np.int64)
+        self.max_mismatches = max_mismatches
+        self.resolution = resolution
+        self.n_bands = n_bands
+        self.band_size = band_size
+        self.max_candidates = max_candidates
+        self.memory_budget = memory_budget
+        self.seed = seed
+        self.reference = None
+
+    def fit(self, reference: np.ndarray) -> 'MinHashIndex':
+        self.reference = np.ascontiguousarray(reference, dtype=float)
+        n_rows, n_columns = self.reference.shape
+        self._numerical_positions = np.setdiff1d(np.arange(n_columns), self.categorical)
+        numerical = self.reference[:, self._numerical_positions]
+        observed = ~np.isnan(numerical)
+        minimum = np.min(numerical, axis=0, initial=np.inf, where=observed)
+        span = np.max(numerical, axis=0, initial=-np.inf, where=observed) - minimum
+        self._minimum = np.where(np.isfinite(minimum), minimum, 0.0)
+        self._range = np.where(np.isfinite(span) & (span > 0), span, 1.0)
+
+        rng = np.random.default_rng(self.seed)
+        self._tokens = self._tokenize(self.reference)
+        if self.band_size is None:
+            self.band_size = self._default_band_size(rng)
+        # Every band has ``band_size`` hash functions for its bucket and one that orders the rows within the bucket.
+        n_hashes = self.n_bands * (self.band_size + 1)
+        # Multiply-add hash functions on the mixed tokens; odd multipliers keep them one to one.
+        self._multipliers = rng.integers(0, 2 ** 63, size=n_hashes, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._increments = rng.integers(0, 2 ** 63, size=n_hashes, dtype=np.uint64)
+        self._orders, self._keys = [], []
+        for band in range(self.n_bands):
+            keys = self._band_keys(self._tokens, band)
+            order = np.argsort(keys, kind='stable')
+            self._orders.append(order)
+            self._keys.append(keys[order])
+        return self
+
+    def _tokenize(self, data: np.ndarray) -> np.ndarray:
+        """
+        Token of every value: a 64-bit hash of its column and its code or bucket.
+
+        :return: uint64 array of the shape of ``data``
+        """
+        buckets = np.empty(data.shape, dtype=np.int64)
+        buckets[:, self.categorical] = data[:, self.categorical]
+        with np.errstate(invalid='ignore'):
+            scaled = np.floor((data[:, self._numerical_positions] - self._minimum) / self._range / self.resolution)
+        buckets[:, self._numerical_positions] = np.where(np.isnan(scaled), _MISSING_BUCKET, scaled)
+        return _mix(buckets.view(np.uint64) * _KEY_MULTIPLIER + np.arange(data.shape[1], dtype=np.uint64))
+
+    def _default_band_size(self, rng: np.random.Generator, n_pairs: int = 1000, max_band_size: int = 16) -> int:
+        """
+        Smallest band size for which a query row is expected to share a bucket with at most ``max_candidates`` reference rows, estimated from the
+        Jaccard similarities of a sample of random pairs of reference rows.
+        """
+        n_rows, n_columns = self._tokens.shape
+        if n_rows <= self.max_candidates or n_columns == 0:
+            return 1
+        first, second = rng.integers(0, n_rows, n_pairs), rng.integers(0, n_rows, n_pairs)
+        shared = (self._tokens[first] == self._tokens[second]).sum(axis=1)
+        similarity = shared / (2 * n_columns - shared)
+        for band_size in range(1, max_band_size + 1):
+            if n_rows * np.mean(1 - (1 - similarity ** band_size) ** self.n_bands) <= self.max_candidates:
+                return band_size
+        return max_band_size
+
+    def _minhash(self, tokens: np.ndarray, h: int) -> np.ndarray:
+        return (tokens * self._multipliers[h] + self._increments[h]).min(axis=1, initial=np.iinfo(np.uint64).max)
+
+    def _band_keys(self, tokens: np.ndarray, band: int) -> np.ndarray:
+        """
+        Key of every row in band ``band``: the combined MinHash values of the bucket hash functions of the band in the high bits, and the high bits
+        of its ordering MinHash value in the low bits.
+        """
+        first = band * (self.band_size + 1)
+        keys = np.zeros(len(tokens), dtype=np.uint64)
+        for h in range(first, first + self.band_size):
+            keys *= _KEY_MULTIPLIER
+            keys += self._minhash(tokens, h)
+        position = self._minhash(tokens, first + self.band_size) >> (np.uint64(64) - _POSITION_BITS)
+        return (keys << _POSITION_BITS) | position
+
+    def _mismatches(self, queries: np.ndarray, rows: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """
+        Number of differing columns between every query row in ``rows`` and the reference row at the same position in ``candidates``, compared
+        one column at a time so that no rows of pairs are materialized.
+        """
+        mismatches = np.zeros(len(rows), dtype=np.int64)
+        for i, column in enumerate(self._numerical_positions):
+            query_values, reference_values = queries[rows, column], self.reference[candidates, column]
+            with np.errstate(invalid='ignore'):
+                equal = np.abs(query_values - reference_values) <= self.resolution * self._range[i]
+            mismatches += ~(equal | (np.isnan(query_values) & np.isnan(reference_values)))
+        for column in self.categorical:
+            mismatches += queries[rows, column] != self.reference[candidates, column]
+        return mismatches
+
+    def query(self, queries: np.ndarray, exclude: np.ndarray = None) -> pd.DataFrame:
+        """
+        Closest near copy of every query row: the reference row with the fewest differing columns among its candidates, if that is at most
+        ``max_mismatches``.
+
+        :param queries: rows with the columns of the reference, in the same layout
+        :param exclude: reference position per query row that does not count, e.g. the query row itself
+        :return: DataFrame with columns ``query`` and ``reference`` (row positions) and ``mismatches``, with one row per query row that is a near
+            copy, sorted by ``query``
+        """
+        queries = np.ascontiguousarray(queries, dtype=float)
+        n_rows = len(self.reference)
+        # A query row has at most ``max_candidates`` candidates per band, and every pair needs about eight 8-byte values: its position pair, the
+        # sort of ``np.unique``, the compared values of one column and the mismatch count.
+        block = max(1, self.memory_budget // (self.n_bands * self.max_candidates * 64))
+        found = [pd.DataFrame({'query': np.empty(0, dtype=np.int64), 'reference': np.empty(0, dtype=np.int64),
+                               'mismatches': np.empty(0, dtype=np.int64)})]
+        for start in range(0, len(queries), block):
+            stop = min(start + block, len(queries))
+            tokens = self._tokenize(queries[start:stop])
+            pairs = []
+            for band in range(self.n_bands):
+                keys = self._band_keys(tokens, band)
+                bucket = (keys >> _POSITION_BITS) << _POSITION_BITS
+                # Sorted keys are searched faster, as every search starts where the previous one ended.
+                order = np.argsort(keys)
+                lower, upper, position = np.empty(len(keys), dtype=np.int64), np.empty(len(keys), dtype=np.int64), np.empty(len(keys), dtype=np.int64)
+                lower[order] = np.searchsorted(self._keys[band], bucket[order], side='left')
+                upper[order] = np.searchsorted(self._keys[band], bucket[order] | np.uint64(2 ** int(_POSITION_BITS) - 1), side='right')
+                position[order] = np.searchsorted(self._keys[band], keys[order], side='left')
+                counts = np.minimum(upper - lower, self.max_candidates)
+                # The run of ``counts`` rows of the bucket centered on the position of the query.
+                first = np.clip(position - self.max_candidates // 2, lower, upper - counts)
+                within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+                pairs.append(np.repeat(np.arange(start, stop), counts) * n_rows + self._orders[band][np.repeat(first, counts) + within])
+            pairs = np.unique(np.concatenate(pairs))
+            rows, candidates = pairs // n_rows, pairs % n_rows
+            if exclude is not None:
+                keep = candidates != exclude[rows]
+                rows, candidates = rows[keep], candidates[keep]
+            mismatches = self._mismatches(queries, rows, candidates)
+            near = mismatches <= self.max_mismatches
+            rows, candidates, mismatches = rows[near], candidates[near], mismatches[near]
+            # Order by query row, then by mismatches, so the first pair of every query row holds its closest candidate.
+            order = np.lexsort((mismatches, rows))
+            first = np.unique(rows[order], return_index=True)[1]
+            found.append(pd.DataFrame({'query': rows[order][first], 'reference': candidates[order][first],
+                                       'mismatches': mismatches[order][first]}))
+        return pd.concat(found, ignore_index=True)
+
+    def baseline(self, n_samples: int = None, seed: int = None) -> pd.DataFrame:
+        """
+        Near copies of reference rows among the other reference rows, from the same index. Tables with few columns or categories hold many near
+        copies of their own rows, and this is the rate to expect of independent synthetic rows, against which the rate of `query` is judged.
+
+        :param n_samples: number of reference rows to query, sampled without replacement. All rows if None.
+        :param seed: seed of the sample
+        :return: DataFrame like `query`, with the reference positions of the sampled rows in ``query``
+        """
+        n_rows = len(self.reference)
+        positions = np.arange(n_rows)
+        if n_samples is not None and n_samples < n_rows:
+            positions = np.sort(np.random.default_rng(seed).choice(n_rows, n_samples, replace=False))
+        pairs = self.query(self.reference[positions], exclude=positions)
+        pairs['query'] = positions[pairs['query'].to_numpy()]
+        return pairs
@@ -0,0 +1,282 @@
+import copy
+import json
+import pickle
+import warnings
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+from sklearn.decomposition import PCA
+from sklearn.exceptions import ConvergenceWarning
+from .associations import compute_associations
+from .descriptive import DescriptiveStatistics
+from .encoding import EncodedData, PRECISIONS
+from .estimators import TARGET_TYPES, estimator_folds, make_estimators, split_target
+from .hashing import RowHashIndex
+from .ingestion import fill_missing, infer_column_types
+from .metrics import binned_probabilities, js_bin_edges
+from .pca import fit_pca
+
+PROFILE_FORMAT_VERSION = 1
+# PCA attributes read by `TableEvaluator.pca_correlation` and needed to transform with the stored model.
+_PCA_ARRAYS = ['components_', 'explained_variance_', 'explained_variance_ratio_', 'singular_values_', 'mean_']
+_PCA_SCALARS = ['n_components_', 'n_samples_', 'n_features_in_', 'noise_variance_']
+
+EstimatorKey = Tuple[str, str, bool]
+
+
+class RealProfile:
+    """
+    Everything a `TableEvaluator` computes from the real data alone, computed once and reused for any number of synthetic candidates: the sampled
+    and prepared real data, its association matrix, row hashes, descriptive statistics, PCA, Jensen-Shannon bins, sorted numerical columns and
+    the estimators trained on it. Pass the profile to `TableEvaluator` in place of the real DataFrame::
+
+        profile = RealProfile.from_frame(real, n_samples=10000, targets={'income': 'class'})
+        profile.save('real.npz')
+        ...
+        profile = RealProfile.load('real.npz')
+        scores = [TableEvaluator(profile, fake).evaluate('income', return_outputs=True) for fake in candidates]
+
+    Categorical codes, and with them the statistics, PCA and estimators, depend on the categories of both datasets. These are only reused for
+    candidates without categories that do not occur in the real data, which is the usual case; otherwise they are recomputed by the evaluator.
+    Results are identical to a `TableEvaluator` on the same real sample either way.
+    """
+
+    def __init__(self, real: pd.DataFrame, numerical_columns: List, categorical_columns: List):
+        """
+        Use `from_frame` or `load` to create a profile.
+
+        :param real: sampled real data, prepared like `TableEvaluator` prepares it (see `ingestion.fill_missing`)
+        :param numerical_columns: numerical columns of ``real``
+        :param categorical_columns: categorical columns of ``real``
+        """
+        self.real = real
+        self.numerical_columns = list(numerical_columns)
+        self.categorical_columns = list(categorical_columns)
+        self.categories: Dict[str, np.ndarray] = {}
+        self.associations: pd.DataFrame = None
+        self.row_hash_index: RowHashIndex = None
+        self.statistics: DescriptiveStatistics = None
+        self.pca: PCA = None
+        self.pca_solver = 'auto'
+        self.pca_seed: int = None
+        self.precision = 'float64'
+        self.js_edges: np.ndarray = None
+        self.js_probabilities: np.ndarray = None
+        self.sorted_numerical: np.ndarray = None
+        self.estimators: Dict[EstimatorKey, List[List]] = {}
+        self._encoding = None
+
+    @classmethod
+    def from_frame(cls, real: pd.DataFrame, cat_cols: List = None, unique_thresh: int = 0, n_samples: int = None,
+                   targets: Dict[str, str] = None, kfold: bool = False, pca_solver: str = 'auto', seed: int = 1337,
+                   precision: str = 'float64') -> 'RealProfile':
+        """
+        Sample the real data and compute its profile.
+
+        :param real: real dataset
+        :param cat_cols: the columns that are to be evaluated as discrete. If None, they are inferred as by `TableEvaluator`.
+        :param unique_thresh: threshold for automatic evaluation if column is numeric
+        :param n_samples: number of rows to sample. Every candidate evaluated against the profile must have at least this many rows. All rows if
+            None.
+        :param targets: target type (``class`` or ``regr``) per target column to train the real estimators for, see `fit_estimators`
+        :param kfold: train the estimators on five folds, as ``TableEvaluator.evaluate(kfold=True)`` does
+        :param pca_solver: SVD solver of the PCA, see `pca.fit_pca`. Evaluators only reuse the PCA if they have the same solver and seed.
+        :param seed: seed of the sample of the real data and random state of the randomized PCA solver, so equal seeds give equal profiles
+        :param precision: floating point type the association matrix is computed in, see `TableEvaluator`. Evaluators only reuse the matrix if
+            they have the same precision.
+        """
+        if cat_cols is None:
+            numerical_columns, categorical_columns = infer_column_types(real, unique_thresh)
+        else:
+            categorical_columns = list(cat_cols)
+            numerical_columns = [column for column in real.columns if column not in cat_cols]
+        if n_samples is not None and n_samples > len(real):
+            raise ValueError(f'n_samples must not exceed the number of rows. len(real): {len(real)}, n_samples: {n_samples}')
+        if precision not in PRECISIONS:
+            raise ValueError(f'`precision` must be one of {PRECISIONS}, but is {precision}.')
+
+        sample = real.sample(len(real) if n_samples is None else n_samples, random_state=np.random.default_rng(seed))
+        fill_missing(sample, numerical_columns, categorical_columns)
+        profile = cls(sample, numerical_columns, categorical_columns)
+        profile.categories = {column: profile.encoding.codebook[column] for column in categorical_columns}
+
+        profile.associations = compute_associations(sample, nominal_columns=categorical_columns, theil_u=True, dtype=precision)
+        profile.precision = precision
+        profile.row_hash_index = RowHashIndex(sample)
+        profile.statistics = DescriptiveStatistics.from_encoding(profile.encoding, 'real')
+        profile.pca = fit_pca(profile.encoding.real_ordinal, n_components=5, solver=pca_solver, seed=seed)
+        profile.pca_solver, profile.pca_seed = pca_solver, seed
+        numerical = sample[numerical_columns].to_numpy(dtype=float)
+        profile.js_edges = js_bin_edges(numerical)
+        profile.js_probabilities = binned_probabilities(numerical, profile.js_edges, uniform=True)
+        profile.sorted_numerical = np.sort(np.ascontiguousarray(numerical.T), axis=1)
+        for target_col, target_type in (targets or {}).items():
+            profile.fit_estimators(target_col, target_type, kfold=kfold)
+        return profile
+
+    @property
+    def columns(self) -> List:
+        return self.real.columns.tolist()
+
+    @property
+    def n_samples(self) -> int:
+        return len(self.real)
+
+    @property
+    def encoding(self) -> EncodedData:
+        """
+        Encoding of the real data with a codebook of the real categories only.
+        """
+        if self._encoding is None:
+            self._encoding = EncodedData(self.real, self.real.iloc[:0], self.categorical_columns)
+        return self._encoding
+
+    def matches(self, encoding: EncodedData) -> bool:
+        """
+        Whether the real codes of a joint encoding of the real and a fake dataset are the codes of this profile, i.e. the fake data has no categories
+        the real data does not have. Only then the statistics, PCA and estimators of the profile apply.
+
+        :param encoding: `EncodedData` of a `TableEvaluator` built on this profile
+        """
+        return all(encoding.codebook.size(column) == len(self.categories[column]) for column in self.categorical_columns)
+
+    def fit_estimators(self, target_col: str, target_type: str = 'class', kfold: bool = False) -> List[List]:
+        """
+        Train the real estimators of `TableEvaluator.estimator_evaluation` for a target, on every fold, and keep them in the profile.
+
+        :param target_col: column to predict
+        :param target_type: ``class`` or ``regr``
+        :param kfold: train on five folds instead of a single 80%/20% split
+        :return: the fitted estimators per fold
+        """
+        if target_type not in TARGET_TYPES:
+            raise ValueError(f'target_type must be \'regr\' or \'class\'')
+        x, y = split_target(self.encoding, 'real', self.real.index, target_col)
+        fitted = []
+        with warnings.catch_warnings():
+            warnings.filterwarnings(action='ignore', category=ConvergenceWarning)
+            for train_index, _ in estimator_folds(len(y), kfold):
+                estimators = copy.deepcopy(make_estimators(target_type))
+                for estimator in estimators:
+                    estimator.fit(x.iloc[train_index], y.iloc[train_index])
+                fitted.append(estimators)
+        self.estimators[(target_col, target_type, bool(kfold))] = fitted
+        return fitted
+
+    def save(self, path: Union[str, Path], compress: bool = False):
+        """
+        Write the profile to a NumPy ``.npz`` archive. Categorical columns are stored as codes with their categories, so no Python objects are
+        pickled except the fitted estimators.
+
+        :param path: file to write
+        :param compress: compress the archive. Smaller, but slower to load.
+        """
+        arrays = {'index': self._index_values()}
+        columns = []
+        for i, column in enumerate(self.columns):
+            if column in self.categorical_columns:
+                categories = self.categories[column]
+                codes = np.searchsorted(categories, self.real[column].to_numpy(dtype=object))
+                arrays[f'codes_{i}'] = codes.astype(np.min_scalar_type(max(len(categories) - 1, 0)))
+                arrays[f'categories_{i}'] = np.array(categories, dtype=str)
+                columns.append({'name': column, 'kind': 'categorical'})
+            else:
+                values = self.real[column].to_numpy()
+                arrays[f'column_{i}'] = values.astype(float) if values.dtype == object else values
+                columns.append({'name': column, 'kind': 'numerical'})
+
+        arrays['associations'] = self.associations.to_numpy(dtype=float)
+        arrays['row_hashes'], arrays['row_order'] = self.row_hash_index.hashes, self.row_hash_index.order
+        statistics = self.statistics
+        arrays.update(statistics_count=statistics.count, statistics_mean=statistics.mean, statistics_m2=statistics.m2,
+                      statistics_minimum=statistics.minimum, statistics_maximum=statistics.maximum,
+                      statistics_quantiles=np.array([statistics.exact_quantiles[level] for level in statistics.levels]))
+        for i, column in enumerate(self.categorical_columns):
+            arrays[f'statistics_counts_{i}'] = statistics.category_counts[column]
+        for attribute in _PCA_ARRAYS:
+            arrays[f'pca_{attribute}'] = getattr(self.pca, attribute)
+        arrays.update(js_edges=self.js_edges, js_probabilities=self.js_probabilities, sorted_numerical=self.sorted_numerical)
+        for i, fitted in enumerate(self.estimators.values()):
+            arrays[f'estimators_{i}'] = np.frombuffer(pickle.dumps(fitted), dtype=np.uint8)
+
+        metadata = {
+            'version': PROFILE_FORMAT_VERSION,
+            'columns': columns,
+            'index_name': self.real.index.name,
+            'statistics_levels': list(statistics.levels),
+            'pca': {attribute: _json_scalar(_pca_attribute(self.pca, attribute)) for attribute in _PCA_SCALARS},
+            'pca_solver': self.pca_solver,
+            'pca_seed': self.pca_seed,
+            'precision': self.precision,
+            'estimators': [list(key) for key in self.estimators],
+        }
+        arrays['metadata'] = np.array(json.dumps(metadata))
+        (np.savez_compressed if compress else np.savez)(path, **arrays)
+
+    def _index_values(self) -> np.ndarray:
+        index = self.real.index.to_numpy()
+        return index.astype(str) if index.dtype == object else index
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'RealProfile':
+        """
+        Read a profile written by `save`. The fitted estimators are unpickled, so only load profiles from a trusted source.
+
+        :param path: file to read
+        """
+        with np.load(path, allow_pickle=False) as archive:
+            arrays = {key: archive[key] for key in archive.files}
+        metadata = json.loads(str(arrays['metadata']))
+        if metadata['version'] != PROFILE_FORMAT_VERSION:
+            raise ValueError(f'Unsupported profile format version {metadata["version"]}, expected {PROFILE_FORMAT_VERSION}.')
+
+        data, numerical_columns, categorical_columns, categories = {}, [], [], {}
+        for i, column in enumerate(metadata['columns']):
+            name = column['name']
+            if column['kind'] == 'categorical':
+                categories[name] = arrays[f'categories_{i}'].astype(object)
+                data[name] = categories[name][arrays[f'codes_{i}']]
+                categorical_columns.append(name)
+            else:
+                data[name] = arrays[f'column_{i}']
+                numerical_columns.append(name)
+        index = pd.Index(arrays['index'], name=metadata['index_name'])
+        profile = cls(pd.DataFrame(data, index=index), numerical_columns, categorical_columns)
+        profile.categories = categories
+
+        columns = profile.columns
+        profile.associations = pd.DataFrame(arrays['associations'], index=columns, columns=columns)
+        profile.row_hash_index = RowHashIndex(profile.real, hashes=arrays['row_hashes'], order=arrays['row_order'])
+        statistics = DescriptiveStatistics.from_moments(
+            numerical_columns, arrays['statistics_count'], arrays['statistics_mean'], arrays['statistics_m2'], arrays['statistics_minimum'],
+            arrays['statistics_maximum'],
+            category_counts={column: pd.Series(arrays[f'statistics_counts_{i}'], index=categories[column])
+                             for i, column in enumerate(categorical_columns)})
+        statistics.quantile_mode, statistics.levels = 'exact', tuple(metadata['statistics_levels'])
+        statistics.exact_quantiles = dict(zip(statistics.levels, arrays['statistics_quantiles']))
+        profile.statistics = statistics
+
+        profile.pca = PCA(n_components=metadata['pca']['n_components_'])
+        for attribute in _PCA_ARRAYS:
+            setattr(profile.pca, attribute, arrays[f'pca_{attribute}'])
+        for attribute, value in metadata['pca'].items():
+            setattr(profile.pca, attribute, value)
+        profile.pca_solver, profile.pca_seed = metadata['pca_solver'], metadata['pca_seed']
+        profile.precision = metadata['precision']
+        profile.js_edges, profile.js_probabilities = arrays['js_edges'], arrays['js_probabilities']
+        profile.sorted_numerical = arrays['sorted_numerical']
+        for i, (target_col, target_type, kfold) in enumerate(metadata['estimators']):
+            profile.estimators[(target_col, target_type, kfold)] = pickle.loads(arrays[f'estimators_{i}'].tobytes())
+        return profile
+
+
+def _pca_attribute(pca, attribute: str):
+    # `IncrementalPCA` counts its rows in ``n_samples_seen_``; a loaded profile holds its fit as a `PCA`.
+    if attribute == 'n_samples_' and not hasattr(pca, attribute):
+        return pca.n_samples_seen_
+    return getattr(pca, attribute)
+
+
+def _json_scalar(value):
+    return value.item() if isinstance(value, np.generic) else value
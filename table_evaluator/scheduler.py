@@ -0,0 +1,138 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+from .instrumentation import Instrumentation
+
+
+class Step:
+    """
+    Unit of work in an `EvaluationPlan`: either a shared input, such as the encoded data or an association matrix, or a metric of the report.
+    """
+
+    def __init__(self, name: str, compute: Callable[[], Any], requires: Sequence[str] = (), metric: bool = True, default: bool = True):
+        """
+        :param name: unique name of the step
+        :param compute: callable without arguments. Its return value is stored under ``name`` in the results of the plan.
+        :param requires: names of the steps that must have finished before this one starts
+        :param metric: whether this is a metric, which can be selected or skipped, or a shared input, which only runs when a selected metric
+            requires it
+        :param default: whether the metric runs when no metrics are selected. Metrics that are costly or need context to be read can be opt-in.
+        """
+        self.name = name
+        self.compute = compute
+        self.requires = tuple(requires)
+        self.metric = metric
+        self.default = default
+
+
+class EvaluationPlan:
+    """
+    Dependency graph of the steps of an evaluation. Shared inputs are computed once, before the first metric that needs them, and metrics whose
+    inputs are ready run concurrently on a thread pool. NumPy, SciPy and scikit-learn release the GIL in their heavy kernels, so threads overlap
+    well and, unlike processes, share the caches of the evaluator without copying the data.
+
+    Steps must not modify state that other steps read. A step that fills a cache used by several metrics should be a shared input they require.
+    """
+
+    def __init__(self):
+        self.steps: Dict[str, Step] = {}
+
+    def add_input(self, name: str, compute: Callable[[], Any], requires: Sequence[str] = ()) -> 'EvaluationPlan':
+        """
+        Add a shared input. See `Step` for the parameters.
+        """
+        return self._add(Step(name, compute, requires, metric=False))
+
+    def add_metric(self, name: str, compute: Callable[[], Any], requires: Sequence[str] = (), default: bool = True) -> 'EvaluationPlan':
+        """
+        Add a metric. See `Step` for the parameters.
+        """
+        return self._add(Step(name, compute, requires, metric=True, default=default))
+
+    def _add(self, step: Step) -> 'EvaluationPlan':
+        if step.name in self.steps:
+            raise ValueError(f'Step {step.name} is already part of the plan.')
+        unknown = [name for name in step.requires if name not in self.steps]
+        if unknown:
+            raise ValueError(f'Step {step.name} requires unknown steps {unknown}. Add the required steps first.')
+        self.steps[step.name] = step
+        return self
+
+    @property
+    def metrics(self) -> List[str]:
+        """
+        Names of all metrics in the plan, in the order they were added.
+        """
+        return [name for name, step in self.steps.items() if step.metric]
+
+    @property
+    def default_metrics(self) -> List[str]:
+        """
+        Names of the metrics that run when no metrics are selected, in the order they were added.
+        """
+        return [name for name in self.metrics if self.steps[name].default]
+
+    def select(self, metrics: Iterable[str] = None, skip: Iterable[str] = None) -> List[str]:
+        """
+        Steps that run for a selection of metrics: the selected metrics and every step they require, directly or indirectly, in the order they
+        were added.
+
+        :param metrics: metrics to run. All default metrics if None.
+        :param skip: metrics not to run, even if they are listed in ``metrics``
+        :return: names of the selected steps
+        """
+        metrics = self.default_metrics if metrics is None else list(metrics)
+        skip = set(skip or [])
+        unknown = [name for name in [*metrics, *skip] if name not in self.metrics]
+        if unknown:
+            raise ValueError(f'Unknown metrics {unknown}. Available metrics are {self.metrics}.')
+
+        selected, pending = set(), [name for name in metrics if name not in skip]
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self.steps[name].requires)
+        return [name for name in self.steps if name in selected]
+
+    def run(self, max_workers: int = 1, metrics: Iterable[str] = None, skip: Iterable[str] = None,
+            instrumentation: Instrumentation = None) -> Dict[str, Any]:
+        """
+        Run the selected steps. With ``max_workers=1`` the steps run one after another in the order they were added, otherwise every step is
+        submitted as soon as the steps it requires have finished. If a step raises, no new steps are started and the exception is re-raised once the
+        running steps have finished.
+
+        :param max_workers: number of threads
+        :param metrics: metrics to run, see `select`
+        :param skip: metrics not to run, see `select`
+        :param instrumentation: record every step as a ``stage`` in this `instrumentation.Instrumentation`
+        :return: dictionary with the result of every step that ran, shared inputs included
+        """
+        order = self.select(metrics, skip)
+
+        def compute(name: str) -> Any:
+            if instrumentation is None:
+                return self.steps[name].compute()
+            with instrumentation.stage(name, kind='stage'):
+                return self.steps[name].compute()
+
+        results = {}
+        if max_workers == 1:
+            for name in order:
+                results[name] = compute(name)
+            return results
+
+        waiting = list(order)
+        running: Dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while waiting or running:
+                for name in [name for name in waiting if all(r in results for r in self.steps[name].requires)]:
+                    waiting.remove(name)
+                    running[executor.submit(compute, name)] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    if future.exception() is not None:
+                        wait(running)
+                        raise future.exception()
+                    results[name] = future.result()
+        return {name: results[name] for name in order}
@@ -0,0 +1,504 @@
+import io
+import json
+import numpy as np
+from typing import Dict, List, Tuple, Union
+
+
+def _pack(header: dict, **arrays: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.savez(buffer, header=np.frombuffer(json.dumps(header).encode(), dtype=np.uint8), **arrays)
+    return buffer.getvalue()
+
+
+def _unpack(data: bytes) -> Tuple[dict, Dict[str, np.ndarray]]:
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        arrays = {key: archive[key] for key in archive.files}
+    return json.loads(arrays.pop('header').tobytes().decode()), arrays
+
+
+class QuantileView:
+    """
+    Sorted, weighted summary of a numerical distribution, as read from a `KLLSketch`. Answers CDF and quantile queries with the same rank error as the
+    sketch it was built from.
+    """
+
+    def __init__(self, items: np.ndarray, weights: np.ndarray, rank_error: float = 0.0, minimum: float = None, maximum: float = None):
+        """
+        :param items: values, in any order
+        :param weights: weight of every value
+        :param rank_error: bound on the normalized rank error of every query
+        :param minimum: exact minimum of the summarized values, if known. Defaults to the smallest item.
+        :param maximum: exact maximum of the summarized values, if known. Defaults to the largest item.
+        """
+        order = np.argsort(items, kind='stable')
+        self.items = np.asarray(items, dtype=float)[order]
+        self.cumulative_weights = np.cumsum(np.asarray(weights, dtype=float)[order])
+        self.n = self.cumulative_weights[-1] if len(self.cumulative_weights) else 0.0
+        self.rank_error = rank_error
+        self._minimum = minimum
+        self._maximum = maximum
+
+    def add(self, value: float, weight: float) -> 'QuantileView':
+        """
+        Copy of this view with ``weight`` extra occurrences of ``value``, e.g. the mean imputed for missing values.
+        """
+        if weight == 0:
+            return self
+        items = np.append(self.items, value)
+        weights = np.append(np.diff(self.cumulative_weights, prepend=0.0), weight)
+        return QuantileView(items, weights, rank_error=self.rank_error * self.n / (self.n + weight), minimum=min(self.min, value),
+                            maximum=max(self.max, value))
+
+    @property
+    def min(self) -> float:
+        return self._minimum if self._minimum is not None else self.items[0]
+
+    @property
+    def max(self) -> float:
+        return self._maximum if self._maximum is not None else self.items[-1]
+
+    def cdf(self, x: np.ndarray) -> np.ndarray:
+        """
+        Fraction of the values that are smaller than or equal to ``x``.
+        """
+        position = np.searchsorted(self.items, x, side='right')
+        return np.where(position > 0, self.cumulative_weights[np.maximum(position - 1, 0)], 0.0) / self.n
+
+    def quantile(self, q: np.ndarray) -> np.ndarray:
+        """
+        Smallest value whose CDF is at least ``q``.
+        """
+        position = np.searchsorted(self.cumulative_weights, np.asarray(q) * self.n, side='left')
+        return self.items[np.minimum(position, len(self.items) - 1)]
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang and Liberty, 2016) over a stream of numbers. Values are kept in a hierarchy of compactors; level ``h`` holds
+    items of weight ``2**h``. When a level exceeds its capacity it is sorted and every other item, starting at a random offset, is promoted to the next
+    level. Memory is ``O(k log(n / k))``, independent of the stream length.
+
+    Every compaction at level ``h`` moves the rank of any fixed query by ``-2**h``, 0 or ``2**h`` with mean zero. The sketch tracks the sum of the
+    squared weights of all compactions, which by Hoeffding's inequality bounds the rank error of a query, see `rank_error`.
+
+    Sketches of different partitions can be combined with `merge` and shipped between processes with `to_bytes` and `from_bytes`. A merged sketch
+    has the same guarantees as one built over the concatenated data. The exact minimum and maximum are tracked alongside.
+    """
+
+    def __init__(self, k: int = 1000, seed: int = None):
+        """
+        :param k: capacity of the top level. The normalized rank error shrinks roughly as ``1 / k``.
+        :param seed: seed for the random compaction offsets
+        """
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+        self._squared_error_weights = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values: np.ndarray):
+        """
+        Add values to the sketch. NaN values are ignored.
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.minimum = min(self.minimum, values.min())
+        self.maximum = max(self.maximum, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """
+        Add the values summarized by ``other`` to this sketch. Items of equal weight are pooled level by level and compacted as usual.
+
+        :return: this sketch
+        """
+        if other.k != self.k:
+            raise ValueError(f'Cannot merge sketches with different k: {self.k} and {other.k}.')
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._squared_error_weights += other._squared_error_weights
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._compress()
+        return self
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the sketch. The random state is not included; a deserialized sketch draws new compaction offsets.
+        """
+        header = {'k': self.k, 'n': self.n, 'squared_error_weights': self._squared_error_weights, 'minimum': self.minimum,
+                  'maximum': self.maximum}
+        return _pack(header, sizes=np.array([len(items) for items in self.levels], dtype=np.int64), items=np.concatenate(self.levels))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, seed: int = None) -> 'KLLSketch':
+        header, arrays = _unpack(data)
+        sketch = cls(header['k'], seed=seed)
+        sketch.n = header['n']
+        sketch._squared_error_weights = header['squared_error_weights']
+        sketch.minimum, sketch.maximum = header['minimum'], header['maximum']
+        sketch.levels = np.split(arrays['items'], np.cumsum(arrays['sizes'])[:-1])
+        return sketch
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(self.levels[level])
+                # An odd item out stays behind, so the promoted items always pair up.
+                keep = items[:len(items) % 2]
+                promoted = items[len(keep) + self.rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self._squared_error_weights += float(2 ** level) ** 2
+            level += 1
+
+    def rank_error(self, confidence: float = 0.99) -> float:
+        """
+        Bound on the normalized rank error of a single CDF or quantile query that holds with probability ``confidence``.
+        """
+        if self.n == 0:
+            return 0.0
+        return float(np.sqrt(2 * self._squared_error_weights * np.log(2 / (1 - confidence)))) / self.n
+
+    def view(self, confidence: float = 0.99) -> QuantileView:
+        """
+        `QuantileView` of the values seen so far.
+        """
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        return QuantileView(items, weights, rank_error=self.rank_error(confidence), minimum=self.minimum, maximum=self.maximum)
+
+    def __len__(self) -> int:
+        return self.n
+
+
+class FixedEdgeHistogram:
+    """
+    Histogram over fixed, right-closed bins ``(edges[i], edges[i + 1]]``, like `pd.cut`. Values outside the edges are not counted.
+    """
+
+    def __init__(self, edges: np.ndarray):
+        """
+        :param edges: increasing bin edges
+        """
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(len(self.edges) - 1)
+
+    def update(self, values: np.ndarray, weight: float = 1.0):
+        """
+        Add values to the histogram. NaN values are ignored.
+        """
+        values = np.asarray(values, dtype=float)
+        bins = np.searchsorted(self.edges, values[~np.isnan(values)], side='left')
+        inside = (bins > 0) & (bins < len(self.edges))
+        self.counts += weight * np.bincount(bins[inside] - 1, minlength=len(self.counts))
+
+    def probabilities(self) -> np.ndarray:
+        total = self.counts.sum()
+        return self.counts / total if total > 0 else self.counts
+
+    def merge(self, other: 'FixedEdgeHistogram') -> 'FixedEdgeHistogram':
+        """
+        Add the counts of ``other``, which must have the same edges.
+
+        :return: this histogram
+        """
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError('Cannot merge histograms with different edges.')
+        self.counts += other.counts
+        return self
+
+    def to_bytes(self) -> bytes:
+        return _pack({}, edges=self.edges, counts=self.counts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'FixedEdgeHistogram':
+        _, arrays = _unpack(data)
+        histogram = cls(arrays['edges'])
+        histogram.counts = arrays['counts']
+        return histogram
+
+
+class StreamingHistogram:
+    """
+    Equal-width histogram whose range grows with the data. Bin widths are powers of two and bins are aligned to multiples of the width, so the grids of
+    any two histograms are nested: coarsening a grid merges pairs of bins, and histograms of different partitions can be merged exactly after
+    coarsening the finer one. The histogram keeps ``n_bins`` bins and doubles the width whenever the data no longer fits, so the data range always
+    spans more than ``n_bins / 4`` of them. Probabilities over any coarser bins can therefore be read from it without knowing the range in advance,
+    see `bin_probabilities`.
+    """
+
+    def __init__(self, n_bins: int = 2 ** 14):
+        """
+        :param n_bins: number of fine bins
+        """
+        self.n_bins = n_bins
+        self.counts = np.zeros(n_bins)
+        self.exponent = None
+        self.offset = 0
+
+    @property
+    def width(self) -> float:
+        return float(np.ldexp(1.0, self.exponent))
+
+    def _occupied(self) -> Tuple[int, int]:
+        nonzero = np.flatnonzero(self.counts)
+        if len(nonzero) == 0:
+            return None
+        return self.offset + int(nonzero[0]), self.offset + int(nonzero[-1])
+
+    def _coarsen(self):
+        index = self.offset + np.arange(self.n_bins)
+        self.offset >>= 1
+        self.counts = np.bincount((index >> 1) - self.offset, weights=self.counts, minlength=self.n_bins)[:self.n_bins]
+        self.exponent += 1
+
+    def _cover(self, minimum: float, maximum: float):
+        """
+        Coarsen and move the window until it covers ``[minimum, maximum]`` and all counted values.
+        """
+        while True:
+            first, last = int(np.floor(minimum / self.width)), int(np.floor(maximum / self.width))
+            occupied = self._occupied()
+            if occupied is not None:
+                first, last = min(first, occupied[0]), max(last, occupied[1])
+            if last - first < self.n_bins:
+                break
+            self._coarsen()
+        if first < self.offset or last >= self.offset + self.n_bins:
+            counts = np.zeros(self.n_bins)
+            if occupied is not None:
+                counts[occupied[0] - first:occupied[1] - first + 1] = self.counts[occupied[0] - self.offset:occupied[1] - self.offset + 1]
+            self.counts, self.offset = counts, first
+
+    def update(self, values: np.ndarray, weight: float = 1.0):
+        """
+        Add values to the histogram. NaN and infinite values are ignored.
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        minimum, maximum = values.min(), values.max()
+        if self.exponent is None:
+            # Start with the range spanning about half of the bins, but never with bins so narrow that indices lose precision.
+            magnitude = np.frexp(max(abs(minimum), abs(maximum)))[1]
+            spread = np.frexp((maximum - minimum) / (self.n_bins // 2))[1] if maximum > minimum else magnitude - 40
+            self.exponent = int(max(spread, magnitude - 40))
+            self.offset = int(np.floor(minimum / self.width))
+        self._cover(minimum, maximum)
+        bins = np.floor(values / self.width).astype(np.int64) - self.offset
+        self.counts += weight * np.bincount(bins, minlength=self.n_bins)
+
+    def merge(self, other: 'StreamingHistogram') -> 'StreamingHistogram':
+        """
+        Add the counts of ``other``, which must have the same number of bins. The result has the same counts as a histogram built over the values of
+        both, at the coarser of the two resolutions.
+
+        :return: this histogram
+        """
+        if other.n_bins != self.n_bins:
+            raise ValueError(f'Cannot merge histograms with a different number of bins: {self.n_bins} and {other.n_bins}.')
+        occupied = other._occupied()
+        if occupied is None:
+            return self
+        if self.exponent is None:
+            self.exponent, self.offset, self.counts = other.exponent, other.offset, other.counts.copy()
+            return self
+        other = other.copy()
+        while self.exponent < other.exponent:
+            self._coarsen()
+        while other.exponent < self.exponent:
+            other._coarsen()
+        first, last = other._occupied()
+        self._cover(first * self.width, last * self.width)
+        while other.exponent < self.exponent:
+            other._coarsen()
+        first, last = other._occupied()
+        self.counts[first - self.offset:last - self.offset + 1] += other.counts[first - other.offset:last - other.offset + 1]
+        return self
+
+    def copy(self) -> 'StreamingHistogram':
+        histogram = StreamingHistogram(self.n_bins)
+        histogram.exponent, histogram.offset, histogram.counts = self.exponent, self.offset, self.counts.copy()
+        return histogram
+
+    def to_bytes(self) -> bytes:
+        occupied = self._occupied()
+        first, last = occupied if occupied is not None else (self.offset, self.offset - 1)
+        header = {'n_bins': self.n_bins, 'exponent': self.exponent, 'offset': self.offset, 'first': first}
+        return _pack(header, counts=self.counts[first - self.offset:last - self.offset + 1])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'StreamingHistogram':
+        header, arrays = _unpack(data)
+        histogram = cls(header['n_bins'])
+        histogram.exponent, histogram.offset = header['exponent'], header['offset']
+        start = header['first'] - histogram.offset
+        histogram.counts[start:start + len(arrays['counts'])] = arrays['counts']
+        return histogram
+
+    def bin_probabilities(self, edges: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        Probability of every right-closed bin between ``edges``, normalized over the values inside the edges. Values are assumed to be spread
+        uniformly within each fine bin.
+
+        :return: tuple with the bin probabilities and a bound on their total variation distance to the exact probabilities
+        """
+        if self.exponent is None:
+            return np.zeros(len(edges) - 1), 0.0
+        fine_edges = (self.offset + np.arange(self.n_bins + 1)) * self.width
+        cdf = np.interp(edges, fine_edges, np.concatenate([[0.0], np.cumsum(self.counts)]))
+        mass = np.diff(cdf)
+        inside = cdf[-1] - cdf[0]
+        if inside <= 0:
+            return mass, 0.0
+        # Interpolation can only misplace the values of the fine bins that contain an edge.
+        split = np.unique(np.clip(np.searchsorted(fine_edges, edges, side='right') - 1, 0, self.n_bins - 1))
+        return mass / inside, min(1.0, self.counts[split].sum() / inside)
+
+
+def cut_edges(minimum: float, maximum: float, bins: int = 25) -> np.ndarray:
+    """
+    Bin edges `pd.cut` uses for ``bins`` equal-width bins between ``minimum`` and ``maximum``: the first edge is moved down by 0.1% of the range so the
+    minimum falls in the first right-closed bin.
+    """
+    if minimum == maximum:
+        minimum = minimum - 0.001 * abs(minimum) if minimum != 0 else -0.001
+        maximum = maximum + 0.001 * abs(maximum) if maximum != 0 else 0.001
+        return np.linspace(minimum, maximum, bins + 1)
+    edges = np.linspace(minimum, maximum, bins + 1)
+    edges[0] -= (maximum - minimum) * 0.001
+    return edges
+
+
+def histogram_from_view(view: QuantileView, edges: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Probability of every right-closed bin between ``edges``, read from the CDF of ``view`` and normalized over the values inside the edges.
+
+    :return: tuple with the bin probabilities and a bound on their total variation distance to the exact probabilities. Every CDF value is off by at
+        most the rank error of the view, so every bin probability is off by at most twice that.
+    """
+    cdf = view.cdf(edges)
+    mass = np.diff(cdf)
+    inside = cdf[-1] - cdf[0]
+    if inside <= 0:
+        return mass, 0.0
+    return mass / inside, min(1.0, len(edges) * view.rank_error / inside)
+
+
+def ks_from_views(real: QuantileView, fake: QuantileView) -> Tuple[float, float]:
+    """
+    Two-sample Kolmogorov-Smirnov statistic between two summarized distributions.
+
+    :return: tuple with the statistic and a bound on its absolute error, the sum of the rank errors of both views
+    """
+    points = np.concatenate([real.items, fake.items])
+    statistic = float(np.max(np.abs(real.cdf(points) - fake.cdf(points))))
+    return statistic, real.rank_error + fake.rank_error
+
+
+def js_error_bound(total_variation: float) -> float:
+    """
+    Bound on the error of a Jensen-Shannon distance (natural logarithm, as `scipy.spatial.distance.jensenshannon`) when the binned probabilities of one
+    of the distributions are within ``total_variation`` of the exact ones. The JS divergence is at most ``ln(2)`` times the total variation distance,
+    and the JS distance satisfies the triangle inequality. Add the bounds of both distributions for the total error.
+    """
+    return float(np.sqrt(np.log(2) * total_variation))
+
+
+class SketchSummary:
+    """
+    Mergeable summary of the numerical columns of a dataset or of one of its partitions: a `KLLSketch` and a histogram per column. The histograms are
+    `FixedEdgeHistogram` if the bin edges are agreed on in advance, and `StreamingHistogram` otherwise. Workers summarize partitions independently, ship the summaries with `to_bytes`, and a coordinator
+    merges them and computes the KS and JS frames with `metrics.kolmogorov_smirnov_df_from_summaries` and `metrics.js_distance_df_from_summaries`.
+    """
+
+    def __init__(self, columns: List, k: int = 2000, edges: Dict[str, np.ndarray] = None, seed: int = None):
+        """
+        :param columns: numerical columns to summarize
+        :param k: ``k`` of the KLL sketches
+        :param edges: histogram edges per column. If None, every column gets a `StreamingHistogram`.
+        :param seed: seed for the sketches
+        """
+        self.columns = list(columns)
+        rng = np.random.default_rng(seed)
+        self.sketches = {col: KLLSketch(k, seed=rng.integers(2 ** 32)) for col in self.columns}
+        if edges is not None:
+            self.histograms = {col: FixedEdgeHistogram(edges[col]) for col in self.columns}
+        else:
+            self.histograms = {col: StreamingHistogram() for col in self.columns}
+
+    @classmethod
+    def from_frame(cls, data, columns: List = None, k: int = 2000, edges: Dict[str, np.ndarray] = None, seed: int = None) -> 'SketchSummary':
+        """
+        Summarize the columns of a DataFrame. Uses all columns if ``columns`` is None.
+        """
+        summary = cls(data.columns if columns is None else columns, k=k, edges=edges, seed=seed)
+        return summary.update(data)
+
+    def update(self, data) -> 'SketchSummary':
+        """
+        Add the rows of a DataFrame to the summary.
+        """
+        for col in self.columns:
+            values = data[col].to_numpy(dtype=float)
+            self.sketches[col].update(values)
+            self.histograms[col].update(values)
+        return self
+
+    def merge(self, other: 'SketchSummary') -> 'SketchSummary':
+        """
+        Add the summaries of ``other``, which must cover the same columns.
+
+        :return: this summary
+        """
+        if self.columns != other.columns:
+            raise ValueError(f'Cannot merge summaries of different columns: {self.columns} and {other.columns}.')
+        for col in self.columns:
+            self.sketches[col].merge(other.sketches[col])
+            if type(self.histograms[col]) is not type(other.histograms[col]):
+                raise ValueError(f'Cannot merge a {type(self.histograms[col]).__name__} with a {type(other.histograms[col]).__name__}.')
+            self.histograms[col].merge(other.histograms[col])
+        return self
+
+    def edges(self, bins: int = 25) -> Dict[str, np.ndarray]:
+        """
+        `pd.cut` bin edges per column, from the exact minimum and maximum of the summarized values.
+        """
+        return {col: cut_edges(sketch.minimum, sketch.maximum, bins) for col, sketch in self.sketches.items()}
+
+    def to_bytes(self) -> bytes:
+        arrays = {}
+        for i, col in enumerate(self.columns):
+            arrays[f'sketch_{i}'] = np.frombuffer(self.sketches[col].to_bytes(), dtype=np.uint8)
+            arrays[f'histogram_{i}'] = np.frombuffer(self.histograms[col].to_bytes(), dtype=np.uint8)
+        kinds = [type(self.histograms[col]).__name__ for col in self.columns]
+        return _pack({'columns': self.columns, 'histograms': kinds}, **arrays)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, seed: int = None) -> 'SketchSummary':
+        header, arrays = _unpack(data)
+        summary = cls(header['columns'])
+        rng = np.random.default_rng(seed)
+        for i, col in enumerate(summary.columns):
+            summary.sketches[col] = KLLSketch.from_bytes(arrays[f'sketch_{i}'].tobytes(), seed=rng.integers(2 ** 32))
+            histogram_type = FixedEdgeHistogram if header['histograms'][i] == 'FixedEdgeHistogram' else StreamingHistogram
+            summary.histograms[col] = histogram_type.from_bytes(arrays[f'histogram_{i}'].tobytes())
+        return summary
@@ -0,0 +1,521 @@
+import os
+import warnings
+import numpy as np
+import pandas as pd
+from scipy import sparse, stats
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
+from sklearn.exceptions import ConvergenceWarning
+from .associations import contingency_table, theils_u_from_contingency
+from .descriptive import DescriptiveStatistics, summary_frame
+from .ingestion import NAN_CATEGORY, infer_column_types
+from .instrumentation import Instrumentation, StageTiming
+from .metrics import euclidean_distance, mean_absolute_error, rmse, jensenshannon_from_sketches, kolmogorov_smirnov_from_sketches
+from .sketches import KLLSketch, FixedEdgeHistogram, QuantileView, StreamingHistogram, cut_edges
+from .scheduler import EvaluationPlan
+from .table_evaluator import TableEvaluator, _evaluation_report
+from .utils import read_chunks
+from .viz import plot_mean_std
+
+ChunkSource = Union[str, os.PathLike, List, Iterable[pd.DataFrame]]
+
+
+def _grow(array: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+    if array.shape == shape:
+        return array
+    return np.pad(array, [(0, new - old) for old, new in zip(array.shape, shape)])
+
+
+class DatasetStatistics:
+    """
+    Sufficient statistics of one dataset, accumulated in a single pass over its chunks. Memory depends on the number of columns, the number of
+    categories and the sketch and sample sizes, but not on the number of rows:
+
+    - counts, sums and co-moments of the numerical columns, for means, variances and Pearson's r;
+    - a `KLLSketch` per numerical column, for medians, KS statistics and binned probabilities;
+    - per-category counts and numerical sums, for the correlation ratio, and contingency tables of all categorical pairs, for Theil's U;
+    - a histogram per numerical column, over fixed edges if they are known in advance and otherwise over a growing range;
+    - optionally a uniform reservoir sample of rows.
+
+    Missing numerical values are treated as `TableEvaluator` treats them, as if they were replaced by the column mean. Numerical values are shifted
+    by the means of the first chunk before the moments are accumulated, to keep the sums well conditioned.
+    """
+
+    def __init__(self, numerical_columns: List, categorical_columns: List, sketch_size: int = 2000, sample_size: int = 20000,
+                 edges: Dict[str, np.ndarray] = None, seed: int = None):
+        """
+        :param numerical_columns: columns treated as numerical
+        :param categorical_columns: columns treated as categorical
+        :param sketch_size: ``k`` of the KLL sketches
+        :param sample_size: number of rows kept in the reservoir sample. 0 disables the sample.
+        :param edges: histogram edges per numerical column. If None, every column gets a `StreamingHistogram`.
+        :param seed: seed for the sketches and the reservoir sample
+        """
+        self.numerical_columns = list(numerical_columns)
+        self.categorical_columns = list(categorical_columns)
+        self.sample_size = sample_size
+        self.rng = np.random.default_rng(seed)
+        self.n_rows = 0
+
+        p = len(self.numerical_columns)
+        self.shift = None
+        self.counts = np.zeros(p)
+        self.sums = np.zeros(p)
+        self.products = np.zeros((p, p))
+        self.cross_sums = np.zeros((p, p))
+        self.pair_counts = np.zeros((p, p))
+        self.minimum = np.full(p, np.inf)
+        self.maximum = np.full(p, -np.inf)
+        self.sketches = {col: KLLSketch(sketch_size, seed=self.rng.integers(2 ** 32)) for col in self.numerical_columns}
+        if edges is not None:
+            self.histograms = {col: FixedEdgeHistogram(edges[col]) for col in self.numerical_columns}
+        else:
+            self.histograms = {col: StreamingHistogram() for col in self.numerical_columns}
+
+        self.categories: Dict[str, Dict[str, int]] = {col: {} for col in self.categorical_columns}
+        self.category_counts = {col: np.zeros(0) for col in self.categorical_columns}
+        self.group_sums = {col: np.zeros((0, p)) for col in self.categorical_columns}
+        self.group_missing = {col: np.zeros((0, p)) for col in self.categorical_columns}
+        self.contingency = {(a, b): np.zeros((0, 0)) for i, a in enumerate(self.categorical_columns) for b in self.categorical_columns[i + 1:]}
+
+        self._sample = None
+        self._finalized = False
+
+    def _codes(self, column: str, values: pd.Series) -> np.ndarray:
+        """
+        Codes of ``values`` in the running category mapping of ``column``. Values are stringified like `TableEvaluator` does.
+        """
+        local_codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        mapping = self.categories[column]
+        labels = [NAN_CATEGORY if pd.isna(u) else str(u) for u in uniques]
+        return np.array([mapping.setdefault(label, len(mapping)) for label in labels], dtype=np.int64)[local_codes]
+
+    def _update_sample(self, chunk: pd.DataFrame, numerical: np.ndarray):
+        n_before = self.n_rows - len(chunk)
+        if self._sample is None:
+            self._sample = {col: np.empty(self.sample_size, dtype=float if col in self.numerical_columns else object) for col in chunk.columns}
+        # Algorithm R: row t of the stream replaces a random slot with probability sample_size / (t + 1). When several rows of a chunk draw the same
+        # slot, the last one wins, as it would when processing them one by one.
+        positions = np.arange(n_before, self.n_rows)
+        slots = np.where(positions < self.sample_size, positions, self.rng.integers(0, positions + 1))
+        rows = np.flatnonzero(slots < self.sample_size)[::-1]
+        slots, first = np.unique(slots[rows], return_index=True)
+        rows = rows[first]
+        for col in chunk.columns:
+            if col in self.numerical_columns:
+                self._sample[col][slots] = numerical[rows, self.numerical_columns.index(col)]
+            else:
+                self._sample[col][slots] = chunk[col].to_numpy(dtype=object)[rows]
+
+    def update(self, chunk: pd.DataFrame):
+        """
+        Add the rows of ``chunk`` to the statistics.
+        """
+        if self._finalized:
+            raise RuntimeError('Statistics are finalized and cannot be updated anymore.')
+        self.n_rows += len(chunk)
+        x = chunk[self.numerical_columns].to_numpy(dtype=float)
+        present = ~np.isnan(x)
+        if self.shift is None:
+            counts = present.sum(axis=0)
+            self.shift = np.divide(np.where(present, x, 0.0).sum(axis=0), counts, out=np.zeros(x.shape[1]), where=counts > 0)
+        shifted = np.where(present, x - self.shift, 0.0)
+        weights = present.astype(float)
+        self.counts += weights.sum(axis=0)
+        self.sums += shifted.sum(axis=0)
+        self.products += shifted.T @ shifted
+        self.cross_sums += shifted.T @ weights
+        self.pair_counts += weights.T @ weights
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            self.minimum = np.fmin(self.minimum, np.nanmin(x, axis=0, initial=np.inf))
+            self.maximum = np.fmax(self.maximum, np.nanmax(x, axis=0, initial=-np.inf))
+        for i, col in enumerate(self.numerical_columns):
+            self.sketches[col].update(x[:, i])
+            self.histograms[col].update(x[:, i])
+
+        codes = {col: self._codes(col, chunk[col]) for col in self.categorical_columns}
+        rows = np.arange(len(chunk))
+        for col, col_codes in codes.items():
+            size = len(self.categories[col])
+            indicator = sparse.csr_matrix((np.ones(len(chunk)), (col_codes, rows)), shape=(size, len(chunk)))
+            self.category_counts[col] = _grow(self.category_counts[col], (size,)) + np.bincount(col_codes, minlength=size)
+            self.group_sums[col] = _grow(self.group_sums[col], (size, x.shape[1])) + indicator @ shifted
+            self.group_missing[col] = _grow(self.group_missing[col], (size, x.shape[1])) + indicator @ (1 - weights)
+        for (a, b), table in self.contingency.items():
+            size_a, size_b = len(self.categories[a]), len(self.categories[b])
+            self.contingency[(a, b)] = _grow(table, (size_a, size_b)) + contingency_table(codes[a], codes[b], size_a, size_b)
+
+        if self.sample_size:
+            self._update_sample(chunk, x)
+
+    def finalize(self):
+        """
+        Add the imputed means of the missing values to the histograms. Called once, after the last chunk.
+        """
+        if not self._finalized:
+            missing = self.n_rows - self.counts
+            for i, col in enumerate(self.numerical_columns):
+                if missing[i] > 0:
+                    self.histograms[col].update([self.mean[i]], weight=missing[i])
+            self._finalized = True
+        return self
+
+    @property
+    def _shifted_mean(self) -> np.ndarray:
+        return np.divide(self.sums, self.counts, out=np.zeros_like(self.sums), where=self.counts > 0)
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self.shift + self._shifted_mean
+
+    @property
+    def comoments(self) -> np.ndarray:
+        """
+        Matrix of the sums of products of deviations from the mean, over all rows with missing values imputed by the mean.
+        """
+        a = self._shifted_mean
+        comoments = self.products - a[None, :] * self.cross_sums - (a[None, :] * self.cross_sums).T + np.outer(a, a) * self.pair_counts
+        return comoments
+
+    @property
+    def variance(self) -> np.ndarray:
+        return np.maximum(np.diag(self.comoments), 0) / (self.n_rows - 1)
+
+    def view(self, column: str) -> QuantileView:
+        """
+        `QuantileView` of a numerical column, with missing values imputed by the mean.
+        """
+        i = self.numerical_columns.index(column)
+        return self.sketches[column].view().add(self.mean[i], self.n_rows - self.counts[i])
+
+    @property
+    def median(self) -> np.ndarray:
+        return np.array([self.view(col).quantile(0.5) for col in self.numerical_columns])
+
+    def describe(self) -> DescriptiveStatistics:
+        """
+        `DescriptiveStatistics` of the dataset, with missing values imputed by the mean and quantiles read from the sketches.
+        """
+        category_counts = {col: pd.Series(self.category_counts[col], index=self.category_labels(col)).sort_index() for col in self.categorical_columns}
+        return DescriptiveStatistics.from_moments(self.numerical_columns, np.full(len(self.numerical_columns), float(self.n_rows)), self.mean,
+                                                  np.maximum(np.diag(self.comoments), 0), self.minimum, self.maximum,
+                                                  sketches={col: self.view(col) for col in self.numerical_columns}, category_counts=category_counts)
+
+    def category_labels(self, column: str) -> List[str]:
+        return list(self.categories[column])
+
+    def sample(self) -> pd.DataFrame:
+        """
+        Uniform random sample of ``min(sample_size, n_rows)`` rows of the dataset.
+        """
+        if self._sample is None:
+            return pd.DataFrame()
+        size = min(self.sample_size, self.n_rows)
+        return pd.DataFrame({col: values[:size] for col, values in self._sample.items()})
+
+    def associations(self, columns: List) -> pd.DataFrame:
+        """
+        Association matrix over ``columns``, equal to `associations.compute_associations` with ``theil_u=True`` on the full dataset.
+        """
+        position = {col: i for i, col in enumerate(columns)}
+        corr = np.zeros((len(columns), len(columns)))
+
+        comoments = self.comoments
+        sum_of_squares = np.diag(comoments)
+        variable = np.flatnonzero(sum_of_squares > 1e-12 * np.maximum(np.diag(self.products), 1e-300))
+        nominal = [col for col in self.categorical_columns if len(self.categories[col]) > 1]
+        num_idx = [position[self.numerical_columns[i]] for i in variable]
+        nom_idx = [position[col] for col in nominal]
+        corr[num_idx + nom_idx, num_idx + nom_idx] = 1.0
+
+        if len(variable):
+            norms = np.sqrt(sum_of_squares[variable])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                corr[np.ix_(num_idx, num_idx)] = np.clip(comoments[np.ix_(variable, variable)] / np.outer(norms, norms), -1.0, 1.0)
+            a = self._shifted_mean[variable]
+            for col in nominal:
+                counts = self.category_counts[col]
+                deviations = self.group_sums[col][:, variable] - a * (counts[:, None] - self.group_missing[col][:, variable])
+                between = np.sum(deviations ** 2 / counts[:, None], axis=0)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    eta = np.where(between == 0, 0.0, np.sqrt(between / sum_of_squares[variable]))
+                corr[num_idx, position[col]] = eta
+                corr[position[col], num_idx] = eta
+
+        for (col_a, col_b), table in self.contingency.items():
+            if col_a in nominal and col_b in nominal:
+                u_ab, u_ba = theils_u_from_contingency(table)
+                corr[position[col_a], position[col_b]] = u_ba
+                corr[position[col_b], position[col_a]] = u_ab
+
+        corr[~np.isfinite(corr)] = 0.0
+        return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+def _chunks(source: ChunkSource, chunksize: int) -> Iterator[pd.DataFrame]:
+    paths = source if isinstance(source, (list, tuple)) else [source]
+    if all(isinstance(path, (str, os.PathLike)) for path in paths):
+        return read_chunks(source, chunksize=chunksize)
+    return iter(source)
+
+
+class StreamingTableEvaluator:
+    """
+    Evaluates synthetic data that does not fit in memory. Real and fake data are consumed as iterators of DataFrame chunks, or read in chunks from
+    CSV or Parquet paths, in one pass each. All statistical sections of the report come from `DatasetStatistics`:
+
+    - Basic statistics: exact means, standard deviations and variances; medians from KLL sketches.
+    - Association matrices: exact, from co-moments, per-category sums and contingency tables.
+    - Column correlations: exact for categorical columns; for numerical columns from 1000 quantiles of each sketch.
+    - Jensen-Shannon distances: the fake data is binned exactly on edges derived from the real data, the real data is read from a fine histogram
+      over a growing range.
+    - Kolmogorov-Smirnov statistics: from the sketches of both datasets.
+
+    The ML efficacy and privacy sections need whole rows, so they are computed by a `TableEvaluator` on uniform reservoir samples of both datasets.
+    """
+
+    def __init__(self, real: ChunkSource, fake: ChunkSource, cat_cols=None, unique_thresh=0, metric='pearsonr', verbose=False, name: str = None,
+                 seed=1337, sample_size: int = 20000, sketch_size: int = 2000, bins: int = 25, chunksize: int = 100000, trace_memory: bool = False,
+                 timing_hook: Callable[[StageTiming], None] = None):
+        """
+        :param real: iterable of DataFrames with the real data, or a path (or list of paths) to CSV or Parquet files
+        :param fake: iterable of DataFrames with the synthetic data, or a path (or list of paths) to CSV or Parquet files
+        :param cat_cols: The columns that are to be evaluated as discrete. If None, they are inferred from the first chunk of the real data.
+        :param unique_thresh: Threshold for automatic evaluation if column is numeric
+        :param metric: the metric to use for evaluation linear relations. Pearson's r by default, but supports all models in scipy.stats
+        :param verbose: Whether to print verbose output
+        :param name: Name of the evaluator
+        :param seed: seed for the sketches and the samples
+        :param sample_size: number of rows sampled from each dataset for the ML efficacy and privacy sections
+        :param sketch_size: ``k`` of the KLL sketches. The rank error of the sketches shrinks roughly as ``1 / sketch_size``.
+        :param bins: number of bins for the Jensen-Shannon distance
+        :param chunksize: number of rows per chunk when reading from paths
+        :param trace_memory: record the peak traced memory of every stage of `evaluate`, see `instrumentation.Instrumentation`
+        :param timing_hook: called with the `instrumentation.StageTiming` of every finished stage
+        """
+        self.instrumentation = Instrumentation(trace_memory=trace_memory, hook=timing_hook)
+        self.real_source = real
+        self.fake_source = fake
+        self.cat_cols = cat_cols
+        self.unique_thresh = unique_thresh
+        self.comparison_metric = getattr(stats, metric)
+        self.verbose = verbose
+        self.name = name
+        self.random_seed = seed
+        self.sample_size = sample_size
+        self.sketch_size = sketch_size
+        self.bins = bins
+        self.chunksize = chunksize
+
+        self.real_statistics: DatasetStatistics = None
+        self.fake_statistics: DatasetStatistics = None
+        self._sample_evaluator = None
+
+    def fit(self) -> 'StreamingTableEvaluator':
+        """
+        Consume the real data and then the fake data, one chunk at a time. The fake data is read second, so it can be binned on edges derived from
+        the real data.
+        """
+        real_chunks = _chunks(self.real_source, self.chunksize)
+        first = next(real_chunks)
+        self.columns = first.columns.tolist()
+        if self.cat_cols is None:
+            self.numerical_columns, self.categorical_columns = infer_column_types(first, self.unique_thresh)
+        else:
+            self.categorical_columns = [col for col in self.columns if col in self.cat_cols]
+            self.numerical_columns = [col for col in self.columns if col not in self.cat_cols]
+
+        self.real_statistics = DatasetStatistics(self.numerical_columns, self.categorical_columns, sketch_size=self.sketch_size,
+                                                 sample_size=self.sample_size, seed=self.random_seed)
+        self.real_statistics.update(first)
+        for chunk in real_chunks:
+            self.real_statistics.update(chunk[self.columns])
+        self.real_statistics.finalize()
+
+        edges = {col: cut_edges(self.real_statistics.minimum[i], self.real_statistics.maximum[i], self.bins)
+                 for i, col in enumerate(self.numerical_columns)}
+        self.fake_statistics = DatasetStatistics(self.numerical_columns, self.categorical_columns, sketch_size=self.sketch_size,
+                                                 sample_size=self.sample_size, edges=edges, seed=self.random_seed + 1)
+        for chunk in _chunks(self.fake_source, self.chunksize):
+            assert set(chunk.columns) == set(self.columns), 'Columns in real and fake dataframe are not the same'
+            self.fake_statistics.update(chunk[self.columns])
+        self.fake_statistics.finalize()
+        self.edges = edges
+        return self
+
+    def _check_fitted(self):
+        if self.real_statistics is None:
+            self.fit()
+
+    def statistics(self, dataset: str) -> DatasetStatistics:
+        if dataset not in ('real', 'fake'):
+            raise ValueError(f'`dataset` must be \'real\' or \'fake\', but is {dataset}.')
+        self._check_fitted()
+        return getattr(self, f'{dataset}_statistics')
+
+    @property
+    def sample_evaluator(self) -> TableEvaluator:
+        """
+        `TableEvaluator` on the reservoir samples of both datasets, used for the ML efficacy and privacy sections.
+        """
+        if self._sample_evaluator is None:
+            real, fake = self.statistics('real').sample(), self.statistics('fake').sample()
+            self._sample_evaluator = TableEvaluator(real, fake, cat_cols=self.categorical_columns, verbose=self.verbose, name=self.name,
+                                                    seed=self.random_seed)
+        return self._sample_evaluator
+
+    def association_matrix(self, dataset: str = 'real') -> pd.DataFrame:
+        """
+        Association matrix of the real or fake data, see `TableEvaluator.association_matrix`.
+        """
+        return self.statistics(dataset).associations(self.columns)
+
+    def descriptive_statistics(self, dataset: str = 'real') -> DescriptiveStatistics:
+        """
+        Descriptive statistics of the real or fake data, see `DatasetStatistics.describe`.
+        """
+        return self.statistics(dataset).describe()
+
+    def plot_mean_std(self, fname=None, rplt=False):
+        """
+        Plot the means and standard deviations of the numerical columns of both datasets, see `viz.plot_mean_std`.
+        """
+        return plot_mean_std(self.descriptive_statistics('real'), self.descriptive_statistics('fake'), fname=fname, rplt=rplt)
+
+    def basic_statistical_evaluation(self, include_categorical: bool = False) -> float:
+        """
+        Spearman's Rho between the mean, median, standard deviation and variance of the numerical columns of both datasets, like
+        `TableEvaluator.basic_statistical_evaluation`.
+
+        :param include_categorical: also compare the relative frequency of every category of the categorical columns
+        :return: correlation coefficient
+        """
+        total_metrics = summary_frame(self.descriptive_statistics('real'), self.descriptive_statistics('fake'), include_categorical)
+        self.statistical_results = total_metrics
+        if self.verbose:
+            print('\nBasic statistical attributes:')
+            print(total_metrics.to_string())
+        corr, p = stats.spearmanr(total_metrics['real'], total_metrics['fake'])
+        return corr
+
+    def correlation_correlation(self) -> float:
+        """
+        Correlation between the association matrices of both datasets using ``self.comparison_metric``.
+        """
+        total_metrics = pd.DataFrame()
+        for ds_name in ['real', 'fake']:
+            values = self.association_matrix(ds_name).values
+            values = values[~np.eye(values.shape[0], dtype=bool)].reshape(values.shape[0], -1)
+            total_metrics[ds_name] = values.flatten()
+
+        self.correlation_correlations = total_metrics
+        corr, p = self.comparison_metric(total_metrics['real'], total_metrics['fake'])
+        if self.verbose:
+            print('\nColumn correlation between datasets:')
+            print(total_metrics.to_string())
+        return corr
+
+    def correlation_distance(self, how: str = 'euclidean') -> float:
+        """
+        Distance between the association matrices, see `TableEvaluator.correlation_distance`.
+        """
+        distance_funcs = {'euclidean': euclidean_distance, 'mae': mean_absolute_error, 'rmse': rmse}
+        if how not in distance_funcs:
+            raise ValueError(f'`how` parameter must be in [euclidean, mae, rmse]')
+        return distance_funcs[how](self.association_matrix('real').values, self.association_matrix('fake').values)
+
+    def column_correlations(self, n_quantiles: int = 1000) -> float:
+        """
+        Mean correlation between the sorted real and fake columns, like `metrics.column_correlations`. Sorted categorical columns are compared with
+        Theil's U on a contingency table derived from the category counts, which is exact when both datasets have the same length. Sorted numerical
+        columns are compared with Pearson's r on ``n_quantiles`` quantiles of each sketch.
+
+        :return: Mean correlation between all columns.
+        """
+        real, fake = self.statistics('real'), self.statistics('fake')
+        correlations = []
+        q = (np.arange(n_quantiles) + 0.5) / n_quantiles
+        for col in self.columns:
+            if col in self.categorical_columns:
+                labels = sorted(set(real.category_labels(col)) | set(fake.category_labels(col)))
+                bounds = []
+                for ds in (real, fake):
+                    counts = pd.Series(ds.category_counts[col], index=ds.category_labels(col))
+                    bounds.append(np.concatenate([[0.0], np.cumsum(counts.reindex(labels, fill_value=0).values) / ds.n_rows]))
+                r_bounds, f_bounds = bounds
+                overlap = np.minimum(r_bounds[1:, None], f_bounds[None, 1:]) - np.maximum(r_bounds[:-1, None], f_bounds[None, :-1])
+                correlations.append(theils_u_from_contingency(np.maximum(overlap, 0.0))[0])
+            else:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    correlations.append(np.corrcoef(real.view(col).quantile(q), fake.view(col).quantile(q))[0, 1])
+        return np.mean(correlations)
+
+    def js_distance_df(self) -> pd.DataFrame:
+        """
+        Jensen-Shannon distance per numerical column, like `metrics.js_distance_df`, with a (loose) ``error_bound`` column, see
+        `metrics.jensenshannon_from_sketches`.
+        """
+        real, fake = self.statistics('real'), self.statistics('fake')
+        distances = [jensenshannon_from_sketches(col, real.view(col), fake.view(col), bins=self.bins, real_histogram=real.histograms[col],
+                                                 fake_histogram=fake.histograms[col])
+                     for col in self.numerical_columns]
+        return pd.DataFrame(distances).set_index('col_name')
+
+    def kolmogorov_smirnov_df(self) -> pd.DataFrame:
+        """
+        Two-sample Kolmogorov-Smirnov test per numerical column, like `metrics.kolmogorov_smirnov_df`, using the asymptotic distribution of the
+        statistic. The statistic is read from the sketches and can be off by the sum of their rank errors, reported as ``error_bound``. For very
+        large datasets with nearly identical distributions the p-values are therefore too small.
+        """
+        real, fake = self.statistics('real'), self.statistics('fake')
+        results = [kolmogorov_smirnov_from_sketches(col, real.view(col), fake.view(col)) for col in self.numerical_columns]
+        return pd.DataFrame(results).set_index('col_name')
+
+    def evaluation_plan(self, target_col: str, target_type: str = 'class', n_samples_distance: int = 20000, kfold: bool = False,
+                        distance_method: str = 'exact', n_jobs: int = 1) -> EvaluationPlan:
+        """
+        Dependency graph of the metrics of `evaluate`, with the same metric names as `TableEvaluator.evaluation_plan`. Estimators, row distances
+        and duplicates are computed by the `sample_evaluator`, which is built, and encoded, once as a shared input.
+        """
+        def sample_evaluator() -> TableEvaluator:
+            self.sample_evaluator.verbose = self.verbose
+            return self.sample_evaluator
+
+        plan = EvaluationPlan()
+        plan.add_input('sample_evaluator', sample_evaluator)
+        plan.add_input('sample_encoding', lambda: self.sample_evaluator.encoding, requires=['sample_evaluator'])
+
+        plan.add_metric('basic_statistics', self.basic_statistical_evaluation)
+        plan.add_metric('correlation_correlation', self.correlation_correlation)
+        plan.add_metric('column_correlations', self.column_correlations)
+        plan.add_metric('estimators', lambda: self.sample_evaluator.estimator_evaluation(target_col=target_col, target_type=target_type, kfold=kfold,
+                                                                                          n_jobs=n_jobs),
+                        requires=['sample_encoding'])
+        plan.add_metric('row_distance', lambda: self.sample_evaluator.row_distance(n_samples=n_samples_distance, method=distance_method),
+                        requires=['sample_encoding'])
+        plan.add_metric('duplicates', lambda: self.sample_evaluator.get_duplicates(), requires=['sample_evaluator'])
+        plan.add_metric('correlation_distance_rmse', lambda: self.correlation_distance(how='rmse'))
+        plan.add_metric('correlation_distance_mae', lambda: self.correlation_distance(how='mae'))
+        plan.add_metric('js_distance', self.js_distance_df)
+        plan.add_metric('ks_test', self.kolmogorov_smirnov_df)
+        return plan
+
+    def evaluate(self, target_col: str, target_type: str = 'class', metric: str = None, verbose: bool = None,
+                 n_samples_distance: int = 20000, kfold: bool = False, notebook: bool = False, return_outputs: bool = False,
+                 distance_method: str = 'exact', n_jobs: int = 1, max_workers: int = 1, metrics: List[str] = None, skip: List[str] = None) -> Dict:
+        """
+        Produce the same report as `TableEvaluator.evaluate`. See there for the parameters. Estimators and row distances use the reservoir samples.
+        """
+        self.verbose = verbose if verbose is not None else self.verbose
+        self.comparison_metric = metric if metric is not None else self.comparison_metric
+
+        warnings.filterwarnings(action='ignore', category=ConvergenceWarning)
+        pd.options.display.float_format = '{:,.4f}'.format
+
+        self._check_fitted()
+        plan = self.evaluation_plan(target_col, target_type=target_type, n_samples_distance=n_samples_distance, kfold=kfold,
+                                    distance_method=distance_method, n_jobs=n_jobs)
+        first_record = len(self.instrumentation.records)
+        results = plan.run(max_workers=max_workers, metrics=metrics, skip=skip, instrumentation=self.instrumentation)
+        return _evaluation_report(self, results, target_type, estimator_evaluator=self.sample_evaluator, return_outputs=return_outputs,
+                                  notebook=notebook, timings=self.instrumentation.frame(first_record))
@@ -1,5 +1,6 @@
 import copy
 import os
+import threading
 import warnings
 import pandas as pd
 import numpy as np
@@ -8,21 +9,43 @@ import matplotlib.pyplot as plt
 from pathlib import Path
 from tqdm import tqdm
 from scipy import stats
-from typing import Tuple, Dict, Union
-from scipy.spatial.distance import cdist
-from sklearn.model_selection import KFold
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.neural_network import MLPClassifier
-from sklearn.decomposition import PCA
+from typing import Callable, Tuple, Dict, List, Union
 from sklearn.metrics import f1_score, mean_squared_error, jaccard_score
 from sklearn.exceptions import ConvergenceWarning
-from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-from sklearn.linear_model import Lasso, Ridge, ElasticNet, LogisticRegression
-from dython.nominal import compute_associations, numerical_encoding
+from joblib import Parallel, delayed
+from .associations import compute_associations
 from .viz import *
 from .metrics import *
 from .notebook import visualize_notebook, isnotebook, EvaluationResult
 from .utils import dict_to_df
+from .cache import AssociationCache
+from .neighbors import nearest_neighbor_distances, DEFAULT_MEMORY_BUDGET
+from .hashing import RowHashIndex
+from .parallel import shared_arrays
+from .ingestion import fill_missing, infer_column_types, shared_categorical
+from .encoding import EncodedData, PRECISIONS, standardize_columns
+from .estimators import estimator_folds, make_estimators, split_target
+from .profile import RealProfile
+from .descriptive import DescriptiveStatistics, summary_frame
+from .scheduler import EvaluationPlan
+from .instrumentation import Instrumentation, StageTiming, instrumented
+from .bootstrap import Bootstrap, bootstrap_intervals
+from .pca import PCAModels
+from .privacy import GowerIndex, MinHashIndex
+
+
+def _fit_and_predict(estimator, x: np.ndarray, y: np.ndarray, train_index: np.ndarray, real_x: np.ndarray, fake_x: np.ndarray,
+                     test_index: np.ndarray):
+    """
+    Fit ``estimator`` on the training rows of ``x`` and ``y`` and predict the test rows of the real and the fake data. Runs inside a worker of
+    `TableEvaluator.estimator_evaluation` when ``n_jobs != 1``.
+
+    :return: tuple with the fitted estimator, its predictions on the real test set and on the fake test set.
+    """
+    warnings.filterwarnings(action='ignore', category=ConvergenceWarning)
+    # Column-major copies, the same layout the serial path hands to the estimators through DataFrames, so that results match bit for bit.
+    estimator.fit(np.asfortranarray(x[train_index]), y[train_index])
+    return estimator, estimator.predict(np.asfortranarray(real_x[test_index])), estimator.predict(np.asfortranarray(fake_x[test_index]))
 
 
 class TableEvaluator:
@@ -31,71 +54,138 @@ class TableEvaluator:
     Additional evaluations can be done with the different methods of evaluate and the visual evaluation method.
     """
 
-    def __init__(self, real: pd.DataFrame, fake: pd.DataFrame, cat_cols=None, unique_thresh=0, metric='pearsonr',
-                 verbose=False, n_samples=None, name: str = None, seed=1337):
+    def __init__(self, real: Union[pd.DataFrame, RealProfile], fake: pd.DataFrame, cat_cols=None, unique_thresh=0, metric='pearsonr',
+                 verbose=False, n_samples=None, name: str = None, seed=1337, lean: bool = False, trace_memory: bool = False,
+                 timing_hook: Callable[[StageTiming], None] = None, pca_solver: str = 'auto', precision: str = 'float64',
+                 rng: np.random.Generator = None):
         """
-        :param real: Real dataset (pd.DataFrame)
+        :param real: Real dataset (pd.DataFrame), or a `profile.RealProfile` of it. A profile brings its own sample of the real data, column types and
+            precomputed real-side results, so only the fake data is sampled and processed. Its real data is shared, not copied, so do not modify
+            ``self.real`` in place.
         :param fake: Synthetic dataset (pd.DataFrame)
         :param unique_thresh: Threshold for automatic evaluation if column is numeric
         :param cat_cols: The columns that are to be evaluated as discrete. If passed, unique_thresh is ignored.
         :param metric: the metric to use for evaluation linear relations. Pearson's r by default, but supports all models in scipy.stats
         :param verbose: Whether to print verbose output
         :param n_samples: Number of samples to evaluate. If none, it will take the minimal length of both datasets and cut the larger one off to make sure they
-            are the same length.
+            are the same length. With a profile, the number of rows of the profile.
         :param name: Name of the TableEvaluator. Used in some plotting functions like `viz.plot_correlation_comparison` to indicate your model.
+        :param lean: Store categorical columns as pandas Categoricals with one category set shared by real and fake, instead of as Python strings.
+            Strongly reduces memory for large samples.
+        :param trace_memory: record the peak traced memory of every stage and public method, see `instrumentation.Instrumentation`. Slows down
+            allocations while a stage runs.
+        :param timing_hook: called with the `instrumentation.StageTiming` of every finished stage and public method, e.g. to export the timings
+        :param pca_solver: SVD solver of the PCA of `pca_correlation` and `plot_pca`, see `pca.fit_pca`
+        :param precision: floating point type of the numerical encoding, ``float64`` or ``float32``. With ``float32``, the encoding holds a float32
+            matrix and compact integer codes (see `encoding.EncodedData`), and the row distance, PCA, associations and estimators compute on it,
+            which halves their memory traffic at a deviation of the metrics in about the fourth significant digit.
+        :param rng: random generator the rows of ``real`` and ``fake`` are sampled with. The global random state if None.
         """
+        self.instrumentation = Instrumentation(trace_memory=trace_memory, hook=timing_hook)
         self.name = name
         self.unique_thresh = unique_thresh
-        self.real = real.copy()
-        self.fake = fake.copy()
+        self.lean = lean
         self.comparison_metric = getattr(stats, metric)
         self.verbose = verbose
         self.random_seed = seed
+        # Guards the lazy caches below, which the metrics of an `EvaluationPlan` fill from several threads.
+        self._lock = threading.RLock()
+        self._association_cache = AssociationCache()
+        self._row_hash_indexes = {}
+        self._encoding = None
+        self._descriptive_statistics = {}
+        self.pca_solver = pca_solver
+        self._pca = None
+        if precision not in PRECISIONS:
+            raise ValueError(f'`precision` must be one of {PRECISIONS}, but is {precision}.')
+        self.precision = precision
+        self.profile = real if isinstance(real, RealProfile) else None
 
         # Make sure columns and their order are the same.
-        if len(real.columns) == len(fake.columns):
-            fake = fake[real.columns.tolist()]
-        assert real.columns.tolist() == fake.columns.tolist(), 'Columns in real and fake dataframe are not the same'
-
-        if cat_cols is None:
-            real = real.infer_objects()
-            fake = fake.infer_objects()
-            self.numerical_columns = [column for column in real._get_numeric_data().columns if
-                                      len(real[column].unique()) > unique_thresh]
-            self.categorical_columns = [column for column in real.columns if column not in self.numerical_columns]
+        columns = self.profile.columns if self.profile is not None else real.columns.tolist()
+        assert len(columns) == len(fake.columns) and set(columns) == set(fake.columns.tolist()), \
+            'Columns in real and fake dataframe are not the same'
+
+        if self.profile is not None:
+            if cat_cols is not None and set(cat_cols) != set(self.profile.categorical_columns):
+                raise ValueError(f'cat_cols {cat_cols} differ from the categorical columns of the profile {self.profile.categorical_columns}.')
+            self.numerical_columns, self.categorical_columns = list(self.profile.numerical_columns), list(self.profile.categorical_columns)
+        elif cat_cols is None:
+            self.numerical_columns, self.categorical_columns = infer_column_types(real, unique_thresh)
         else:
             self.categorical_columns = cat_cols
             self.numerical_columns = [column for column in real.columns if column not in cat_cols]
 
         # Make sure the number of samples is equal in both datasets.
-        if n_samples is None:
-            self.n_samples = min(len(self.real), len(self.fake))
+        if self.profile is not None:
+            if (n_samples is not None and n_samples != self.profile.n_samples) or len(fake) < self.profile.n_samples:
+                raise ValueError(f'A profile evaluates exactly its {self.profile.n_samples} rows, build it with n_samples <= len(fake). '
+                                 f'len(fake): {len(fake)}, n_samples: {n_samples}')
+            self.n_samples = self.profile.n_samples
+        elif n_samples is None:
+            self.n_samples = min(len(real), len(fake))
         elif len(fake) >= n_samples and len(real) >= n_samples:
             self.n_samples = n_samples
         else:
             raise Exception(f'Make sure n_samples < len(fake/real). len(real): {len(real)}, len(fake): {len(fake)}')
 
-        self.real = self.real.sample(self.n_samples)
-        self.fake = self.fake.sample(self.n_samples)
+        # Sample before anything else, so only the evaluated rows are ever copied. The values of the real data of a profile are shared, unless
+        # they are converted, but not its columns, so columns set on one evaluator do not reach the profile or other evaluators.
+        if self.profile is not None:
+            self._real = self.profile.real.copy(deep=lean)
+        else:
+            self._real = real.sample(self.n_samples, random_state=rng)
+        self._fake = fake.sample(self.n_samples, random_state=rng)
+        if self._fake.columns.tolist() != columns:
+            self._fake = self._fake[columns]
         assert len(self.real) == len(self.fake), f'len(real) != len(fake)'
 
-        self.real.loc[:, self.categorical_columns] = self.real.loc[:, self.categorical_columns].fillna('[NAN]').astype(
-            str)
-        self.fake.loc[:, self.categorical_columns] = self.fake.loc[:, self.categorical_columns].fillna('[NAN]').astype(
-            str)
+        if lean:
+            for column in self.categorical_columns:
+                self.real[column], self.fake[column] = shared_categorical(self.real[column], self.fake[column])
+        if self.profile is None:
+            fill_missing(self.real, self.numerical_columns, self.categorical_columns, stringify=not lean)
+        fill_missing(self.fake, self.numerical_columns, self.categorical_columns, stringify=not lean)
+        if self.profile is not None:
+            self._row_hash_indexes['real'] = RowHashIndex(self.real, hashes=self.profile.row_hash_index.hashes,
+                                                          order=self.profile.row_hash_index.order)
+
+    @property
+    def real(self) -> pd.DataFrame:
+        """
+        Evaluated sample of the real data. Assigning another DataFrame drops the cached results of the real data, see `invalidate_cache`.
+        """
+        return self._real
 
-        self.real.loc[:, self.numerical_columns] = self.real.loc[:, self.numerical_columns].fillna(
-            self.real[self.numerical_columns].mean())
-        self.fake.loc[:, self.numerical_columns] = self.fake.loc[:, self.numerical_columns].fillna(
-            self.fake[self.numerical_columns].mean())
+    @real.setter
+    def real(self, data: pd.DataFrame):
+        with self._lock:
+            self.invalidate_cache('real')
+            self._real = data
 
+    @property
+    def fake(self) -> pd.DataFrame:
+        """
+        Evaluated sample of the synthetic data. Assigning another DataFrame drops the cached results of the synthetic data, see
+        `invalidate_cache`.
+        """
+        return self._fake
+
+    @fake.setter
+    def fake(self, data: pd.DataFrame):
+        with self._lock:
+            self.invalidate_cache('fake')
+            self._fake = data
+
+    @instrumented
     def plot_mean_std(self, fname=None, rplt=False):
         """
         Class wrapper function for plotting the mean and std using `viz.plot_mean_std`.
         :param fname: If not none, saves the plot with this file name. 
         """
-        plot_mean_std(self.real, self.fake, fname=fname, rplt=rplt)
+        plot_mean_std(self.descriptive_statistics('real'), self.descriptive_statistics('fake'), fname=fname, rplt=rplt)
 
+    @instrumented
     def plot_cumsums(self, nr_cols=4, fname=None, rplt=False):
         """
         Plot the cumulative sums for all columns in the real and fake dataset. Height of each row scales with the length of the labels. Each plot contains the
@@ -108,9 +198,9 @@ class TableEvaluator:
 
         max_len = 0
         # Increase the length of plots if the labels are long
-        if not self.real.select_dtypes(include=['object']).empty:
+        if not self.real.select_dtypes(include=['object', 'category']).empty:
             lengths = []
-            for d in self.real.select_dtypes(include=['object']):
+            for d in self.real.select_dtypes(include=['object', 'category']):
                 lengths.append(max([len(x.strip()) for x in self.real[d].unique().tolist()]))
             max_len = max(lengths)
 
@@ -131,6 +221,7 @@ class TableEvaluator:
         else:
             plt.show()
 
+    @instrumented
     def plot_distributions(self, nr_cols=3, fname=None, rplt=False):
         """
         Plot the distribution plots for all columns in the real and fake dataset. Height of each row of plots scales with the length of the labels. Each plot
@@ -143,9 +234,9 @@ class TableEvaluator:
 
         max_len = 0
         # Increase the length of plots if the labels are long
-        if not self.real.select_dtypes(include=['object']).empty:
+        if not self.real.select_dtypes(include=['object', 'category']).empty:
             lengths = []
-            for d in self.real.select_dtypes(include=['object']):
+            for d in self.real.select_dtypes(include=['object', 'category']):
                 lengths.append(max([len(x.strip()) for x in self.real[d].unique().tolist()]))
             max_len = max(lengths)
 
@@ -184,6 +275,7 @@ class TableEvaluator:
         else:
             plt.show()
 
+    @instrumented
     def plot_correlation_difference(self, plot_diff=True, fname=None, rplt=False, **kwargs):
         """
         Plot the association matrices for each table and, if chosen, the difference between them.
@@ -192,9 +284,128 @@ class TableEvaluator:
         :param fname: If not none, saves the plot with this file name.
         :param kwargs: kwargs for sns.heatmap
         """
-        plot_correlation_difference(self.real, self.fake, cat_cols=self.categorical_columns, plot_diff=plot_diff, fname=fname, rplt=rplt,
-                                    **kwargs)
+        return plot_correlation_difference(self.real, self.fake, cat_cols=self.categorical_columns, plot_diff=plot_diff, fname=fname, rplt=rplt,
+                                           real_corr=self.association_matrix('real'), fake_corr=self.association_matrix('fake'), **kwargs)
+
+    @instrumented
+    def association_matrix(self, dataset: str = 'real') -> pd.DataFrame:
+        """
+        Association matrix of ``self.real`` or ``self.fake``, computed with Theil's U for nominal-nominal pairs. Matrices are memoized per evaluator,
+        keyed by the dataset and the set of categorical columns, so every metric and plot shares a single computation. See `invalidate_cache`.
+        The real matrix of a `profile.RealProfile` is reused if it was computed in the same ``precision``.
+
+        :param dataset: which dataset to use. Either ``real`` or ``fake``.
+        :return: DataFrame with the associations between all columns.
+        """
+        if dataset not in ('real', 'fake'):
+            raise ValueError(f'`dataset` must be \'real\' or \'fake\', but is {dataset}.')
+        if dataset == 'real' and self.profile is not None and self.profile.precision == self.precision:
+            return self.profile.associations.copy()
+        ds = getattr(self, dataset)
+        with self._lock:
+            return self._association_cache.get(
+                dataset, self.categorical_columns,
+                compute=lambda: compute_associations(ds, nominal_columns=self.categorical_columns, theil_u=True, dtype=self.precision))
+
+    @instrumented
+    def row_hash_index(self, dataset: str = 'real') -> RowHashIndex:
+        """
+        Sorted index of the row hashes of ``self.real`` or ``self.fake``. Built once per dataset and shared by `get_copies` and `get_duplicates`.
+
+        :param dataset: which dataset to use. Either ``real`` or ``fake``.
+        :return: the `hashing.RowHashIndex` of the dataset
+        """
+        if dataset not in ('real', 'fake'):
+            raise ValueError(f'`dataset` must be \'real\' or \'fake\', but is {dataset}.')
+        with self._lock:
+            if dataset not in self._row_hash_indexes:
+                self._row_hash_indexes[dataset] = RowHashIndex(getattr(self, dataset))
+            return self._row_hash_indexes[dataset]
+
+    @property
+    def encoding(self) -> EncodedData:
+        """
+        Immutable numerical encoding of ``self.real`` and ``self.fake`` with a codebook shared by both datasets. Built on first access and reused by
+        every method that needs numerical data.
+        """
+        with self._lock:
+            if self._encoding is None:
+                real_encoding = self.profile.encoding if self.profile is not None else None
+                self._encoding = EncodedData(self.real, self.fake, self.categorical_columns, real_encoding=real_encoding, precision=self.precision)
+            return self._encoding
+
+    @property
+    def pca(self) -> PCAModels:
+        """
+        PCA of ``self.real`` and ``self.fake`` on the numerical encoding, shared by `pca_correlation` and `plot_pca`. Each dataset is fitted once,
+        and the real fit of a matching `profile.RealProfile` with the same solver and seed is reused.
+        """
+        with self._lock:
+            if self._pca is None:
+                reuse = self._profile_matches() and (self.profile.pca_solver, self.profile.pca_seed) == (self.pca_solver, self.random_seed)
+                real_model = self.profile.pca if reuse else None
+                self._pca = PCAModels(self.encoding, n_components=5, solver=self.pca_solver, seed=self.random_seed, real_model=real_model)
+            return self._pca
+
+    @instrumented
+    def descriptive_statistics(self, dataset: str = 'real') -> DescriptiveStatistics:
+        """
+        Descriptive statistics of ``self.real`` or ``self.fake``, computed in one pass over the encoded data and shared by
+        `basic_statistical_evaluation` and `plot_mean_std`.
+
+        :param dataset: which dataset to use. Either ``real`` or ``fake``.
+        :return: the `descriptive.DescriptiveStatistics` of the dataset
+        """
+        if dataset not in ('real', 'fake'):
+            raise ValueError(f'`dataset` must be \'real\' or \'fake\', but is {dataset}.')
+        with self._lock:
+            if dataset not in self._descriptive_statistics:
+                if dataset == 'real' and self._profile_matches():
+                    self._descriptive_statistics[dataset] = self.profile.statistics
+                else:
+                    self._descriptive_statistics[dataset] = DescriptiveStatistics.from_encoding(self.encoding, dataset)
+            return self._descriptive_statistics[dataset]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def _profile_matches(self) -> bool:
+        """
+        Whether the results of ``self.profile`` that depend on the categorical codes apply, see `profile.RealProfile.matches`.
+        """
+        return self.profile is not None and self.profile.matches(self.encoding)
+
+    def invalidate_cache(self, dataset: str = None):
+        """
+        Drop memoized association matrices, row hash indexes, descriptive statistics, PCA fits and the numerical encoding. Call this after
+        modifying ``self.real``, ``self.fake`` or ``self.categorical_columns`` in place; assigning ``self.real`` or ``self.fake`` calls it.
+        Dropping the real entries also detaches the `profile.RealProfile` the evaluator was built with, as it no longer describes
+        ``self.real``.
 
+        :param dataset: ``real`` or ``fake`` to only drop the entries of that dataset. If None, the whole cache is cleared.
+        """
+        with self._lock:
+            if dataset != 'fake':
+                self.profile = None
+            self._encoding = None
+            # Category counts share the codebook of both datasets, so statistics are always dropped together with the encoding.
+            self._descriptive_statistics.clear()
+            # So do the PCA fits, as the real ordinal matrix depends on the categories of the fake data too.
+            self._pca = None
+            if dataset is None:
+                self._association_cache.invalidate()
+                self._row_hash_indexes.clear()
+            else:
+                self._association_cache.invalidate(dataset)
+                self._row_hash_indexes.pop(dataset, None)
+
+    @instrumented
     def correlation_distance(self, how: str = 'euclidean') -> float:
         """
         Calculate distance between correlation matrices with certain metric.
@@ -217,33 +428,30 @@ class TableEvaluator:
         else:
             raise ValueError(f'`how` parameter must be in [euclidean, mae, rmse]')
 
-        real_corr = compute_associations(self.real, nominal_columns=self.categorical_columns, theil_u=True)
-        fake_corr = compute_associations(self.fake, nominal_columns=self.categorical_columns, theil_u=True)
+        real_corr = self.association_matrix('real')
+        fake_corr = self.association_matrix('fake')
 
         return distance_func(
             real_corr.values,
             fake_corr.values
         )
 
-    def plot_pca(self, fname=None, rplt=False):
+    @instrumented
+    def plot_pca(self, fname=None, rplt=False, shared_basis: bool = False):
         """
         Plot the first two components of a PCA of real and fake data.
         :param fname: If not none, saves the plot with this file name.
+        :param shared_basis: project the fake data onto the components of the real data, on the same axes, instead of onto its own components
         """
-        real, fake = self.convert_numerical()
+        real_t = self.pca.transform('real')
+        fake_t = self.pca.transform('fake', shared_basis=shared_basis)
 
-        pca_r = PCA(n_components=2)
-        pca_f = PCA(n_components=2)
-
-        real_t = pca_r.fit_transform(real)
-        fake_t = pca_f.fit_transform(fake)
-
-        fig, ax = plt.subplots(1, 2, figsize=(12, 6))
+        fig, ax = plt.subplots(1, 2, figsize=(12, 6), sharex=shared_basis, sharey=shared_basis)
         fig.suptitle('First two components of PCA', fontsize=16)
         sns.scatterplot(ax=ax[0], x=real_t[:, 0], y=real_t[:, 1])
         sns.scatterplot(ax=ax[1], x=fake_t[:, 0], y=fake_t[:, 1])
         ax[0].set_title('Real data')
-        ax[1].set_title('Fake data')
+        ax[1].set_title('Fake data on the real components' if shared_basis else 'Fake data')
 
         if fname is not None: 
             plt.savefig(fname)
@@ -252,77 +460,120 @@ class TableEvaluator:
         else:
             plt.show()
 
-    def get_copies(self, return_len: bool = False) -> Union[pd.DataFrame, int]:
+    @instrumented
+    def get_copies(self, return_len: bool = False, verify: bool = False) -> Union[pd.DataFrame, int]:
         """
         Check whether any real values occur in the fake data.
 
         :param return_len: whether to return the length of the copied rows or not.
+        :param verify: compare the values of rows with matching hashes to rule out hash collisions.
         :return: Dataframe containing the duplicates if return_len=False, else integer indicating the number of copied rows.
         """
-        real_hashes = self.real.apply(lambda x: hash(tuple(x)), axis=1)
-        fake_hashes = self.fake.apply(lambda x: hash(tuple(x)), axis=1)
-
-        dup_idxs = fake_hashes.isin(real_hashes.values)
-        dup_idxs = dup_idxs[dup_idxs == True].sort_index().index.tolist()
+        copied = self.row_hash_index('real').contains(self.row_hash_index('fake'), verify=verify)
 
         if self.verbose:
-            print(f'Nr copied columns: {len(dup_idxs)}')
-        copies = self.fake.loc[dup_idxs, :]
+            print(f'Nr copied columns: {copied.sum()}')
+        copies = self.fake.iloc[np.flatnonzero(copied)].sort_index()
 
         if return_len:
             return len(copies)
         else:
             return copies
 
-    def get_duplicates(self, return_values: bool = False) -> Tuple[Union[pd.DataFrame, int], Union[pd.DataFrame, int]]:
+    @instrumented
+    def get_duplicates(self, return_values: bool = False, verify: bool = False) -> Tuple[Union[pd.DataFrame, int], Union[pd.DataFrame, int]]:
         """
         Return duplicates within each dataset.
 
         :param return_values: whether to return the duplicate values in the datasets. If false, the lengths are returned.
+        :param verify: compare the values of rows with matching hashes to rule out hash collisions.
         :return: dataframe with duplicates or the length of those dataframes if return_values=False.
         """
-        real_duplicates = self.real[self.real.duplicated(keep=False)]
-        fake_duplicates = self.fake[self.fake.duplicated(keep=False)]
+        real_duplicated = self.row_hash_index('real').duplicated(verify=verify)
+        fake_duplicated = self.row_hash_index('fake').duplicated(verify=verify)
         if return_values:
-            return real_duplicates, fake_duplicates
+            return self.real[real_duplicated], self.fake[fake_duplicated]
         else:
-            return len(real_duplicates), len(fake_duplicates)
+            return int(real_duplicated.sum()), int(fake_duplicated.sum())
 
-    def pca_correlation(self, lingress=False):
+    @instrumented
+    def get_near_copies(self, return_rate: bool = False, mismatch_fraction: float = 0.1, resolution: float = 0.01, n_bands: int = 20,
+                        band_size: int = None, max_candidates: int = 100, memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                        n_samples_baseline: int = None) -> Union[pd.DataFrame, Tuple[float, float]]:
+        """
+        Find fake rows that copy a real row up to a few columns, e.g. a real record with one jittered numerical value, which `get_copies` misses.
+        Rows are bucketed with MinHash LSH by `privacy.MinHashIndex` and only pairs within a bucket are compared, so the time is about linear in
+        the number of rows. Exact copies are near copies with 0 mismatches.
+
+        On tables with few columns or categories, independent rows often agree in most columns, so the rate of near-copied fake rows is only
+        meaningful next to the rate of real rows that are near copies of other real rows, which is returned with it.
+
+        :param return_rate: whether to return the fractions of fake rows and of real rows that are near copies instead of the pairs.
+        :param mismatch_fraction: largest fraction of differing columns of a near copy, rounded down to a number of columns.
+        :param resolution: largest difference of equal numerical values, relative to the range of the real column.
+        :param n_bands: see `privacy.MinHashIndex`
+        :param band_size: see `privacy.MinHashIndex`
+        :param max_candidates: see `privacy.MinHashIndex`
+        :param memory_budget: upper bound in bytes for the temporary memory used while querying
+        :param n_samples_baseline: number of real rows queried for the baseline rate. As many as there are fake rows if None.
+        :return: DataFrame with the index labels of every near-copied fake row and its closest real row (``fake`` and ``real``) and the number of
+            differing columns (``mismatches``) if return_rate=False, else `(fake rate, real baseline rate)`.
+        """
+        encoding = self.encoding
+        max_mismatches = int(mismatch_fraction * len(encoding.columns))
+        index = MinHashIndex(categorical=[encoding.columns.index(col) for col in encoding.categorical_columns], max_mismatches=max_mismatches,
+                             resolution=resolution, n_bands=n_bands, band_size=band_size, max_candidates=max_candidates, memory_budget=memory_budget,
+                             seed=self.random_seed)
+        pairs = index.fit(encoding.real_ordinal).query(encoding.fake_ordinal)
+
+        if self.verbose:
+            print(f'Nr near-copied rows: {len(pairs)}')
+        if return_rate:
+            n_baseline = min(n_samples_baseline or len(self.fake), len(self.real))
+            baseline = index.baseline(n_baseline, seed=self.random_seed)
+            return len(pairs) / len(self.fake) if len(self.fake) else 0.0, len(baseline) / n_baseline if n_baseline else 0.0
+        return pd.DataFrame({
+            'fake': self.fake.index[pairs['query']],
+            'real': self.real.index[pairs['reference']],
+            'mismatches': pairs['mismatches'],
+        })
+
+    @instrumented
+    def pca_correlation(self, lingress=False, shared_basis: bool = False):
         """
         Calculate the relation between PCA explained variance values. Due to some very large numbers, in recent implementation the MAPE(log) is used instead of
         regressions like Pearson's r.
 
         :param lingress: whether to use a linear regression, in this case Pearson's.
+        :param shared_basis: compare the explained variances of the real components with the variances of the fake data along those same
+            components, instead of with the explained variances of the fake components
         :return: the correlation coefficient if lingress=True, otherwise 1 - MAPE(log(real), log(fake))
         """
-        self.pca_r = PCA(n_components=5)
-        self.pca_f = PCA(n_components=5)
-
-        real, fake = self.convert_numerical()
-
-        self.pca_r.fit(real)
-        self.pca_f.fit(fake)
+        self.pca_r, self.pca_f = self.pca.model('real'), self.pca.model('fake')
+        real_variance, fake_variance = self.pca.explained_variance('real'), self.pca.explained_variance('fake', shared_basis=shared_basis)
         if self.verbose:
-            results = pd.DataFrame({'real': self.pca_r.explained_variance_, 'fake': self.pca_f.explained_variance_})
+            results = pd.DataFrame({'real': real_variance, 'fake': fake_variance})
             print(f'\nTop 5 PCA components:')
             print(results.to_string())
 
         if lingress:
-            corr, p, _ = self.comparison_metric(self.pca_r.explained_variance_, self.pca_f.explained_variance_)
+            corr, p, _ = self.comparison_metric(real_variance, fake_variance)
             return corr
         else:
-            pca_error = mean_absolute_percentage_error(self.pca_r.explained_variance_, self.pca_f.explained_variance_)
+            pca_error = mean_absolute_percentage_error(real_variance, fake_variance)
             return 1 - pca_error
 
-    def fit_estimators(self):
+    @instrumented
+    def fit_estimators(self, fit_real: bool = True):
         """
         Fit self.r_estimators and self.f_estimators to real and fake data, respectively.
+
+        :param fit_real: whether to fit self.r_estimators. False when they were already fitted by a `profile.RealProfile`.
         """
 
-        if self.verbose:
+        if self.verbose and fit_real:
             print(f'\nFitting real')
-        for i, c in enumerate(self.r_estimators):
+        for i, c in enumerate(self.r_estimators if fit_real else []):
             if self.verbose:
                 print(f'{i + 1}: {type(c).__name__}')
             c.fit(self.real_x_train, self.real_y_train)
@@ -334,20 +585,30 @@ class TableEvaluator:
                 print(f'{i + 1}: {type(c).__name__}')
             c.fit(self.fake_x_train, self.fake_y_train)
 
+    @instrumented
     def score_estimators(self):
         """
         Get F1 scores of self.r_estimators and self.f_estimators on the fake and real data, respectively.
 
+        :return: dataframe with the results for each estimator on each data test set.
+        """
+        r_predictions = [(clf.predict(self.real_x_test), clf.predict(self.fake_x_test)) for clf in self.r_estimators]
+        f_predictions = [(clf.predict(self.real_x_test), clf.predict(self.fake_x_test)) for clf in self.f_estimators]
+        return self._score_predictions(r_predictions, f_predictions, self.real_y_test, self.fake_y_test)
+
+    def _score_predictions(self, r_predictions, f_predictions, real_y_test, fake_y_test) -> pd.DataFrame:
+        """
+        Score the test set predictions of the real- and fake-trained estimators. ``r_predictions[i]`` and ``f_predictions[i]`` hold the predictions
+        of the i-th estimator on the real and the fake test set, in that order.
+
         :return: dataframe with the results for each estimator on each data test set.
         """
         if self.target_type == 'class':
             rows = []
-            for r_classifier, f_classifier, estimator_name in zip(self.r_estimators, self.f_estimators,
-                                                                  self.estimator_names):
-                for dataset, target, dataset_name in zip([self.real_x_test, self.fake_x_test],
-                                                         [self.real_y_test, self.fake_y_test], ['real', 'fake']):
-                    predictions_classifier_real = r_classifier.predict(dataset)
-                    predictions_classifier_fake = f_classifier.predict(dataset)
+            for r_preds, f_preds, estimator_name in zip(r_predictions, f_predictions, self.estimator_names):
+                for i, target, dataset_name in zip([0, 1], [real_y_test, fake_y_test], ['real', 'fake']):
+                    predictions_classifier_real = r_preds[i]
+                    predictions_classifier_fake = f_preds[i]
                     f1_r = f1_score(target, predictions_classifier_real, average='micro')
                     f1_f = f1_score(target, predictions_classifier_fake, average='micro')
                     jac_sim = jaccard_score(predictions_classifier_real, predictions_classifier_fake, average='micro')
@@ -357,12 +618,12 @@ class TableEvaluator:
             results = pd.DataFrame(rows).set_index('index')
 
         elif self.target_type == 'regr':
-            r2r = [rmse(self.real_y_test, clf.predict(self.real_x_test)) for clf in self.r_estimators]
-            f2f = [rmse(self.fake_y_test, clf.predict(self.fake_x_test)) for clf in self.f_estimators]
+            r2r = [rmse(real_y_test, preds[0]) for preds in r_predictions]
+            f2f = [rmse(fake_y_test, preds[1]) for preds in f_predictions]
 
             # Calculate test set accuracies on the other dataset
-            r2f = [rmse(self.fake_y_test, clf.predict(self.fake_x_test)) for clf in self.r_estimators]
-            f2r = [rmse(self.real_y_test, clf.predict(self.real_x_test)) for clf in self.f_estimators]
+            r2f = [rmse(fake_y_test, preds[1]) for preds in r_predictions]
+            f2r = [rmse(real_y_test, preds[0]) for preds in f_predictions]
             index = [f'real_data_{classifier}' for classifier in self.estimator_names] + \
                     [f'fake_data_{classifier}' for classifier in self.estimator_names]
             results = pd.DataFrame({'real': r2r + f2r, 'fake': r2f + f2f}, index=index)
@@ -370,6 +631,7 @@ class TableEvaluator:
             raise Exception(f'self.target_type should be either \'class\' or \'regr\', but is {self.target_type}.')
         return results
 
+    @instrumented
     def visual_evaluation(self, save_dir=None, **kwargs):
         """
         Plot all visual evaluation metrics. Includes plotting the mean and standard deviation, cumulative sums, correlation differences and the PCA transform.
@@ -393,31 +655,16 @@ class TableEvaluator:
             self.plot_pca(fname=save_dir/'pca.png') 
         
 
-    def basic_statistical_evaluation(self) -> float:
+    @instrumented
+    def basic_statistical_evaluation(self, include_categorical: bool = False) -> float:
         """
         Calculate the correlation coefficient between the basic properties of self.real and self.fake using Spearman's Rho. Spearman's is used because these
         values can differ a lot in magnitude, and Spearman's is more resilient to outliers.
 
+        :param include_categorical: also compare the relative frequency of every category of the categorical columns
         :return: correlation coefficient
         """
-        total_metrics = pd.DataFrame()
-        for ds_name in ['real', 'fake']:
-            ds = getattr(self, ds_name)
-            metrics = {}
-            # TODO: add discrete columns as factors
-            num_ds = ds[self.numerical_columns]
-
-            for idx, value in num_ds.mean().items():
-                metrics[f'mean_{idx}'] = value
-            for idx, value in num_ds.median().items():
-                metrics[f'median_{idx}'] = value
-            for idx, value in num_ds.std().items():
-                metrics[f'std_{idx}'] = value
-            for idx, value in num_ds.var().items():
-                metrics[f'variance_{idx}'] = value
-            total_metrics[ds_name] = metrics.values()
-
-        total_metrics.index = metrics.keys()
+        total_metrics = summary_frame(self.descriptive_statistics('real'), self.descriptive_statistics('fake'), include_categorical)
         self.statistical_results = total_metrics
         if self.verbose:
             print('\nBasic statistical attributes:')
@@ -425,6 +672,7 @@ class TableEvaluator:
         corr, p = stats.spearmanr(total_metrics['real'], total_metrics['fake'])
         return corr
 
+    @instrumented
     def correlation_correlation(self) -> float:
         """
         Calculate the correlation coefficient between the association matrices of self.real and self.fake using self.comparison_metric
@@ -433,8 +681,7 @@ class TableEvaluator:
         """
         total_metrics = pd.DataFrame()
         for ds_name in ['real', 'fake']:
-            ds = getattr(self, ds_name)
-            corr_df = compute_associations(ds, nominal_columns=self.categorical_columns, theil_u=True)
+            corr_df = self.association_matrix(ds_name)
             values = corr_df.values
             values = values[~np.eye(values.shape[0], dtype=bool)].reshape(values.shape[0], -1)
             total_metrics[ds_name] = values.flatten()
@@ -446,41 +693,39 @@ class TableEvaluator:
             print(total_metrics.to_string())
         return corr
 
+    @instrumented
     def convert_numerical(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
         Special function to convert dataset to a numerical representations while making sure they have identical columns. This is sometimes a problem with
         categorical columns with many values or very unbalanced values
 
-        :return: Real and fake dataframe factorized using the pandas function
+        :return: Real and fake dataframe with categorical columns replaced by their codes in the shared codebook, see `encoding`
         """
-        real = self.real
-        fake = self.fake
-        for c in self.categorical_columns:
-            if real[c].dtype == 'object':
-                real[c] = pd.factorize(real[c], sort=True)[0]
-                fake[c] = pd.factorize(fake[c], sort=True)[0]
-
+        encoding = self.encoding
+        real = pd.DataFrame(encoding.real_ordinal, index=self.real.index, columns=encoding.columns)
+        fake = pd.DataFrame(encoding.fake_ordinal, index=self.fake.index, columns=encoding.columns)
         return real, fake
 
-    def convert_numerical_one_hot(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    @instrumented
+    def convert_numerical_one_hot(self, sparse: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
         Special function to convert dataset to a numerical representations while making sure they have identical columns. This is sometimes a problem with
         categorical columns with many values or very unbalanced values
 
+        :param sparse: return DataFrames with sparse columns, backed by the CSR matrices of `encoding`. Use this for high-cardinality categoricals.
         :return: Real and fake dataframe with categorical columns one-hot encoded and binary columns factorized.
         """
-        real = numerical_encoding(self.real, nominal_columns=self.categorical_columns)
-        columns = sorted(real.columns.tolist())
-        real = real[columns]
-        fake = numerical_encoding(self.fake, nominal_columns=self.categorical_columns)
-        for col in columns:
-            if col not in fake.columns.tolist():
-                fake[col] = 0
-        fake = fake[columns]
-
+        encoding = self.encoding
+        if sparse:
+            real = pd.DataFrame.sparse.from_spmatrix(encoding.one_hot('real', sparse=True), index=self.real.index, columns=encoding.one_hot_columns)
+            fake = pd.DataFrame.sparse.from_spmatrix(encoding.one_hot('fake', sparse=True), index=self.fake.index, columns=encoding.one_hot_columns)
+            return real, fake
+        real = pd.DataFrame(encoding.real_one_hot, index=self.real.index, columns=encoding.one_hot_columns)
+        fake = pd.DataFrame(encoding.fake_one_hot, index=self.fake.index, columns=encoding.one_hot_columns)
         return real, fake
 
-    def estimator_evaluation(self, target_col: str, target_type: str = 'class', kfold: bool = False) -> float:
+    @instrumented
+    def estimator_evaluation(self, target_col: str, target_type: str = 'class', kfold: bool = False, n_jobs: int = 1) -> float:
         """
         Method to do full estimator evaluation, including training. And estimator is either a regressor or a classifier, depending on the task. Two sets are
         created of each of the estimators `S_r` and `S_f`, for the real and fake data respectively. `S_f` is trained on ``self.real`` and `S_r` on
@@ -490,70 +735,34 @@ class TableEvaluator:
         :param target_col: which column should be considered the target both both the regression and classification task.
         :param target_type: what kind of task this is. Can be either ``class`` or ``regr``.
         :param kfold: if set to True, will perform 5-fold CV, otherwise will just train on 80% and test on 20% of the data once.
+        :param n_jobs: number of worker processes. If not 1, every (fold, estimator, real/fake) fit is scheduled as a separate task on a process pool
+            and the training data is shared with the workers through memory-mapped arrays. Scores are identical to the serial path. -1 uses all cores.
         :return: Correlation value or 1 - MAPE
         """
         self.target_col = target_col
         self.target_type = target_type
 
-        # Convert both datasets to numerical representations and split x and  y
-        real, fake = self.convert_numerical()
-
-        real_x = real.drop([target_col], axis=1)
-        fake_x = fake.drop([target_col], axis=1)
-
-        assert real_x.columns.tolist() == fake_x.columns.tolist(), f'real and fake columns are different: \n{real_x.columns}\n{fake_x.columns}'
-
-        real_y = real[target_col]
-        fake_y = fake[target_col]
-
-        # For reproducibilty:
-        np.random.seed(self.random_seed)
-
-        if target_type == 'regr':
-            self.estimators = [
-                RandomForestRegressor(n_estimators=20, max_depth=5, random_state=42),
-                Lasso(random_state=42),
-                Ridge(alpha=1.0, random_state=42),
-                ElasticNet(random_state=42),
-            ]
-        elif target_type == 'class':
-            self.estimators = [
-                LogisticRegression(multi_class='auto', solver='lbfgs', max_iter=500, random_state=42),
-                RandomForestClassifier(n_estimators=10, random_state=42),
-                DecisionTreeClassifier(random_state=42),
-                MLPClassifier([50, 50], solver='adam', activation='relu', learning_rate='adaptive', random_state=42),
-            ]
-        else:
-            raise ValueError(f'target_type must be \'regr\' or \'class\'')
+        # Split the numerical representations of both datasets into x and y
+        real_x, real_y = split_target(self.encoding, 'real', self.real.index, target_col)
+        fake_x, fake_y = split_target(self.encoding, 'fake', self.fake.index, target_col)
 
+        # The estimators carry their own random states, so fits are reproducible without seeding the global random state, which other
+        # evaluators and metrics running in other threads draw from.
+        self.estimators = make_estimators(target_type)
         self.estimator_names = [type(clf).__name__ for clf in self.estimators]
 
-        # K Fold
-        kf = KFold(n_splits=5)
-        res = []
-        for train_index, test_index in kf.split(real_y):
-            self.real_x_train = real_x.iloc[train_index]
-            self.real_x_test = real_x.iloc[test_index]
-            self.real_y_train = real_y.iloc[train_index]
-            self.real_y_test = real_y.iloc[test_index]
-            self.fake_x_train = fake_x.iloc[train_index]
-            self.fake_x_test = fake_x.iloc[test_index]
-            self.fake_y_train = fake_y.iloc[train_index]
-            self.fake_y_test = fake_y.iloc[test_index]
-
-            self.r_estimators = copy.deepcopy(self.estimators)
-            self.f_estimators = copy.deepcopy(self.estimators)
-
-            for estimator in self.estimators:
-                assert hasattr(estimator, 'fit')
-                assert hasattr(estimator, 'score')
+        for estimator in self.estimators:
+            assert hasattr(estimator, 'fit')
+            assert hasattr(estimator, 'score')
 
-            self.fit_estimators()
-            res.append(self.score_estimators())
+        folds = estimator_folds(len(real_y), kfold)
+        # Real estimators trained by the profile on the same folds, if it has them and the codes of the target and features match.
+        real_estimators = self.profile.estimators.get((target_col, target_type, bool(kfold))) if self._profile_matches() else None
 
-            # Break the loop if we don't want the kfold
-            if not kfold:
-                break
+        if n_jobs == 1:
+            res = self._estimator_folds_serial(folds, real_x, real_y, fake_x, fake_y, real_estimators)
+        else:
+            res = self._estimator_folds_parallel(folds, real_x, real_y, fake_x, fake_y, n_jobs=n_jobs, real_estimators=real_estimators)
 
         self.estimators_scores = pd.concat(res).groupby(level=0).mean()
         if self.verbose:
@@ -570,38 +779,126 @@ class TableEvaluator:
         else:
             raise ValueError('`self.target_type` should be `regr` or `class`.')
 
-    def row_distance(self, n_samples: int = None) -> Tuple[np.number, np.number]:
+    def _set_fold(self, train_index, test_index, real_x, real_y, fake_x, fake_y):
+        self.real_x_train = real_x.iloc[train_index]
+        self.real_x_test = real_x.iloc[test_index]
+        self.real_y_train = real_y.iloc[train_index]
+        self.real_y_test = real_y.iloc[test_index]
+        self.fake_x_train = fake_x.iloc[train_index]
+        self.fake_x_test = fake_x.iloc[test_index]
+        self.fake_y_train = fake_y.iloc[train_index]
+        self.fake_y_test = fake_y.iloc[test_index]
+
+    def _estimator_folds_serial(self, folds, real_x, real_y, fake_x, fake_y, real_estimators: List[List] = None) -> List[pd.DataFrame]:
+        """
+        Fit and score ``self.estimators`` on every fold in turn.
+
+        :param real_estimators: real estimators per fold, already fitted by a `profile.RealProfile`
+        """
+        res = []
+        for fold, (train_index, test_index) in enumerate(folds):
+            self._set_fold(train_index, test_index, real_x, real_y, fake_x, fake_y)
+
+            self.r_estimators = copy.deepcopy(self.estimators if real_estimators is None else real_estimators[fold])
+            self.f_estimators = copy.deepcopy(self.estimators)
+
+            self.fit_estimators(fit_real=real_estimators is None)
+            res.append(self.score_estimators())
+        return res
+
+    def _estimator_folds_parallel(self, folds, real_x, real_y, fake_x, fake_y, n_jobs: int, real_estimators: List[List] = None) -> List[pd.DataFrame]:
+        """
+        Fit ``self.estimators`` on every fold on a process pool, with one task per (fold, estimator, real/fake) combination, and score the
+        predictions in the main process.
+
+        :param real_estimators: real estimators per fold, already fitted by a `profile.RealProfile`. Only the fake estimators are fitted then.
+        """
+        datasets = ['real', 'fake'] if real_estimators is None else ['fake']
+        if self.verbose:
+            print(f'\nFitting {len(datasets) * len(folds) * len(self.estimators)} estimators with n_jobs={n_jobs}')
+        with shared_arrays(real_x.values, real_y.values, fake_x.values, fake_y.values) as (rx, ry, fx, fy):
+            data = {'real': (rx, ry), 'fake': (fx, fy)}
+            tasks = [(fold, est, *data[dataset])
+                     for fold in range(len(folds))
+                     for est in range(len(self.estimators))
+                     for dataset in datasets]
+            outputs = Parallel(n_jobs=n_jobs)(
+                delayed(_fit_and_predict)(copy.deepcopy(self.estimators[est]), x, y, folds[fold][0], rx, fx, folds[fold][1])
+                for fold, est, x, y in tasks)
+
+        res = []
+        n_estimators = len(self.estimators)
+        for fold, (train_index, test_index) in enumerate(folds):
+            fold_outputs = outputs[fold * len(datasets) * n_estimators:(fold + 1) * len(datasets) * n_estimators]
+            if real_estimators is None:
+                r_outputs, f_outputs = fold_outputs[0::2], fold_outputs[1::2]
+            else:
+                r_outputs = [(clf, clf.predict(real_x.iloc[test_index]), clf.predict(fake_x.iloc[test_index]))
+                             for clf in copy.deepcopy(real_estimators[fold])]
+                f_outputs = fold_outputs
+            res.append(self._score_predictions([o[1:] for o in r_outputs], [o[1:] for o in f_outputs],
+                                               real_y.values[test_index], fake_y.values[test_index]))
+
+        self._set_fold(*folds[-1], real_x, real_y, fake_x, fake_y)
+        self.r_estimators = [o[0] for o in r_outputs]
+        self.f_estimators = [o[0] for o in f_outputs]
+        return res
+
+    @instrumented
+    def row_distance(self, n_samples: int = None, method: str = 'exact', memory_budget: int = DEFAULT_MEMORY_BUDGET, sparse: bool = None,
+                     **kwargs) -> Tuple[np.number, np.number]:
         """
         Calculate mean and standard deviation distances between `self.fake` and `self.real`.
 
         :param n_samples: Number of samples to take for evaluation. Compute time increases exponentially.
+        :param method: nearest neighbour backend, see `neighbors.nearest_neighbor_distances`. ``exact`` compares blocks of rows and matches a full
+            distance matrix, ``kdtree`` is exact and faster on narrow tables, ``approximate`` trades accuracy for speed on large data.
+        :param memory_budget: upper bound in bytes for the temporary memory used by the nearest neighbour search.
+        :param sparse: use a CSR one-hot encoding, so memory and time scale with the number of non-zeros instead of the number of categories. Only
+            supported by the ``exact`` backend. If None, it is used with the ``exact`` backend when the dense one-hot encoding would not fit in
+            ``memory_budget``.
+        :param kwargs: backend specific keyword arguments, e.g. ``eps`` for the ``approximate`` backend.
         :return: `(mean, std)` of these distances.
         """
         if n_samples is None:
             n_samples = len(self.real)
 
-        real, fake = self.convert_numerical_one_hot()
-
-        columns = sorted(real.columns.tolist())
-        real = real[columns]
-
-        for col in columns:
-            if col not in fake.columns.tolist():
-                fake[col] = 0
-        fake = fake[columns]
+        encoding = self.encoding
+        if sparse is None:
+            sparse = method == 'exact' and encoding.one_hot_nbytes('real') > memory_budget
+        continuous = encoding.continuous_one_hot_columns()
+        real = standardize_columns(encoding.one_hot('real', sparse=sparse), continuous)
+        fake = standardize_columns(encoding.one_hot('fake', sparse=sparse), continuous)
 
-        for column in real.columns.tolist():
-            if len(real[column].unique()) > 2:
-                real[column] = (real[column] - real[column].mean()) / real[column].std()
-                fake[column] = (fake[column] - fake[column].mean()) / fake[column].std()
-        assert real.columns.tolist() == fake.columns.tolist()
-
-        distances = cdist(real[:n_samples], fake[:n_samples])
-        min_distances = np.min(distances, axis=1)
+        min_distances = nearest_neighbor_distances(real[:n_samples], fake[:n_samples], method=method, memory_budget=memory_budget, **kwargs)
         min_mean = np.mean(min_distances)
         min_std = np.std(min_distances)
         return min_mean, min_std
 
+    @instrumented
+    def closest_record_distances(self, n_samples_baseline: int = None, n_tables: int = 10, n_hashes: int = None, bucket_width: float = 0.25,
+                                 max_candidates: int = 64, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Gower distance from every fake row to its closest real row, and the same distance from real rows to their closest other real row as the
+        baseline to judge it against. Both come from one `privacy.GowerIndex` over the real rows, which compares numerical columns by their
+        range-scaled difference and categorical columns by equality, so no one-hot encoding is needed. Fake rows much closer to the real data than
+        the baseline point to memorized records.
+
+        :param n_samples_baseline: number of real rows queried for the baseline. As many as there are fake rows if None.
+        :param n_tables: see `privacy.GowerIndex`
+        :param n_hashes: see `privacy.GowerIndex`
+        :param bucket_width: see `privacy.GowerIndex`
+        :param max_candidates: see `privacy.GowerIndex`
+        :param memory_budget: upper bound in bytes for the temporary memory used while querying
+        :return: `(fake distances, real baseline distances)`
+        """
+        encoding = self.encoding
+        index = GowerIndex(memory_budget, categorical=[encoding.columns.index(col) for col in encoding.categorical_columns], n_tables=n_tables,
+                           n_hashes=n_hashes, bucket_width=bucket_width, max_candidates=max_candidates, seed=self.random_seed)
+        index.fit(encoding.real_ordinal)
+        return index.query(encoding.fake_ordinal), index.baseline(n_samples_baseline or len(encoding.fake_ordinal), seed=self.random_seed)
+
+    @instrumented
     def column_correlations(self):
         """
         Wrapper function around `metrics.column_correlation`.
@@ -613,8 +910,92 @@ class TableEvaluator:
 
         return column_correlations(real, fake, self.categorical_columns)
 
+    @instrumented
+    def bootstrap(self, n_replicates: int = 200, target_col: str = None, target_type: str = 'class', confidence: float = 0.95,
+                  time_budget: float = None, metrics: List[str] = None, seed: int = None, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> pd.DataFrame:
+        """
+        Bootstrap confidence intervals of the metrics of `evaluate`. Every replicate resamples the rows of ``self.real`` and ``self.fake`` with
+        replacement; the replicates are drawn as index matrices and their metrics computed for a whole batch at once with `bootstrap.Bootstrap`,
+        without running `evaluate` per replicate. The row distance and the duplicates are not bootstrapped, and the estimators are not refitted:
+        their test sets are resampled instead. The replicates themselves are kept in ``self.bootstrap_replicates``.
+
+        :param n_replicates: number of replicates
+        :param target_col: target of the estimators. If None, the estimators are left out.
+        :param target_type: ``class`` or ``regr``
+        :param confidence: coverage of the percentile intervals
+        :param time_budget: seconds to spend at most, which lowers the number of replicates if they do not fit. See `bootstrap.Bootstrap.replicates`.
+        :param metrics: names of the metrics to bootstrap, from ``bootstrap.BOOTSTRAP_METRICS``
+        :param seed: seed of the resamples. ``self.random_seed`` if None.
+        :param memory_budget: approximate number of bytes of the temporary arrays of a batch of replicates
+        :return: DataFrame indexed by metric with the estimate on the samples themselves and the mean, standard deviation and interval of the
+            replicates, see `bootstrap.bootstrap_intervals`
+        """
+        bootstrap = Bootstrap(self, metrics=metrics, target_col=target_col, target_type=target_type)
+        replicates = bootstrap.replicates(n_replicates, time_budget=time_budget, seed=self.random_seed if seed is None else seed,
+                                          memory_budget=memory_budget)
+        self.bootstrap_replicates = _bootstrap_frame(replicates, target_type, self.numerical_columns)
+        estimates = _bootstrap_frame(bootstrap.estimates(), target_type, self.numerical_columns).iloc[0]
+        return bootstrap_intervals(self.bootstrap_replicates, estimates, confidence=confidence)
+
+    def evaluation_plan(self, target_col: str, target_type: str = 'class', n_samples_distance: int = 20000, kfold: bool = False,
+                        distance_method: str = 'exact', n_jobs: int = 1) -> EvaluationPlan:
+        """
+        Dependency graph of the metrics of `evaluate`. Every metric declares the shared inputs it reads, so the encoding, the association matrices,
+        the descriptive statistics and the row hash indexes are each computed once, before the metrics that need them. The caches behind these
+        inputs are guarded by a lock as well, and ``js_distance`` and ``ks_test`` only read the samples, which no step modifies. The metrics are:
+
+        ``basic_statistics``, ``correlation_correlation``, ``column_correlations``, ``estimators``, ``row_distance``, ``duplicates``,
+        ``correlation_distance_rmse``, ``correlation_distance_mae``, ``js_distance`` and ``ks_test``, and ``near_copies``, which only runs when it
+        is selected.
+
+        See `evaluate` for the parameters.
+        """
+        plan = EvaluationPlan()
+        plan.add_input('encoding', lambda: self.encoding)
+        plan.add_input('real_associations', lambda: self.association_matrix('real'))
+        plan.add_input('fake_associations', lambda: self.association_matrix('fake'))
+        plan.add_input('descriptive_statistics', lambda: (self.descriptive_statistics('real'), self.descriptive_statistics('fake')),
+                       requires=['encoding'])
+        plan.add_input('row_hash_indexes', lambda: (self.row_hash_index('real'), self.row_hash_index('fake')))
+        associations = ['real_associations', 'fake_associations']
+
+        plan.add_metric('basic_statistics', self.basic_statistical_evaluation, requires=['descriptive_statistics'])
+        plan.add_metric('correlation_correlation', self.correlation_correlation, requires=associations)
+        plan.add_metric('column_correlations', self.column_correlations, requires=['encoding'])
+        plan.add_metric('estimators', lambda: self.estimator_evaluation(target_col=target_col, target_type=target_type, kfold=kfold, n_jobs=n_jobs),
+                        requires=['encoding'])
+        plan.add_metric('row_distance', lambda: self.row_distance(n_samples=n_samples_distance, method=distance_method), requires=['encoding'])
+        plan.add_metric('duplicates', self.get_duplicates, requires=['row_hash_indexes'])
+        plan.add_metric('near_copies', lambda: self.get_near_copies(return_rate=True), requires=['encoding'], default=False)
+        plan.add_metric('correlation_distance_rmse', lambda: self.correlation_distance(how='rmse'), requires=associations)
+        plan.add_metric('correlation_distance_mae', lambda: self.correlation_distance(how='mae'), requires=associations)
+        plan.add_metric('js_distance', self._js_distance)
+        plan.add_metric('ks_test', self._ks_test)
+        return plan
+
+    def _js_distance(self) -> pd.DataFrame:
+        """
+        `metrics.js_distance_df` of the numerical columns, from the real bins of ``self.profile`` if there is one.
+        """
+        if self.profile is None:
+            return js_distance_df(self.real, self.fake, self.numerical_columns)
+        return js_distance_df_from_binned(self.profile.js_edges, self.profile.js_probabilities, self.fake, self.numerical_columns)
+
+    def _ks_test(self) -> pd.DataFrame:
+        """
+        `metrics.kolmogorov_smirnov_df` of the numerical columns, from the sorted real columns of ``self.profile`` if there is one.
+        """
+        if self.profile is None:
+            return kolmogorov_smirnov_df(self.real, self.fake, self.numerical_columns)
+        fake_sorted = np.sort(np.ascontiguousarray(self.fake[self.numerical_columns].to_numpy(dtype=float).T), axis=1)
+        real = pd.DataFrame(self.profile.sorted_numerical.T, columns=self.numerical_columns)
+        fake = pd.DataFrame(fake_sorted.T, columns=self.numerical_columns)
+        return kolmogorov_smirnov_df(real, fake, self.numerical_columns, presorted=True)
+
+    @instrumented
     def evaluate(self, target_col: str, target_type: str = 'class', metric: str = None, verbose: bool = None,
-                 n_samples_distance: int = 20000, kfold: bool = False, notebook: bool = False, return_outputs: bool = False) -> Dict:
+                 n_samples_distance: int = 20000, kfold: bool = False, notebook: bool = False, return_outputs: bool = False,
+                 distance_method: str = 'exact', n_jobs: int = 1, max_workers: int = 1, metrics: List[str] = None, skip: List[str] = None) -> Dict:
         """
         Determine correlation between attributes from the real and fake dataset using a given metric.
         All metrics from scipy.stats are available.
@@ -624,110 +1005,154 @@ class TableEvaluator:
         :param metric: overwrites self.metric. Scoring metric for the attributes.
             By default Pearson's r is used. Alternatives include Spearman rho (scipy.stats.spearmanr) or Kendall Tau (scipy.stats.kendalltau).
         :param n_samples_distance: The number of samples to take for the row distance. See documentation of ``tableEvaluator.row_distance`` for details.
+        :param distance_method: nearest neighbour backend used for the row distance. See ``tableEvaluator.row_distance``.
+        :param n_jobs: number of worker processes used to fit the estimators. See ``tableEvaluator.estimator_evaluation``.
         :param kfold: Use a 5-fold CV for the ML estimators if set to True. Train/Test on 80%/20% of the data if set to False.
         :param notebook: Better visualization of the results in a python notebook
         :param verbose: whether to print verbose logging.
-        :param return_outputs: Will omit printing and instead return a dictionairy with all results. 
+        :param return_outputs: Will omit printing and instead return a dictionairy with all results. The ``Timings`` entry holds the wall time,
+            CPU time and peak memory of every stage of the evaluation and of the public methods it called.
+        :param max_workers: number of threads that compute independent metrics concurrently. See `evaluation_plan`.
+        :param metrics: names of the metrics to compute, see `evaluation_plan`. All default metrics if None. Sections of skipped metrics are left
+            out of the report.
+        :param skip: names of metrics not to compute, e.g. ``['estimators', 'row_distance']`` to leave out the most expensive sections.
         """
+
         self.verbose = verbose if verbose is not None else self.verbose
         self.comparison_metric = metric if metric is not None else self.comparison_metric
 
         warnings.filterwarnings(action='ignore', category=ConvergenceWarning)
         pd.options.display.float_format = '{:,.4f}'.format
 
-        basic_statistical = self.basic_statistical_evaluation()
-        correlation_correlation = self.correlation_correlation()
-        column_correlation = self.column_correlations()
-        estimators = self.estimator_evaluation(target_col=target_col, target_type=target_type, kfold=kfold)
-        nearest_neighbor = self.row_distance(n_samples=n_samples_distance)
-
-        miscellaneous_dict = {
-            'Column Correlation Distance RMSE': self.correlation_distance(how='rmse'),
-            'Column Correlation distance MAE': self.correlation_distance(how='mae'),
-        }
-
-        miscellaneous = pd.DataFrame({'Result': list(miscellaneous_dict.values())},
-                                     index=list(miscellaneous_dict.keys()))
-
-        privacy_metrics_dict = {
-            'Duplicate rows between sets (real/fake)': self.get_duplicates(),
-            'nearest neighbor mean': nearest_neighbor[0],
-            'nearest neighbor std': nearest_neighbor[1],
-        }
-
-        privacy_report = EvaluationResult(
-            name='Privacy Results',
-            content=dict_to_df(privacy_metrics_dict),
-        )
-
-        privacy_tab = [privacy_report]
+        plan = self.evaluation_plan(target_col, target_type=target_type, n_samples_distance=n_samples_distance, kfold=kfold,
+                                    distance_method=distance_method, n_jobs=n_jobs)
+        first_record = len(self.instrumentation.records)
+        results = plan.run(max_workers=max_workers, metrics=metrics, skip=skip, instrumentation=self.instrumentation)
+        return _evaluation_report(self, results, target_type, estimator_evaluator=self, return_outputs=return_outputs, notebook=notebook,
+                                  timings=self.instrumentation.frame(first_record))
 
 
-        efficacy_title = 'Classifier F1-scores and their Jaccard similarities:' if self.target_type == 'class' \
-            else '\nRegressor MSE-scores'
-
+def _overview_results(results: Dict, target_type: str) -> Dict[str, float]:
+    """
+    Scores of the overview section from the results of an `EvaluationPlan`, with their mean as ``Similarity Score``. Scores can also be arrays of
+    bootstrap replicates, then the ``Similarity Score`` is the mean per replicate.
+    """
+    overview_names = {
+        'basic_statistics': 'Basic statistics',
+        'correlation_correlation': 'Correlation column correlations',
+        'column_correlations': 'Mean Correlation between fake and real columns',
+        'estimators': f'{"1 - MAPE Estimator results" if target_type == "class" else "Correlation RMSE"}',
+    }
+    overview = {label: results[name] for name, label in overview_names.items() if name in results}
+    if overview:
+        overview['Similarity Score'] = np.mean(list(overview.values()), axis=0)
+    return overview
+
+
+def _bootstrap_frame(results: Dict[str, np.ndarray], target_type: str, numerical_columns: List) -> pd.DataFrame:
+    """
+    Replicates of `bootstrap.Bootstrap` as a DataFrame with one column per metric, labeled like the report of `TableEvaluator.evaluate`. The
+    Jensen-Shannon distances and Kolmogorov-Smirnov statistics get a column per numerical column next to their mean.
+    """
+    frame = _overview_results(results, target_type)
+    for name, label in [('js_distance', 'Jensen-Shannon distance'), ('ks_test', 'Kolmogorov-Smirnov statistic')]:
+        if name in results and len(numerical_columns):
+            frame[f'Mean {label}'] = results[name].mean(axis=1)
+            for i, col in enumerate(numerical_columns):
+                frame[f'{label} {col}'] = results[name][:, i]
+    return pd.DataFrame(frame)
 
-        ml_efficacy_tab = [
-            EvaluationResult(name=efficacy_title, content=self.estimators_scores)
-        ]
 
+def _evaluation_report(evaluator, results: Dict, target_type: str, estimator_evaluator, return_outputs: bool = False, notebook: bool = False,
+                       timings: pd.DataFrame = None):
+    """
+    Build the report sections from the results of an `EvaluationPlan` and render them with `_render_report`. Sections of metrics that did not run
+    are left out.
 
-        js_df = js_distance_df(self.real, self.fake, self.numerical_columns)
+    :param estimator_evaluator: `TableEvaluator` that ran the estimators and holds their scores
+    :param timings: timings of the evaluation, see `instrumentation.Instrumentation.frame`. Adds a ``Timings`` section if given.
+    """
+    miscellaneous_names = {'correlation_distance_rmse': 'Column Correlation Distance RMSE', 'correlation_distance_mae': 'Column Correlation distance MAE'}
+    miscellaneous_dict = {label: results[name] for name, label in miscellaneous_names.items() if name in results}
+    miscellaneous = pd.DataFrame({'Result': list(miscellaneous_dict.values())},
+                                 index=list(miscellaneous_dict.keys()))
+
+    privacy_metrics_dict = {}
+    if 'duplicates' in results:
+        privacy_metrics_dict['Duplicate rows between sets (real/fake)'] = results['duplicates']
+    if 'near_copies' in results:
+        privacy_metrics_dict['Near-copy rate (fake)'], privacy_metrics_dict['Near-copy rate (real baseline)'] = results['near_copies']
+    if 'row_distance' in results:
+        privacy_metrics_dict['nearest neighbor mean'] = results['row_distance'][0]
+        privacy_metrics_dict['nearest neighbor std'] = results['row_distance'][1]
+    privacy_tab = [EvaluationResult(name='Privacy Results', content=dict_to_df(privacy_metrics_dict))] if privacy_metrics_dict else []
+
+    efficacy_title = 'Classifier F1-scores and their Jaccard similarities:' if target_type == 'class' \
+        else '\nRegressor MSE-scores'
+    ml_efficacy_tab = [EvaluationResult(name=efficacy_title, content=estimator_evaluator.estimators_scores)] if 'estimators' in results else []
+
+    statistical_tab = []
+    if 'js_distance' in results:
+        js_df = results['js_distance']
+        statistical_tab.append(EvaluationResult(name='Jensen-Shannon distance', content=js_df,
+                                                appendix=f'### Mean: {js_df.js_distance.mean(): .3f}'))
+    if 'ks_test' in results:
+        statistical_tab.append(EvaluationResult(name='Kolmogorov-Smirnov statistic', content=results['ks_test']))
+
+    all_results_dict = _overview_results(results, target_type)
+    overview_tab = [EvaluationResult(name='Overview Results', content=dict_to_df(all_results_dict))] if all_results_dict else []
+
+    timings_tab = [EvaluationResult(name='Timings', content=timings)] if timings is not None else []
+
+    return _render_report(evaluator, overview_tab, privacy_tab, ml_efficacy_tab, statistical_tab, miscellaneous, return_outputs=return_outputs,
+                          notebook=notebook, timings_tab=timings_tab)
+
+
+def _render_report(evaluator, overview_tab: List[EvaluationResult], privacy_tab: List[EvaluationResult], ml_efficacy_tab: List[EvaluationResult],
+                   statistical_tab: List[EvaluationResult], miscellaneous: pd.DataFrame, return_outputs: bool = False, notebook: bool = False,
+                   timings_tab: List[EvaluationResult] = None):
+    """
+    Show or return the sections of an evaluation report, shared by `TableEvaluator.evaluate` and `StreamingTableEvaluator.evaluate`.
+    Timings are only part of the returned dictionary and of the notebook view.
 
-        statistical_tab = [
-            EvaluationResult(name='Jensen-Shannon distance', content=js_df,
-                             appendix=f'### Mean: {js_df.js_distance.mean(): .3f}'),
-            EvaluationResult(name='Kolmogorov-Smirnov statistic',
-                             content=kolmogorov_smirnov_df(self.real, self.fake, self.numerical_columns)
-                             )
+    :return: dictionary with all results if ``return_outputs`` is True, else None
+    """
+    if return_outputs:
+        all_results = [
+            *overview_tab,
+            *ml_efficacy_tab,
+            *privacy_tab,
+            *statistical_tab,
+            *(timings_tab or []),
         ]
 
+        all_results = {x.name: x.content.to_dict(orient='index') for x in all_results}
 
-        all_results_dict = {
-            'Basic statistics': basic_statistical,
-            'Correlation column correlations': correlation_correlation,
-            'Mean Correlation between fake and real columns': column_correlation,
-            f'{"1 - MAPE Estimator results" if self.target_type == "class" else "Correlation RMSE"}': estimators,
-        }
-        all_results_dict['Similarity Score'] = np.mean(list(all_results_dict.values()))
+        return all_results
 
-        summary = EvaluationResult(
-            name='Overview Results',
-            content=dict_to_df(all_results_dict)
+    if notebook:
+        visualize_notebook(
+            evaluator,
+            overview=overview_tab,
+            privacy_metrics=privacy_tab,
+            ml_efficacy=ml_efficacy_tab,
+            statistical=statistical_tab,
+            timings=timings_tab or [],
         )
 
-        overview_tab = [summary, ]
-
-        if return_outputs:
-            all_results = [
-                *overview_tab,
-                *ml_efficacy_tab,
-                *privacy_tab,
-                *statistical_tab,
-            ]
-
-            all_results = {x.name: x.content.to_dict(orient='index') for x in all_results}
-
-            return all_results
-
-        if notebook:
-            visualize_notebook(
-                self,
-                overview=overview_tab,
-                privacy_metrics=privacy_tab,
-                ml_efficacy=ml_efficacy_tab,
-                statistical=statistical_tab,
-            )
-
-        else:
-            print(f'\n{efficacy_title}:')
-            print(self.estimators_scores.to_string())
+    else:
+        if ml_efficacy_tab:
+            print(f'\n{ml_efficacy_tab[0].name}:')
+            print(ml_efficacy_tab[0].content.to_string())
 
+        if privacy_tab:
             print(f'\nPrivacy results:')
-            print(privacy_report.content.to_string())
+            print(privacy_tab[0].content.to_string())
 
+        if not miscellaneous.empty:
             print(f'\nMiscellaneous results:')
             print(miscellaneous.to_string())
 
+        if overview_tab:
             print(f'\nResults:')
-            print(summary.content.to_string())
\ No newline at end of file
+            print(overview_tab[0].content.to_string())
@@ -1,44 +1,172 @@
-from typing import List, Tuple, Dict, Union, Any
+import os
+from typing import List, Tuple, Dict, Union, Any, Iterator
+import numpy as np
 import pandas as pd
 
 
+ARROW_SUFFIXES = ('.feather', '.arrow', '.ipc')
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+
+
+def _is_columnar(path: str) -> bool:
+    return os.path.isdir(path) or path.endswith(PARQUET_SUFFIXES + ARROW_SUFFIXES)
+
+
+def _read_header(path: str, sep: str = ',') -> List:
+    """
+    Column names of a CSV, Parquet or Arrow file without reading its rows.
+    """
+    if _is_columnar(path):
+        import pyarrow.dataset as ds
+        return ds.dataset(path, format='ipc' if path.endswith(ARROW_SUFFIXES) else 'parquet', partitioning='hive').schema.names
+    return pd.read_csv(path, sep=sep, nrows=0).columns.tolist()
+
+
+def _sample_positions(keys: np.ndarray, n_samples: int) -> np.ndarray:
+    """
+    Sorted positions of the ``n_samples`` smallest ``keys``.
+    """
+    if n_samples >= len(keys):
+        return np.arange(len(keys))
+    return np.sort(np.argpartition(keys, n_samples)[:n_samples])
+
+
+def _sample_chunks(chunks: Iterator[pd.DataFrame], n_samples: int, seed: Union[int, np.random.SeedSequence] = None) -> pd.DataFrame:
+    """
+    Uniform sample without replacement of ``n_samples`` rows from a stream of chunks, in their original order. Every row draws a random key and
+    the rows with the smallest keys are kept, so only the sample and one chunk are held in memory.
+
+    :return: the sample, or None if there are no chunks
+    """
+    rng = np.random.default_rng(seed)
+    sample, sample_keys = None, np.empty(0)
+    for chunk in chunks:
+        chunk = chunk.reset_index(drop=True)
+        keys = np.concatenate([sample_keys, rng.random(len(chunk))])
+        data = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+        keep = _sample_positions(keys, n_samples)
+        sample, sample_keys = data.iloc[keep].reset_index(drop=True), keys[keep]
+    return sample
+
+
+def _read_table(path: str, sep: str = ',', columns: List = None, dtypes: Dict = None, n_samples: int = None,
+                seed: Union[int, np.random.SeedSequence] = None, memory_map: bool = False) -> pd.DataFrame:
+    """
+    Read a CSV, Parquet or Arrow (Feather v2 / IPC) file, see `load_data`. CSV columns are parsed with ``dtypes`` if given, falling back to
+    inferred types if the values do not parse as these.
+    """
+    if _is_columnar(path):
+        if path.endswith(ARROW_SUFFIXES):
+            import pyarrow.feather as feather
+            table = feather.read_table(path, columns=columns, memory_map=memory_map)
+        else:
+            import pyarrow.parquet as pq
+            table = pq.read_table(path, columns=columns, memory_map=memory_map)
+        if n_samples is not None:
+            # Only the sampled rows are converted to pandas.
+            table = table.take(_sample_positions(np.random.default_rng(seed).random(table.num_rows), n_samples))
+        return table.to_pandas()
+
+    try:
+        if n_samples is not None:
+            chunks = pd.read_csv(path, sep=sep, usecols=columns, dtype=dtypes, chunksize=100000, low_memory=False)
+            sample = _sample_chunks(chunks, n_samples, seed=seed)
+            # A CSV without rows may not yield any chunk, which still has the columns of its header.
+            return sample if sample is not None else pd.read_csv(path, sep=sep, usecols=columns, dtype=dtypes, nrows=0)
+        return pd.read_csv(path, sep=sep, usecols=columns, dtype=dtypes, low_memory=False)
+    except (ValueError, TypeError):
+        if dtypes is None:
+            raise
+        return _read_table(path, sep=sep, columns=columns, n_samples=n_samples, seed=seed)
+
+
 def load_data(path_real: str,
               path_fake: str,
               real_sep: str = ',',
               fake_sep: str = ',',
-              drop_columns: List = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+              drop_columns: List = None,
+              columns: List = None,
+              n_samples: int = None,
+              seed: int = None,
+              memory_map: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Load data from a real and synthetic data csv. This function makes sure that the loaded data has the same columns
     with the same data types.
 
+    Besides CSV, Parquet files (``.parquet``, ``.pq`` or a directory of partitioned Parquet files) and Arrow files (``.feather``, ``.arrow`` or
+    ``.ipc``) are read with pyarrow. The fake CSV is parsed with the data types of the real data instead of inferring them again, and only the
+    needed columns and rows are read.
+
     :param path_real: string path to csv with real data
     :param path_fake: string path to csv with real data
     :param real_sep: separator of the real csv
     :param fake_sep: separator of the fake csv
     :param drop_columns: names of columns to drop.
+    :param columns: names of the columns to read from both files. All columns if None.
+    :param n_samples: number of rows to sample from each file while reading it, uniformly and in file order. All rows if None.
+    :param seed: seed of the row samples. The real and the fake file are sampled with independent streams derived from it.
+    :param memory_map: memory map Parquet and Arrow files instead of reading them into memory first. Arrow files are then read without copies.
     :return: Tuple with DataFrame containing the real data and DataFrame containing the synthetic data.
     """
-    real = pd.read_csv(path_real, sep=real_sep, low_memory=False)
-    fake = pd.read_csv(path_fake, sep=fake_sep, low_memory=False)
-    if set(fake.columns.tolist()).issubset(set(real.columns.tolist())):
-        real = real[fake.columns]
+    path_real, path_fake = os.fspath(path_real), os.fspath(path_fake)
+    # Files of equal length would otherwise sample the same row positions.
+    real_seed, fake_seed = np.random.SeedSequence(seed).spawn(2)
+    real = _read_table(path_real, sep=real_sep, columns=columns, n_samples=n_samples, seed=real_seed, memory_map=memory_map)
+    fake_columns = _read_header(path_fake, sep=fake_sep) if columns is None else list(columns)
+    if set(fake_columns).issubset(set(real.columns.tolist())):
+        real = real[fake_columns]
+        real_columns = fake_columns
     elif drop_columns is not None:
         real = real.drop(drop_columns, axis=1)
-        try:
-            fake = fake.drop(drop_columns, axis=1)
-        except:
+        missing = [col for col in drop_columns if col not in fake_columns]
+        if missing:
             print(f'Some of {drop_columns} were not found on fake.index.')
-        assert len(fake.columns.tolist()) == len(real.columns.tolist()), \
-            f'Real and fake do not have same nr of columns: {len(fake.columns)} and {len(real.columns)}'
-        fake.columns = real.columns
+        fake_columns = [col for col in fake_columns if col not in drop_columns]
+        assert len(fake_columns) == len(real.columns.tolist()), \
+            f'Real and fake do not have same nr of columns: {len(fake_columns)} and {len(real.columns)}'
+        real_columns = real.columns.tolist()
     else:
-        fake.columns = real.columns
+        real_columns = real.columns.tolist()
+
+    # Fake columns take the data types of the real columns at the same position.
+    dtypes = {fake_col: real[real_col].dtype for fake_col, real_col in zip(fake_columns, real_columns)}
+    fake = _read_table(path_fake, sep=fake_sep, columns=fake_columns, dtypes=dtypes, n_samples=n_samples, seed=fake_seed,
+                       memory_map=memory_map)
+    fake = fake[fake_columns]
+    fake.columns = real_columns
 
     for col in fake.columns:
-        fake[col] = fake[col].astype(real[col].dtype)
+        if fake[col].dtype != real[col].dtype:
+            fake[col] = fake[col].astype(real[col].dtype)
     return real, fake
 
 
+def read_chunks(path: Union[str, os.PathLike, List], chunksize: int = 100000, sep: str = ',', columns: List = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a dataset in chunks of at most ``chunksize`` rows, without loading it as a whole. Supports CSV files, Parquet files, directories of
+    (partitioned) Parquet files and Arrow (Feather v2 / IPC) files. Parquet and Arrow require pyarrow.
+
+    :param path: path to a file or directory, or a list of paths that are read one after the other
+    :param chunksize: maximum number of rows per chunk
+    :param sep: separator of CSV files
+    :param columns: names of the columns to read. All columns if None.
+    :return: iterator over DataFrames
+    """
+    if isinstance(path, (list, tuple)):
+        for p in path:
+            yield from read_chunks(p, chunksize=chunksize, sep=sep, columns=columns)
+        return
+
+    path = os.fspath(path)
+    if _is_columnar(path):
+        import pyarrow.dataset as ds
+        dataset = ds.dataset(path, format='ipc' if path.endswith(ARROW_SUFFIXES) else 'parquet', partitioning='hive')
+        for batch in dataset.to_batches(columns=columns, batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, sep=sep, usecols=columns, chunksize=chunksize, low_memory=False)
+
+
 def dict_to_df(data: Dict[str, Any]):
     return pd.DataFrame(
         {'result': list(data.values())},
@@ -1,4 +1,5 @@
-from dython.nominal import associations
+from .associations import compute_associations
+from .descriptive import DescriptiveStatistics
 from typing import Union, List, Optional
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -45,7 +46,32 @@ def plot_var_cor(x: Union[pd.DataFrame, np.ndarray], ax=None, return_values: boo
         return None
 
 
-def plot_correlation_difference(real: pd.DataFrame, fake: pd.DataFrame, plot_diff: bool = True, cat_cols: list = None, annot=False, fname=None, rplt = False):
+def plot_association_matrix(corr: pd.DataFrame, nominal_columns: list = None, ax=None, annot=False, fmt='.2f', cmap=None, cbar=True):
+    """
+    Plot a precomputed association matrix as a heatmap, using the same layout as the dython `associations` function. Column labels get a `(nom)` or
+    `(con)` suffix depending on whether the column is nominal.
+
+    :param corr: association matrix, e.g. the output of `compute_associations` or `TableEvaluator.association_matrix`
+    :param nominal_columns: columns of `corr` that hold nominal values
+    :param ax: Axis on which to plot. If none, a new figure is made.
+    :param boolean annot: Whether to annotate the plot with numbers indicating the associations.
+    :param fmt: String formatting of the annotations.
+    :param cmap: Colormap to use for the heatmap.
+    :param cbar: Whether to draw a colorbar.
+    :return: the Matplotlib axis of the heatmap
+    """
+    nominal_columns = list(nominal_columns) if nominal_columns is not None else []
+    marked_columns = [f'{col} (nom)' if col in nominal_columns else f'{col} (con)' for col in corr.columns]
+    corr = pd.DataFrame(corr.values.astype(float), index=marked_columns, columns=marked_columns)
+    nr_continuous = len(marked_columns) - len([col for col in nominal_columns if col in set(corr.columns)])
+    if ax is None:
+        fig, ax = plt.subplots()
+    return sns.heatmap(corr, cmap=cmap, annot=annot, fmt=fmt, center=0, vmax=1.0, vmin=-1.0 if nr_continuous >= 2 else 0.0,
+                       square=True, ax=ax, cbar=cbar)
+
+
+def plot_correlation_difference(real: pd.DataFrame, fake: pd.DataFrame, plot_diff: bool = True, cat_cols: list = None, annot=False, fname=None, rplt = False,
+                                real_corr: pd.DataFrame = None, fake_corr: pd.DataFrame = None):
     """
     Plot the association matrices for the `real` dataframe, `fake` dataframe and plot the difference between them. Has support for continuous and Categorical
     (Male, Female) data types. All Object and Category dtypes are considered to be Categorical columns if `dis_cols` is not passed.
@@ -59,25 +85,29 @@ def plot_correlation_difference(real: pd.DataFrame, fake: pd.DataFrame, plot_dif
     :param plot_diff: Plot difference if True, else not
     :param cat_cols: List of Categorical columns
     :param boolean annot: Whether to annotate the plot with numbers indicating the associations.
+    :param real_corr: Precomputed association matrix of `real`. Computed from `real` if not passed.
+    :param fake_corr: Precomputed association matrix of `fake`. Computed from `fake` if not passed.
     """
     assert isinstance(real, pd.DataFrame), f'`real` parameters must be a Pandas DataFrame'
     assert isinstance(fake, pd.DataFrame), f'`fake` parameters must be a Pandas DataFrame'
     cmap = sns.diverging_palette(220, 10, as_cmap=True)
 
     if cat_cols is None:
-        cat_cols = real.select_dtypes(['object', 'category'])
+        cat_cols = real.select_dtypes(['object', 'category']).columns.tolist()
     if plot_diff:
         fig, ax = plt.subplots(1, 3, figsize=(24, 7))
     else:
         fig, ax = plt.subplots(1, 2, figsize=(20, 8))
 
-    real_corr = associations(real, nominal_columns=cat_cols, plot=False, theil_u=True,
-                             mark_columns=True, annot=annot, ax=ax[0], cmap=cmap)['corr']
-    fake_corr = associations(fake, nominal_columns=cat_cols, plot=False, theil_u=True,
-                             mark_columns=True, annot=annot, ax=ax[1], cmap=cmap)['corr']
+    if real_corr is None:
+        real_corr = compute_associations(real, nominal_columns=cat_cols, theil_u=True)
+    if fake_corr is None:
+        fake_corr = compute_associations(fake, nominal_columns=cat_cols, theil_u=True)
+    plot_association_matrix(real_corr, nominal_columns=cat_cols, ax=ax[0], annot=annot, cmap=cmap)
+    plot_association_matrix(fake_corr, nominal_columns=cat_cols, ax=ax[1], annot=annot, cmap=cmap)
 
     if plot_diff:
-        diff = abs(real_corr - fake_corr)
+        diff = abs(real_corr.astype(float) - fake_corr.astype(float))
         sns.set(style="white")
         sns.heatmap(diff, ax=ax[2], cmap=cmap, vmax=.3, square=True, annot=annot, center=0,
                     linewidths=.5, cbar_kws={"shrink": .5}, fmt='.2f')
@@ -109,14 +139,13 @@ def plot_correlation_comparison(evaluators: List, annot=False, rplt=False):
     flat_ax = ax.flatten()
     flat_ax[nr_plots + 1].clear()
     fake_corr = []
-    real_corr = associations(evaluators[0].real, nominal_columns=evaluators[0].categorical_columns, plot=False, theil_u=True,
-                             mark_columns=True, annot=False, cmap=cmap, cbar=False, ax=flat_ax[0])['corr']
+    real_corr = evaluators[0].association_matrix('real')
+    plot_association_matrix(real_corr, nominal_columns=evaluators[0].categorical_columns, annot=False, cmap=cmap, cbar=False, ax=flat_ax[0])
     for i in range(1, nr_plots):
         cbar = True if i % (nr_plots - 1) == 0 else False
-        fake_corr.append(
-            associations(evaluators[i - 1].fake, nominal_columns=evaluators[0].categorical_columns, plot=False, theil_u=True,
-                         mark_columns=True, annot=False, cmap=cmap, cbar=cbar, ax=flat_ax[i])['corr']
-        )
+        fake_corr.append(evaluators[i - 1].association_matrix('fake'))
+        plot_association_matrix(fake_corr[-1], nominal_columns=evaluators[0].categorical_columns, annot=False, cmap=cmap, cbar=cbar,
+                                ax=flat_ax[i])
         if i % (nr_plots - 1) == 0:
             cbar = flat_ax[i].collections[0].colorbar
             cbar.ax.tick_params(labelsize=20)
@@ -174,7 +203,7 @@ def cdf(data_r, data_f, xlabel: str = 'Values', ylabel: str = 'Cumulative Sum',
     import matplotlib.ticker as mticker
 
     # If labels are strings, rotate them vertical
-    if isinstance(data_r, pd.Series) and data_r.dtypes == 'object':
+    if isinstance(data_r, pd.Series) and (data_r.dtypes == 'object' or data_r.dtypes == 'category'):
         ticks_loc = ax.get_xticks()
         ax.xaxis.set_major_locator(mticker.FixedLocator(ticks_loc))
         ax.set_xticklabels(data_r.sort_values().unique(), rotation='vertical')
@@ -193,7 +222,7 @@ def plot_mean_std_comparison(evaluators: List, rplt = False):
     fig, ax = plt.subplots(2, nr_plots, figsize=(4 * nr_plots, 7))
     flat_ax = ax.flatten()
     for i in range(nr_plots):
-        plot_mean_std(evaluators[i].real, evaluators[i].fake, ax=ax[:, i])
+        plot_mean_std(evaluators[i].descriptive_statistics('real'), evaluators[i].descriptive_statistics('fake'), ax=ax[:, i])
 
     titles = [e.name if e is not None else idx for idx, e in enumerate(evaluators)]
     for i, label in enumerate(titles):
@@ -206,12 +235,12 @@ def plot_mean_std_comparison(evaluators: List, rplt = False):
         plt.show()
 
 
-def plot_mean_std(real: pd.DataFrame, fake: pd.DataFrame, ax=None, fname=None, rplt=False):
+def plot_mean_std(real: Union[pd.DataFrame, DescriptiveStatistics], fake: Union[pd.DataFrame, DescriptiveStatistics], ax=None, fname=None, rplt=False):
     """
     Plot the means and standard deviations of each dataset.
 
-    :param real: DataFrame containing the real data
-    :param fake: DataFrame containing the fake data
+    :param real: DataFrame containing the real data, or its precomputed `descriptive.DescriptiveStatistics`
+    :param fake: DataFrame containing the fake data, or its precomputed `descriptive.DescriptiveStatistics`
     :param ax: Axis to plot on. If none, a new figure is made.
     :param fname: If not none, saves the plot with this file name. 
     """
@@ -221,10 +250,12 @@ def plot_mean_std(real: pd.DataFrame, fake: pd.DataFrame, ax=None, fname=None, r
 
     ax[0].grid(True)
     ax[1].grid(True)
-    real = real._get_numeric_data()
-    fake = fake._get_numeric_data()
-    real_mean = np.log(np.add(abs(real.mean()).values, 1e-5))
-    fake_mean = np.log(np.add(abs(fake.mean()).values, 1e-5))
+    if isinstance(real, pd.DataFrame):
+        real = DescriptiveStatistics.from_frame(real, real._get_numeric_data().columns, quantiles=None)
+    if isinstance(fake, pd.DataFrame):
+        fake = DescriptiveStatistics.from_frame(fake, fake._get_numeric_data().columns, quantiles=None)
+    real_mean = np.log(np.add(abs(real.mean), 1e-5))
+    fake_mean = np.log(np.add(abs(fake.mean), 1e-5))
     min_mean = min(real_mean) - 1
     max_mean = max(real_mean) + 1
     line = np.arange(min_mean, max_mean)
@@ -236,8 +267,8 @@ def plot_mean_std(real: pd.DataFrame, fake: pd.DataFrame, ax=None, fname=None, r
     ax[0].set_xlabel('real data mean (log)')
     ax[0].set_ylabel('fake data mean (log)')
 
-    real_std = np.log(np.add(real.std().values, 1e-5))
-    fake_std = np.log(np.add(fake.std().values, 1e-5))
+    real_std = np.log(np.add(real.std, 1e-5))
+    fake_std = np.log(np.add(fake.std, 1e-5))
     min_std = min(real_std) - 1
     max_std = max(real_std) + 1
     line = np.arange(min_std, max_std)
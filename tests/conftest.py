@@ -0,0 +1,38 @@
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.exceptions import ConvergenceWarning
+
+
+def make_frame(n_rows: int, seed: int) -> pd.DataFrame:
+    """
+    Small mixed-type table: three correlated and skewed numerical columns and three categorical columns of string labels.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.normal(size=n_rows)
+    return pd.DataFrame({
+        'a': a,
+        'b': 2 * a + rng.normal(size=n_rows),
+        'c': rng.exponential(size=n_rows),
+        'cat': rng.choice(['x', 'y', 'z'], n_rows),
+        'cat2': rng.choice([f'level_{i}' for i in range(30)], n_rows),
+        'target': rng.choice(['t0', 't1'], n_rows),
+    })
+
+
+@pytest.fixture(autouse=True)
+def _quiet():
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', ConvergenceWarning)
+        yield
+
+
+@pytest.fixture
+def real() -> pd.DataFrame:
+    return make_frame(600, seed=1)
+
+
+@pytest.fixture
+def fake() -> pd.DataFrame:
+    return make_frame(600, seed=2)
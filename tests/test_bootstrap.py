@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from table_evaluator import TableEvaluator
+from .conftest import make_frame
+
+METRICS = ['basic_statistics', 'correlation_correlation', 'column_correlations', 'js_distance', 'ks_test']
+
+
+@pytest.fixture
+def wide_categories():
+    # Two categorical columns of 40 categories: their joint codes exceed the range of the uint8 codes of float32 mode.
+    real, fake = make_frame(500, seed=1), make_frame(500, seed=2)
+    for frame, seed in [(real, 3), (fake, 4)]:
+        frame['cat3'] = np.random.default_rng(seed).choice([f'other_{i}' for i in range(40)], len(frame))
+        frame['cat2'] = frame['cat2'].where(np.arange(len(frame)) % 4 > 0, frame['cat3'])
+    return real, fake
+
+
+def test_bootstrap_estimates_match_the_metrics(real, fake):
+    evaluator = TableEvaluator(real, fake, seed=0)
+    intervals = evaluator.bootstrap(n_replicates=20, metrics=METRICS, seed=0)
+
+    assert intervals.loc['Correlation column correlations', 'estimate'] == pytest.approx(evaluator.correlation_correlation())
+    assert intervals.loc['Mean Correlation between fake and real columns', 'estimate'] == pytest.approx(evaluator.column_correlations())
+    assert intervals.loc['Basic statistics', 'estimate'] == pytest.approx(evaluator.basic_statistical_evaluation())
+    assert (intervals['lower'] <= intervals['upper']).all()
+
+
+def test_float32_bootstrap_matches_float64(wide_categories):
+    real, fake = wide_categories
+    results = []
+    for precision in ['float64', 'float32']:
+        # The evaluator shuffles its samples with the global random state, and replicates draw rows by position.
+        np.random.seed(0)
+        results.append(TableEvaluator(real, fake, seed=0, precision=precision).bootstrap(n_replicates=20, metrics=METRICS, seed=0))
+
+    np.testing.assert_allclose(results[1].to_numpy(dtype=float), results[0].to_numpy(dtype=float), atol=1e-4)
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from table_evaluator import TableEvaluator
+from table_evaluator.associations import compute_associations
+from table_evaluator.cache import AssociationCache
+
+
+def baseline_copies(real: pd.DataFrame, fake: pd.DataFrame) -> int:
+    """
+    Number of fake rows that occur in the real data, with a pandas merge.
+    """
+    return int(fake.merge(real.drop_duplicates(), how='inner').shape[0])
+
+
+def test_copies_follow_reassigned_fake(real, fake):
+    evaluator = TableEvaluator(real, fake, seed=0)
+    assert evaluator.get_copies(return_len=True) == baseline_copies(evaluator.real, evaluator.fake) == 0
+
+    copied = evaluator.fake.copy()
+    copied.iloc[:25] = evaluator.real.iloc[:25].to_numpy()
+    evaluator.fake = copied
+    assert evaluator.get_copies(return_len=True) == baseline_copies(evaluator.real, evaluator.fake) == 25
+    assert evaluator.get_duplicates() == (0, 0)
+
+
+def test_association_matrices_are_computed_once(real, fake, monkeypatch):
+    import table_evaluator.table_evaluator as module
+    calls = []
+    compute = module.compute_associations
+    monkeypatch.setattr(module, 'compute_associations', lambda *args, **kwargs: calls.append(1) or compute(*args, **kwargs))
+    evaluator = TableEvaluator(real, fake, seed=0)
+
+    expected = compute(evaluator.fake, nominal_columns=evaluator.categorical_columns, theil_u=True)
+    evaluator.correlation_correlation()
+    evaluator.correlation_distance(how='rmse')
+    evaluator.correlation_distance(how='mae')
+    assert len(calls) == 2
+    pd.testing.assert_frame_equal(evaluator.association_matrix('fake'), expected)
+
+
+def test_invalidate_cache_after_in_place_changes(real, fake):
+    evaluator = TableEvaluator(real, fake, seed=0)
+    before = evaluator.association_matrix('fake')
+    evaluator.association_matrix('real')
+    statistics = evaluator.descriptive_statistics('real')
+    evaluator.fake['b'] = evaluator.fake['a']
+    evaluator.invalidate_cache('fake')
+
+    after = evaluator.association_matrix('fake')
+    assert after.loc['a', 'b'] == pytest.approx(1.0)
+    assert before.loc['a', 'b'] < 1.0
+    # Only the entries of the fake data are dropped, the real matrix stays cached.
+    assert AssociationCache.key('real', evaluator.categorical_columns) in evaluator._association_cache
+    assert evaluator.descriptive_statistics('real') is not statistics
+    np.testing.assert_array_equal(evaluator.encoding.fake_ordinal[:, 1], evaluator.encoding.fake_ordinal[:, 0])
+
+
+def test_association_cache_stays_bounded_across_reassignments(real, fake):
+    evaluator = TableEvaluator(real, fake, seed=0)
+    evaluator.correlation_correlation()
+    for seed in range(5):
+        evaluator.fake = fake.sample(len(evaluator.fake), random_state=seed)
+        expected = compute_associations(evaluator.fake, nominal_columns=evaluator.categorical_columns, theil_u=True)
+        pd.testing.assert_frame_equal(evaluator.association_matrix('fake'), expected)
+        assert len(evaluator._association_cache) == 2
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.spatial.distance import cdist
+from table_evaluator import TableEvaluator
+from table_evaluator.associations import compute_associations
+from table_evaluator.encoding import PRECISIONS, standardize_columns
+from table_evaluator.profile import RealProfile
+
+
+def evaluators(real, fake):
+    pair = []
+    for precision in ['float64', 'float32']:
+        # The evaluator shuffles its samples with the global random state.
+        np.random.seed(0)
+        pair.append(TableEvaluator(real, fake, seed=0, precision=precision))
+    return pair
+
+
+def test_float32_encoding_matches_float64(real, fake):
+    double, single = evaluators(real, fake)
+    assert single.encoding.real_ordinal.dtype == np.float32
+    assert single.encoding.real_codes.dtype == np.uint8
+    np.testing.assert_array_equal(single.encoding.real_codes, double.encoding.real_codes)
+    np.testing.assert_allclose(single.encoding.fake_one_hot, double.encoding.fake_one_hot, rtol=1e-6)
+
+
+@pytest.mark.parametrize('metric', ['basic_statistical_evaluation', 'correlation_correlation', 'column_correlations', 'pca_correlation'])
+def test_float32_metrics_match_float64(real, fake, metric):
+    double, single = evaluators(real, fake)
+    assert getattr(single, metric)() == pytest.approx(getattr(double, metric)(), abs=1e-3)
+
+
+@pytest.mark.parametrize('method', ['exact', 'kdtree'])
+def test_row_distance_matches_brute_force(real, fake, method):
+    evaluator = TableEvaluator(real, fake, seed=0)
+    encoding = evaluator.encoding
+    continuous = encoding.continuous_one_hot_columns()
+    # Distance from every real row to its closest fake row, as the original implementation computed it with a full distance matrix.
+    real_rows, fake_rows = [standardize_columns(one_hot, continuous) for one_hot in [encoding.real_one_hot, encoding.fake_one_hot]]
+    distances = cdist(real_rows, fake_rows).min(axis=1)
+    assert evaluator.row_distance(method=method) == pytest.approx((distances.mean(), distances.std()), rel=1e-9)
+
+
+def test_float32_evaluator_computes_real_associations_in_float32(real, fake):
+    expected = compute_associations(RealProfile.from_frame(real, seed=0).real, nominal_columns=['cat', 'cat2', 'target'], theil_u=True,
+                                    dtype='float32')
+    for precision in PRECISIONS:
+        profile = RealProfile.from_frame(real, seed=0, precision=precision)
+        evaluator = TableEvaluator(profile, fake, seed=0, precision='float32')
+        pd.testing.assert_frame_equal(evaluator.association_matrix('real'), expected, check_exact=True)
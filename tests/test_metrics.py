@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import ks_2samp
+from table_evaluator.metrics import KS_EXACT_MAX_N, kolmogorov_smirnov_df, kolmogorov_smirnov_df_from_sorted, ks_statistics
+
+
+@pytest.mark.parametrize('n_rows', [500, KS_EXACT_MAX_N + 500])
+def test_kolmogorov_smirnov_matches_ks_2samp(n_rows):
+    rng = np.random.default_rng(0)
+    columns = ['normal', 'rounded', 'missing']
+
+    def frame(shift):
+        data = pd.DataFrame({'normal': rng.normal(shift, size=n_rows), 'rounded': np.round(rng.normal(shift, size=n_rows), 1),
+                             'missing': rng.normal(size=n_rows)})
+        data.loc[data.index[::50], 'missing'] = np.nan
+        return data
+
+    real, fake = frame(0.0), frame(0.05)
+    result = kolmogorov_smirnov_df(real, fake, columns)
+    for col in columns:
+        expected = ks_2samp(real[col].to_numpy(), fake[col].to_numpy())
+        assert result.loc[col, 'statistic'] == expected.statistic
+        assert result.loc[col, 'p-value'] == pytest.approx(expected.pvalue, rel=1e-9, abs=1e-300)
+
+    presorted = kolmogorov_smirnov_df(real[columns[:2]].apply(np.sort), fake[columns[:2]].apply(np.sort), columns[:2], presorted=True)
+    pd.testing.assert_frame_equal(presorted, result.loc[columns[:2]])
+
+
+def test_ks_statistics_of_tied_and_unequal_samples():
+    rng = np.random.default_rng(1)
+    real, fake = rng.integers(0, 5, (301, 4)).astype(float), rng.integers(1, 6, (200, 4)).astype(float)
+    expected = [ks_2samp(real[:, i], fake[:, i], method='asymp').statistic for i in range(4)]
+    np.testing.assert_array_equal(ks_statistics(real, fake), expected)
+    np.testing.assert_array_equal(ks_statistics(real, fake, block_size=1), expected)
+
+
+@pytest.mark.parametrize('n_rows', [500, KS_EXACT_MAX_N + 500])
+def test_kolmogorov_smirnov_from_sorted_matches_in_memory(n_rows):
+    rng = np.random.default_rng(2)
+    real = pd.DataFrame({'normal': rng.normal(size=n_rows), 'rounded': np.round(rng.normal(size=n_rows), 1)})
+    fake = pd.DataFrame({'normal': rng.normal(0.05, size=n_rows), 'rounded': np.round(rng.normal(0.05, size=n_rows), 1)})
+    expected = kolmogorov_smirnov_df(real, fake, ['normal', 'rounded'])
+    real_sorted, fake_sorted = {col: np.sort(real[col].to_numpy()) for col in real}, {col: np.sort(fake[col].to_numpy()) for col in fake}
+    # Stacked columns, and columns larger than a block, which are read block by block.
+    for block_size in [4 * n_rows, n_rows // 3]:
+        pd.testing.assert_frame_equal(kolmogorov_smirnov_df_from_sorted(real_sorted, fake_sorted, block_size=block_size), expected)
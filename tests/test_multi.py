@@ -0,0 +1,51 @@
+import warnings
+import numpy as np
+import pandas as pd
+from sklearn.exceptions import ConvergenceWarning
+from table_evaluator import MultiTableEvaluator, TableEvaluator
+from table_evaluator.profile import RealProfile
+from .conftest import make_frame
+
+
+def test_leaderboard_does_not_depend_on_max_workers(real):
+    fakes = {f'candidate_{i}': make_frame(600, seed=10 + i) for i in range(4)}
+    profile = RealProfile.from_frame(real)
+    leaderboards = [MultiTableEvaluator(profile, fakes, seed=0, max_workers=max_workers).evaluate('target', n_samples_distance=200)
+                    for max_workers in [1, 4]]
+    pd.testing.assert_frame_equal(leaderboards[1], leaderboards[0])
+
+
+def test_evaluators_do_not_share_columns_of_the_profile(real, fake):
+    profile = RealProfile.from_frame(real)
+    first, second = TableEvaluator(profile, fake), TableEvaluator(profile, fake)
+    first.real['a'] = 0.0
+    assert (second.real['a'] == profile.real['a']).all()
+    assert not (profile.real['a'] == 0.0).all()
+
+
+def test_candidates_are_sampled_with_their_own_generator(real):
+    fakes = [make_frame(800, seed=10), make_frame(800, seed=11)]
+    profile = RealProfile.from_frame(real)
+    np.random.seed(0)
+    first = MultiTableEvaluator(profile, fakes, seed=0)
+    np.random.seed(1)
+    second = MultiTableEvaluator(profile, fakes, seed=0)
+    for name in first.evaluators:
+        pd.testing.assert_frame_equal(first.evaluators[name].fake, second.evaluators[name].fake)
+
+
+def test_real_sample_follows_the_seed(real):
+    fakes = [make_frame(800, seed=10)]
+    np.random.seed(0)
+    first = MultiTableEvaluator(real, fakes, n_samples=300, seed=0)
+    np.random.seed(1)
+    second = MultiTableEvaluator(real, fakes, n_samples=300, seed=0)
+    pd.testing.assert_frame_equal(first.evaluators[0].real, second.evaluators[0].real)
+    pd.testing.assert_frame_equal(first.evaluators[0].fake, second.evaluators[0].fake)
+
+
+def test_evaluate_silences_convergence_warnings(real, fake):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        MultiTableEvaluator(real, [fake], seed=0).evaluate('target', n_samples_distance=200)
+    assert not [warning for warning in caught if issubclass(warning.category, ConvergenceWarning)]
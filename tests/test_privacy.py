@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from table_evaluator import TableEvaluator
+from table_evaluator.privacy import GowerIndex, MinHashIndex
+
+
+def brute_force_gower(reference: pd.DataFrame, queries: pd.DataFrame, categorical: list) -> np.ndarray:
+    """
+    Gower distance of every query row to its closest reference row, one query row at a time.
+    """
+    numerical = [col for col in reference.columns if col not in categorical]
+    span = (reference[numerical].max() - reference[numerical].min()).to_numpy()
+    distances = []
+    for _, row in queries.iterrows():
+        numerical_part = np.minimum(np.abs(reference[numerical].to_numpy() - row[numerical].to_numpy(dtype=float)) / span, 1.0).sum(axis=1)
+        categorical_part = (reference[categorical].to_numpy() != row[categorical].to_numpy()).sum(axis=1)
+        distances.append(((numerical_part + categorical_part) / len(reference.columns)).min())
+    return np.array(distances)
+
+
+def test_gower_index_matches_brute_force(real, fake):
+    categorical = ['cat', 'cat2', 'target']
+    index = GowerIndex.from_frame(real, categorical, seed=0)
+    exact = index.query(fake, exact=True)
+    approximate = index.query(fake)
+
+    np.testing.assert_allclose(exact, brute_force_gower(real, fake, categorical))
+    assert (approximate >= exact - 1e-12).all()
+    assert np.mean(np.isclose(approximate, exact)) > 0.9
+    baseline = index.baseline(n_samples=100, seed=0, exact=True)
+    assert (baseline > 0).all()
+
+
+def brute_force_near_copies(index: MinHashIndex, queries: np.ndarray) -> np.ndarray:
+    """
+    Fewest differing columns of every query row with any reference row.
+    """
+    n_rows = len(index.reference)
+    return np.array([index._mismatches(queries, np.full(n_rows, i), np.arange(n_rows)).min() for i in range(len(queries))])
+
+
+def test_minhash_finds_planted_near_copies():
+    rng = np.random.default_rng(0)
+    reference = np.column_stack([rng.normal(size=(2000, 5)), rng.integers(0, 20, (2000, 2))])
+    queries = np.column_stack([rng.normal(size=(300, 5)), rng.integers(0, 20, (300, 2))])
+    queries[:50] = reference[:50]
+    queries[:25, 0] += 1.0
+    index = MinHashIndex(categorical=[5, 6], seed=0).fit(reference)
+    pairs = index.query(queries)
+
+    expected = np.flatnonzero(brute_force_near_copies(index, queries) <= index.max_mismatches)
+    np.testing.assert_array_equal(pairs['query'], expected)
+    np.testing.assert_array_equal(pairs['mismatches'], index._mismatches(queries, pairs['query'].to_numpy(), pairs['reference'].to_numpy()))
+    assert set(range(50)) <= set(pairs['query'])
+
+
+@pytest.mark.parametrize('max_candidates', [5, 50])
+def test_minhash_caps_candidates_of_large_buckets(max_candidates):
+    # Three categories in five columns: most rows share a bucket, which must not be compared with every query.
+    rng = np.random.default_rng(1)
+    reference, queries = rng.integers(0, 3, (3000, 5)).astype(float), rng.integers(0, 3, (500, 5)).astype(float)
+    index = MinHashIndex(categorical=range(5), max_mismatches=0, max_candidates=max_candidates, memory_budget=2 ** 20, seed=0).fit(reference)
+    compared = []
+    mismatches = index._mismatches
+    index._mismatches = lambda queries, rows, candidates: compared.append(len(rows)) or mismatches(queries, rows, candidates)
+    pairs = index.query(queries)
+
+    assert sum(compared) <= len(queries) * index.n_bands * max_candidates
+    assert (pairs['mismatches'] == 0).all()
+    np.testing.assert_array_equal(reference[pairs['reference']], queries[pairs['query']])
+    # Every query has an exact copy among 3000 rows of 243 possible ones, and the window around its position in a bucket finds it.
+    assert len(pairs) == len(queries)
+
+
+def test_minhash_baseline_excludes_the_query_row():
+    rng = np.random.default_rng(2)
+    reference = rng.normal(size=(500, 4))
+    reference[100:110] = reference[:10]
+    pairs = MinHashIndex(max_mismatches=0, seed=0).fit(reference).baseline()
+
+    np.testing.assert_array_equal(pairs['query'], np.r_[0:10, 100:110])
+    np.testing.assert_array_equal(pairs['reference'], np.r_[100:110, 0:10])
+
+
+def test_near_copy_rate_of_independent_tables_matches_the_real_baseline():
+    rng = np.random.default_rng(3)
+    columns = [f'c{i}' for i in range(5)]
+    real, fake = [pd.DataFrame({col: rng.choice(list('abc'), 1000) for col in columns}) for _ in range(2)]
+    evaluator = TableEvaluator(real, fake, cat_cols=columns)
+
+    fake_rate, real_rate = evaluator.get_near_copies(return_rate=True)
+    assert fake_rate > 0.5
+    assert abs(fake_rate - real_rate) < 0.05
+    assert 'near_copies' not in evaluator.evaluation_plan('c0').select()
+    assert 'near_copies' in evaluator.evaluation_plan('c0').select(['near_copies'])
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.decomposition import IncrementalPCA
+from table_evaluator import TableEvaluator
+from table_evaluator.profile import RealProfile
+
+# Metrics that do not depend on the order of the rows, which differs between a profile and a `TableEvaluator` sampling the same rows.
+ORDER_FREE_METRICS = ['basic_statistics', 'correlation_correlation', 'column_correlations', 'duplicates', 'correlation_distance_rmse',
+                      'js_distance', 'ks_test']
+
+
+def evaluation(real, fake, metrics=(*ORDER_FREE_METRICS, 'estimators', 'row_distance')):
+    np.random.seed(0)
+    evaluator = TableEvaluator(real, fake, seed=0)
+    results = evaluator.evaluation_plan('target', n_samples_distance=200).run(metrics=metrics)
+    return {name: results[name] for name in metrics}, evaluator.pca_correlation()
+
+
+def assert_same_evaluation(actual, expected):
+    for name, value in expected[0].items():
+        if isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(actual[0][name], value)
+        else:
+            np.testing.assert_allclose(actual[0][name], value, rtol=1e-10)
+    assert actual[1] == pytest.approx(expected[1], rel=1e-10)
+
+
+def test_profile_matches_evaluation_on_the_real_sample(real, fake, tmp_path):
+    profile = RealProfile.from_frame(real, targets={'target': 'class'}, seed=0)
+    profile.save(tmp_path / 'real.npz')
+    loaded = RealProfile.load(tmp_path / 'real.npz')
+
+    assert_same_evaluation(evaluation(profile, fake, ORDER_FREE_METRICS), evaluation(profile.real.copy(), fake, ORDER_FREE_METRICS))
+    assert_same_evaluation(evaluation(loaded, fake), evaluation(profile, fake))
+
+
+@pytest.mark.parametrize('pca_solver', ['full', 'incremental'])
+def test_profile_pca_uses_the_solver(real, fake, tmp_path, pca_solver):
+    profile = RealProfile.from_frame(real, pca_solver=pca_solver, seed=0)
+    assert isinstance(profile.pca, IncrementalPCA) == (pca_solver == 'incremental')
+    profile.save(tmp_path / 'real.npz')
+    loaded = RealProfile.load(tmp_path / 'real.npz')
+    assert loaded.pca_solver == pca_solver
+    np.testing.assert_allclose(loaded.pca.transform(profile.encoding.real_ordinal), profile.pca.transform(profile.encoding.real_ordinal))
+
+    same, other = TableEvaluator(loaded, fake, seed=0, pca_solver=pca_solver), TableEvaluator(loaded, fake, seed=0, pca_solver='randomized')
+    assert same.pca.model('real') is loaded.pca
+    assert other.pca.model('real') is not loaded.pca
+
+
+def test_profile_sample_follows_the_seed(real):
+    first, second = [RealProfile.from_frame(real, n_samples=300, seed=0) for _ in range(2)]
+    pd.testing.assert_frame_equal(first.real, second.real)
+    assert not first.real.index.equals(RealProfile.from_frame(real, n_samples=300, seed=1).real.index)
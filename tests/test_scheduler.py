@@ -0,0 +1,75 @@
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from table_evaluator import TableEvaluator
+from table_evaluator.scheduler import EvaluationPlan
+
+
+def assert_same_results(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name, value in expected.items():
+        if isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(actual[name], value)
+        elif name not in ('encoding', 'real_associations', 'fake_associations', 'descriptive_statistics', 'row_hash_indexes'):
+            np.testing.assert_allclose(actual[name], value, rtol=1e-12)
+
+
+def test_plan_runs_required_steps_first():
+    started, lock = [], threading.Lock()
+
+    def step(name):
+        def compute():
+            with lock:
+                started.append(name)
+            return name
+        return compute
+
+    plan = EvaluationPlan().add_input('data', step('data'))
+    plan.add_metric('first', step('first'), requires=['data']).add_metric('second', step('second'), requires=['data'])
+    plan.add_metric('optional', step('optional'), default=False)
+
+    assert plan.select() == ['data', 'first', 'second']
+    assert plan.select(['optional']) == ['optional']
+    assert plan.select(skip=['first', 'second']) == []
+    results = plan.run(max_workers=4)
+    assert started[0] == 'data'
+    assert results == {'data': 'data', 'first': 'first', 'second': 'second'}
+    with pytest.raises(ValueError):
+        plan.select(['data'])
+
+
+def test_plan_reraises_errors_of_steps():
+    plan = EvaluationPlan().add_metric('fails', lambda: 1 / 0).add_metric('works', lambda: 1)
+    with pytest.raises(ZeroDivisionError):
+        plan.run(max_workers=2)
+
+
+@pytest.mark.parametrize('precision', ['float64', 'float32'])
+def test_concurrent_evaluation_matches_serial(real, fake, precision):
+    results = []
+    for max_workers in [1, 8]:
+        np.random.seed(0)
+        evaluator = TableEvaluator(real, fake, seed=0, precision=precision)
+        plan = evaluator.evaluation_plan('target', n_samples_distance=200)
+        results.append(plan.run(max_workers=max_workers, metrics=plan.metrics))
+    assert_same_results(results[1], results[0])
+
+
+def test_concurrent_cache_access_builds_each_entry_once(real, fake):
+    evaluator = TableEvaluator(real, fake, seed=0)
+    barrier = threading.Barrier(8)
+    found = [None] * 8
+
+    def read(i):
+        barrier.wait()
+        encoding = evaluator.encoding
+        found[i] = (encoding, encoding.one_hot('fake'), evaluator.descriptive_statistics('fake'), evaluator.row_hash_index('fake'))
+
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for entries in found[1:]:
+        assert all(entry is first for entry, first in zip(entries, found[0]))
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+from table_evaluator.utils import _sample_chunks, load_data
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def files(real, fake, tmp_path):
+    paths = {}
+    for name, data in [('real', real), ('fake', fake)]:
+        paths[name, 'csv'] = tmp_path / f'{name}.csv'
+        data.to_csv(paths[name, 'csv'], index=False)
+        paths[name, 'parquet'] = tmp_path / f'{name}.parquet'
+        data.to_parquet(paths[name, 'parquet'], index=False)
+        paths[name, 'feather'] = tmp_path / f'{name}.feather'
+        data.to_feather(paths[name, 'feather'])
+    return paths
+
+
+@pytest.mark.parametrize('file_format', ['parquet', 'feather'])
+@pytest.mark.parametrize('n_samples', [None, 100])
+def test_columnar_files_load_like_csv(files, file_format, n_samples):
+    expected = load_data(files['real', 'csv'], files['fake', 'csv'], n_samples=n_samples, seed=0)
+    loaded = load_data(files['real', file_format], files['fake', file_format], n_samples=n_samples, seed=0, memory_map=True)
+    for actual, frame in zip(loaded, expected):
+        pd.testing.assert_frame_equal(actual, frame)
+
+
+def test_load_selected_columns(files, real):
+    loaded_real, loaded_fake = load_data(files['real', 'parquet'], files['fake', 'csv'], columns=['a', 'cat'])
+    pd.testing.assert_frame_equal(loaded_real, real[['a', 'cat']])
+    assert loaded_fake.columns.tolist() == ['a', 'cat']
+    assert (loaded_fake.dtypes == loaded_real.dtypes).all()
+
+
+def test_sample_of_empty_csv_keeps_the_columns(real, tmp_path):
+    for name in ['real', 'fake']:
+        real.iloc[:0].to_csv(tmp_path / f'{name}.csv', index=False)
+    loaded_real, loaded_fake = load_data(tmp_path / 'real.csv', tmp_path / 'fake.csv', n_samples=10)
+    assert loaded_real.columns.tolist() == loaded_fake.columns.tolist() == real.columns.tolist()
+    assert len(loaded_real) == len(loaded_fake) == 0
+    assert _sample_chunks(iter([]), 10) is None
+
+
+def test_sampled_csv_parses_every_chunk_at_once(tmp_path):
+    # On a wide table a low-memory parse splits a chunk into blocks of a few thousand rows, and would read the leading digits of the codes as
+    # integers and the rest as strings.
+    codes = [str(i) for i in range(20000)] + [f'A{i}' for i in range(10000)]
+    data = pd.DataFrame({'code': codes, **{f'x{i}': 0 for i in range(63)}})
+    data.to_csv(tmp_path / 'real.csv', index=False)
+    data.iloc[:10].to_csv(tmp_path / 'fake.csv', index=False)
+    real, _ = load_data(tmp_path / 'real.csv', tmp_path / 'fake.csv', n_samples=len(codes), seed=0)
+    assert set(map(type, real['code'])) == {str}
+
+
+def test_real_and_fake_are_sampled_independently(tmp_path):
+    for name in ['real', 'fake']:
+        pd.DataFrame({'row': range(1000)}).to_csv(tmp_path / f'{name}.csv', index=False)
+    real, fake = load_data(tmp_path / 'real.csv', tmp_path / 'fake.csv', n_samples=100, seed=0)
+    assert not real['row'].equals(fake['row'])
+    again = load_data(tmp_path / 'real.csv', tmp_path / 'fake.csv', n_samples=100, seed=0)
+    pd.testing.assert_frame_equal(again[0], real)
+    pd.testing.assert_frame_equal(again[1], fake)